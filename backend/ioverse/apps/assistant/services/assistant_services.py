@@ -1,6 +1,7 @@
 import logging
 from typing import Any, Dict
 
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -17,9 +18,13 @@ from assistant_modules.assistant.parameters import (
 from assistant_modules.assistant.services import AssistantService
 from apps.assistant.models import Assistant as DjangoAssistant
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
 
 logger = logging.getLogger(__name__)
 
+# Assistants retrieved from OpenAI, sparing the round trip on repeated reads
+assistant_cache = CacheAside('assistant:assistants', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class AssistantIntegrationService:
     def __init__(self, api_key: str):
         self.assistant_service = AssistantService(api_key=api_key)
@@ -72,6 +77,7 @@ class AssistantIntegrationService:
             logger.error(f"Error creating assistant: {e}")
             raise
 
+    @assistant_cache.cached(lambda self, assistant_id, user: (user.pk, assistant_id))
     def retrieve_assistant(self, assistant_id: str, user) -> DjangoAssistant:
         """
         Retrieves an Assistant from OpenAI and updates the Django database.
@@ -151,6 +157,7 @@ class AssistantIntegrationService:
             django_assistant.metadata = assistant_pydantic.metadata
             django_assistant.save()
             logger.info(f"Assistant updated in Django DB: {django_assistant.id}")
+            assistant_cache.invalidate((user.pk, assistant_id))
             return django_assistant
         except ObjectDoesNotExist:
             logger.error(f"Assistant with ID {assistant_id} does not exist in Django DB.")
@@ -172,6 +179,7 @@ class AssistantIntegrationService:
             django_assistant = DjangoAssistant.objects.get(id=assistant_id, owner=user)
             django_assistant.delete()
             logger.info(f"Assistant deleted from Django DB: {assistant_id}")
+            assistant_cache.invalidate((user.pk, assistant_id))
             return result
         except ObjectDoesNotExist:
             logger.error(f"Assistant with ID {assistant_id} does not exist in Django DB.")
@@ -1,5 +1,6 @@
 import logging
 from typing import Any, Dict, List
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
@@ -7,9 +8,13 @@ from file_modules.services import FileService
 from file_modules.parameters import FileUploadParams
 from apps.assistant.models import File as DjangoFile
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
 
 logger = logging.getLogger(__name__)
 
+# Files retrieved from OpenAI, sparing the round trip on repeated reads
+file_cache = CacheAside('assistant:files', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class FileIntegrationService:
     def __init__(self, api_key: str):
         self.file_service = FileService(api_key=api_key)
@@ -66,6 +71,7 @@ class FileIntegrationService:
             logger.error(f"Error creating file: {e}")
             raise
 
+    @file_cache.cached(lambda self, file_id, user: (user.pk, file_id))
     def retrieve_file(self, file_id: str, user) -> DjangoFile:
         """
         Retrieves a File from OpenAI and updates the Django database.
@@ -104,6 +110,7 @@ class FileIntegrationService:
             django_file = DjangoFile.objects.get(id=file_id, owner=user)
             django_file.delete()
             logger.info(f"File deleted from Django DB: {file_id}")
+            file_cache.invalidate((user.pk, file_id))
             return result
 
         except ObjectDoesNotExist:
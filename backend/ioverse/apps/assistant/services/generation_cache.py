@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import caches
+import hashlib
+import json
+import logging
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+class GenerationCache:
+    """
+    Content-addressed cache of the task generations.
+
+    Entries are keyed on the generator kind, the system prompt version (a hash of its text,
+    so editing a prompt retires its entries), the normalized user prompt and the model.
+    Expiration and size bounds are those of the Django cache named by `GENERATION_CACHE`.
+    Hits and misses are counted in the same cache, so they are shared by the processes using it.
+    """
+    key_prefix = 'assistant:generation'
+
+    def __init__(self):
+        self.cache = caches[settings.GENERATION_CACHE]
+        self.timeout = settings.GENERATION_CACHE_TIMEOUT
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """
+        Folds the prompt variants that make no difference to the model:
+        Unicode compatibility forms and whitespace.
+        """
+        return " ".join(unicodedata.normalize("NFKC", prompt).split())
+
+    def make_key(self, kind, system_prompt, prompt, model):
+        system_prompt_version = hashlib.sha256(system_prompt.encode()).hexdigest()
+        content = json.dumps([kind, system_prompt_version, self.normalize_prompt(prompt), model])
+        return f"{self.key_prefix}:{hashlib.sha256(content.encode()).hexdigest()}"
+
+    def get_or_generate(self, kind, system_prompt, prompt, model, generate):
+        """
+        Returns the cached generation, or calls `generate` and caches its result.
+        Empty results (None) are not cached, nor are exceptions, so failures are retried.
+        """
+        key = self.make_key(kind, system_prompt, prompt, model)
+        result = self.cache.get(key)
+        if result is not None:
+            self.count('hits')
+            logger.debug(f"Generation cache hit for {kind}")
+            return result
+
+        self.count('misses')
+        result = generate()
+        if result is not None:
+            self.cache.set(key, result, self.timeout)
+        return result
+
+    def count(self, counter):
+        key = f"{self.key_prefix}:stats:{counter}"
+        # `add` is a no-op when the counter exists, then the increment is atomic on the backends supporting it
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key)
+        except ValueError:  # Evicted in between
+            self.cache.set(key, 1, timeout=None)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters along with the hit rate.
+        """
+        hits = self.cache.get(f"{self.key_prefix}:stats:hits", 0)
+        misses = self.cache.get(f"{self.key_prefix}:stats:misses", 0)
+        requests = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / requests if requests else 0.0,
+        }
@@ -2,6 +2,7 @@ from chatbot_modules.core.chatbot import Chatbot
 from chatbot_modules.services.openai_service import OpenAIService
 from chatbot_modules.core.chat_logic_service import ChatLogicService
 from chatbot_modules.exceptions import MessageLengthException
+from .generation_cache import GenerationCache
 from pydantic import BaseModel, Field
 from typing import Dict, Optional, Union, List
 from typing_extensions import Literal
@@ -82,12 +83,17 @@ class TaskGeneratorService:
     - System Instruction for a gpt model
     - Function tool for Assistant API ( compatible also with Chat Completions API )
     - Json Schema response format for Assistant API ( compatible also with Chat Completions API )
+
+    Generations are cached, so resubmitting the same prompt doesn't call the model again.
     """
+    structured_output_model = "gpt-4o-2024-08-06"
+
     def __init__(self, api_key: str) -> None:
         """
         Initializes a Chatbot instance for task generation.
         
         - Default model: chatgpt-4o-latest
+        - Structured outputs model: gpt-4o-2024-08-06
         """
         openai_service = OpenAIService(api_key=api_key)
         chat_logic_service = ChatLogicService()
@@ -97,6 +103,7 @@ class TaskGeneratorService:
             chat_logic=chat_logic_service,
             model="chatgpt-4o-latest",
         )
+        self.generation_cache = GenerationCache()
     
     def generate_system_instructions(self, prompt):
         """
@@ -117,7 +124,10 @@ class TaskGeneratorService:
             "Always prioritize direct, unambiguous language to make the instructions actionable and effective."
         )
         self.chatbot.reset(system_instructions=sys_instructions)
-        return self.chatbot.get_response(prompt)
+        return self.generation_cache.get_or_generate(
+            "system_instructions", sys_instructions, prompt, self.chatbot.model,
+            lambda: self.chatbot.get_response(prompt)
+        )
 
     def generate_function_tool(self, prompt):
         """
@@ -175,13 +185,21 @@ class TaskGeneratorService:
             "Generate the function definition accordingly."
         )
         self.chatbot.reset(system_instructions=sys_instructions)
-        try:
+
+        def generate():
             function_definition = self.chatbot.get_structured_output(
                 prompt=prompt,
-                response_format=Function
+                response_format=Function,
+                model=self.structured_output_model
+            )
+            return function_definition.model_dump(exclude_none=True) if function_definition else None
+
+        try:
+            function_definition = self.generation_cache.get_or_generate(
+                "function_tool", sys_instructions, prompt, self.structured_output_model, generate
             )
             if function_definition:
-                return function_definition.model_dump(exclude_none=True)
+                return function_definition
             else:
                 logger.error("Failed to generate function definition.")
                 return None
@@ -284,13 +302,21 @@ class TaskGeneratorService:
             "Generate the schema definition accordingly."
         )
         self.chatbot.reset(system_instructions=sys_instructions)
-        try:
+
+        def generate():
             schema_definition = self.chatbot.get_structured_output(
                 prompt=prompt,
-                response_format=ResponseFormat
+                response_format=ResponseFormat,
+                model=self.structured_output_model
+            )
+            return schema_definition.model_dump(exclude_none=True, by_alias=True) if schema_definition else None
+
+        try:
+            schema_definition = self.generation_cache.get_or_generate(
+                "schema", sys_instructions, prompt, self.structured_output_model, generate
             )
             if schema_definition:
-                return schema_definition.model_dump(exclude_none=True, by_alias=True)
+                return schema_definition
             else:
                 logger.error("Failed to generate response format schema..")
                 return None
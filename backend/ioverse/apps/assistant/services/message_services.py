@@ -1,6 +1,7 @@
 import logging
 from typing import Any, Dict, List, Optional
 
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -12,9 +13,13 @@ from assistant_modules.message.parameters import (
 from apps.assistant.models import Message as DjangoMessage
 from ..helpers import serialize_pydantic_list
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
 
 logger = logging.getLogger(__name__)
 
+# Messages retrieved from OpenAI, sparing the round trip on repeated reads
+message_cache = CacheAside('assistant:messages', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class MessageIntegrationService:
     def __init__(self, api_key: str):
         self.message_service = MessageService(api_key=api_key)
@@ -61,6 +66,7 @@ class MessageIntegrationService:
             logger.error(f"Error creating message: {e}")
             raise
 
+    @message_cache.cached(lambda self, thread_id, message_id, user: (user.pk, thread_id, message_id))
     def retrieve_message(self, thread_id: str, message_id: str, user) -> DjangoMessage:
         """
         Retrieves a Message from OpenAI and updates the Django database.
@@ -135,6 +141,7 @@ class MessageIntegrationService:
             django_message.save()
             
             logger.info(f"Message updated in Django DB: {django_message.id}")
+            message_cache.invalidate((user.pk, thread_id, message_id))
             return django_message
 
         except ObjectDoesNotExist:
@@ -161,6 +168,7 @@ class MessageIntegrationService:
             django_message.delete()
             
             logger.info(f"Message deleted from Django DB: {message_id}")
+            message_cache.invalidate((user.pk, thread_id, message_id))
             return result
 
         except ObjectDoesNotExist:
@@ -1,6 +1,7 @@
 import logging
 from typing import Any, Dict
 
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -10,9 +11,13 @@ from assistant_modules.thread.parameters import ThreadCreateParams, ThreadUpdate
 from assistant_modules.thread.exceptions import ThreadNotFoundException
 from apps.assistant.models import Thread as DjangoThread
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
 
 logger = logging.getLogger(__name__)
 
+# Threads retrieved from OpenAI, sparing the round trip on repeated reads
+thread_cache = CacheAside('assistant:threads', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class ThreadIntegrationService:
     def __init__(self, api_key: str):
         self.thread_service = ThreadService(api_key=api_key)
@@ -51,6 +56,7 @@ class ThreadIntegrationService:
             logger.error(f"Error creating thread: {e}")
             raise
 
+    @thread_cache.cached(lambda self, thread_id, user: (user.pk, thread_id))
     def retrieve_thread(self, thread_id: str, user) -> DjangoThread:
         """
         Retrieves a Thread from OpenAI and updates the Django database.
@@ -129,6 +135,7 @@ class ThreadIntegrationService:
             django_thread.metadata=thread_pydantic.metadata
             django_thread.save()
             logger.info(f"Thread updated in Django DB: {django_thread.id}")
+            thread_cache.invalidate((user.pk, thread_id))
             return django_thread
         except ObjectDoesNotExist:
             logger.error(f"Thread with ID {thread_id} does not exist in Django DB.")
@@ -150,6 +157,7 @@ class ThreadIntegrationService:
             django_thread = DjangoThread.objects.get(id=thread_id, owner=user)
             django_thread.delete()
             logger.info(f"Thread deleted from Django DB: {thread_id}")
+            thread_cache.invalidate((user.pk, thread_id))
             return result
         except ObjectDoesNotExist:
             logger.error(f"Thread with ID {thread_id} does not exist in Django DB.")
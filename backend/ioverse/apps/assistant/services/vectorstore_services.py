@@ -2,6 +2,7 @@ import logging
 import time
 from typing import Any, Dict, List, Optional
 
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 from django.urls import reverse
@@ -14,9 +15,14 @@ from assistant_modules.vector_store.parameters import (
 from apps.assistant.models import VectorStore as DjangoVectorStore
 from ..helpers import serialize_pydantic_model
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
 
 logger = logging.getLogger(__name__)
 
+# Vector stores retrieved from OpenAI, sparing the round trip on repeated reads.
+# Those still being processed are not cached, as their status is polled
+vector_store_cache = CacheAside('assistant:vector-stores', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class VectorStoreIntegrationService:
     def __init__(self, api_key: str):
         self.vector_store_service = VectorStoreService(api_key=api_key)
@@ -76,6 +82,10 @@ class VectorStoreIntegrationService:
             logger.error(f"Error creating VectorStore: {e}")
             raise
 
+    @vector_store_cache.cached(
+        lambda self, vector_store_id, user: (user.pk, vector_store_id),
+        cacheable=lambda vector_store: vector_store.status == 'completed'
+    )
     def retrieve_vector_store(self, vector_store_id: str, user) -> DjangoVectorStore:
         """
         Retrieves a VectorStore from OpenAI and updates the Django database.
@@ -141,6 +151,7 @@ class VectorStoreIntegrationService:
             django_vector_store.save()
             
             logger.info(f"VectorStore updated in Django DB: {django_vector_store.id}")
+            vector_store_cache.invalidate((user.pk, vector_store_id))
             return django_vector_store
 
         except ObjectDoesNotExist:
@@ -167,6 +178,7 @@ class VectorStoreIntegrationService:
             django_vector_store.delete()
             
             logger.info(f"VectorStore deleted from Django DB: {vector_store_id}")
+            vector_store_cache.invalidate((user.pk, vector_store_id))
             return result
 
         except ObjectDoesNotExist:
@@ -9,6 +9,7 @@ from assistant_modules.vector_store.parameters import (
     VectorStoreFileBatchCreateParams,
 )
 from pydantic import ValidationError
+from .vectorstore_services import vector_store_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ class VectorStoreBatchIntegrationService:
     def __init__(self, api_key: str):
         self.vector_store_service = VectorStoreService(api_key=api_key)
         
-    def create_vector_store_batch(self, vector_store_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_vector_store_batch(self, vector_store_id: str, data: Dict[str, Any], user) -> Dict[str, Any]:
         """
         Creates a Vector Store Batch in OpenAI.
         """
@@ -34,6 +35,8 @@ class VectorStoreBatchIntegrationService:
             )
 
             logger.info(f"Vector Store Batch created: {batch.id}")
+            # The file counts of the vector store change
+            vector_store_cache.invalidate((user.pk, vector_store_id))
             return batch.model_dump()
 
         except ValidationError as ve:
@@ -43,13 +46,14 @@ class VectorStoreBatchIntegrationService:
             logger.error(f"Error creating Vector Store Batch: {e}")
             raise
         
-    def poll_vector_store_batch_status(self, vector_store_id: str, batch_id: str, polling_interval=5, timeout=300):
+    def poll_vector_store_batch_status(self, vector_store_id: str, batch_id: str, user, polling_interval=5, timeout=300):
         """
         Polls the status of a vector store batch operation.
 
         Args:
             vector_store_id (str): The ID of the vector store hosting the batch.
             batch_id (str): The ID of the batch to poll.
+            user: The owner of the vector store, whose cached vector store is dropped as the batch progresses.
             polling_interval (int): Time (in seconds) to wait between polls.
             timeout (int): Maximum time (in seconds) to poll before giving up.
 
@@ -66,6 +70,8 @@ class VectorStoreBatchIntegrationService:
             try:
                 # Poll vector store status
                 vector_store_batch_pydantic = self.vector_store_service.retrieve_vector_store_file_batch(vector_store_id, batch_id)
+                # The file counts of the vector store change while the files are processed
+                vector_store_cache.invalidate((user.pk, vector_store_id))
                 
                 # If completed, update Django model
                 if vector_store_batch_pydantic.status == "completed":
@@ -1,6 +1,7 @@
 import logging
 from typing import Any, Dict, List, Optional
 
+from django.conf import settings
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -10,9 +11,15 @@ from assistant_modules.vector_store.parameters import (
 )
 from apps.assistant.models import VectorStoreFile as DjangoVectorStoreFile
 from pydantic import ValidationError
+from ioverse.cache import CacheAside
+from .vectorstore_services import vector_store_cache
 
 logger = logging.getLogger(__name__)
 
+# Vector store files retrieved from OpenAI, sparing the round trip on repeated reads.
+# Those still being processed are not cached, as their status is polled
+vector_store_file_cache = CacheAside('assistant:vector-store-files', timeout=settings.INTEGRATION_CACHE_TIMEOUT)
+
 class VectorStoreFileIntegrationService:
     def __init__(self, api_key: str):
         self.vector_store_file_service = VectorStoreService(api_key=api_key)
@@ -41,6 +48,8 @@ class VectorStoreFileIntegrationService:
                 owner=user
             )
             logger.info(f"VectorStoreFile created in Django DB: {django_vector_store_file.id}")
+            # The file counts of the vector store change
+            vector_store_cache.invalidate((user.pk, django_vector_store_file.vector_store_id))
             return django_vector_store_file
 
         except ValidationError as ve:
@@ -50,6 +59,10 @@ class VectorStoreFileIntegrationService:
             logger.error(f"Error creating VectorStore: {e}")
             raise
 
+    @vector_store_file_cache.cached(
+        lambda self, vector_store_file_id, user: (user.pk, vector_store_file_id),
+        cacheable=lambda vector_store_file: vector_store_file.status == 'completed'
+    )
     def retrieve_vector_store_file(self, vector_store_file_id: str, user) -> DjangoVectorStoreFile:
         """
         Retrieves a VectorStoreFile from OpenAI and updates the Django database.
@@ -93,6 +106,8 @@ class VectorStoreFileIntegrationService:
             django_vector_store_file.delete()
             
             logger.info(f"VectorStoreFile deleted from Django DB: {vector_store_file_id}")
+            vector_store_file_cache.invalidate((user.pk, vector_store_file_id))
+            vector_store_cache.invalidate((user.pk, django_vector_store_file.vector_store_id))
             return result
 
         except ObjectDoesNotExist:
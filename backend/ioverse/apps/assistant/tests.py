@@ -1,5 +1,13 @@
 from django.test import TestCase
+from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from unittest.mock import patch
+from apps.assistant.services.generation_service import TaskGeneratorService
+from apps.assistant.services.vectorstore_services import vector_store_cache
+from apps.assistant.services.vectorstorebatch_services import VectorStoreBatchIntegrationService
+from apps.assistant.services.vectorstorefile_services import VectorStoreFileIntegrationService
 from apps.assistant.models.assistant import Assistant
 from apps.assistant.models.thread import Thread
 from apps.assistant.models.message import Message
@@ -281,3 +289,62 @@ class VectorStoreFileModelTest(TestCase):
         )
         with self.assertRaises(ValidationError):
             vector_store_file.full_clean()
+
+class TaskGenerationCacheTest(TestCase):
+    def setUp(self):
+        caches[settings.GENERATION_CACHE].clear()
+        self.service = TaskGeneratorService(api_key="test_api_key")
+
+    @patch('apps.assistant.services.generation_service.Chatbot.get_response')
+    def test_repeated_prompt_is_served_from_cache(self, mock_get_response):
+        mock_get_response.return_value = "You are a helpful assistant."
+        first = self.service.generate_system_instructions("A helpful  assistant")
+        second = self.service.generate_system_instructions(" A helpful assistant\n")
+        self.assertEqual(first, second)
+        mock_get_response.assert_called_once()
+        self.assertEqual(self.service.generation_cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    @patch('apps.assistant.services.generation_service.Chatbot.get_response')
+    def test_kinds_are_cached_separately(self, mock_get_response):
+        mock_get_response.return_value = "You are a helpful assistant."
+        self.service.generate_system_instructions("A helpful assistant")
+        with patch('apps.assistant.services.generation_service.Chatbot.get_structured_output') as mock_structured_output:
+            mock_structured_output.return_value = None
+            self.service.generate_schema("A helpful assistant")
+            mock_structured_output.assert_called_once()
+
+    @patch('apps.assistant.services.generation_service.Chatbot.get_structured_output')
+    def test_failed_generation_is_not_cached(self, mock_structured_output):
+        mock_structured_output.return_value = None
+        self.assertIsNone(self.service.generate_function_tool("Add two numbers"))
+        self.assertIsNone(self.service.generate_function_tool("Add two numbers"))
+        self.assertEqual(mock_structured_output.call_count, 2)
+
+class VectorStoreCacheInvalidationTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='testpass')
+        self.key = vector_store_cache.make_key((self.user.pk, 'vs_1'))
+        vector_store_cache.cache.set(self.key, 'cached vector store')
+
+    def assertInvalidated(self):
+        self.assertIsNone(vector_store_cache.cache.get(self.key))
+
+    @patch('apps.assistant.services.vectorstorefile_services.VectorStoreService')
+    def test_file_deletion_invalidates_the_vector_store(self, mock_service):
+        mock_service.return_value.delete_vector_store_file.return_value = {'deleted': True}
+        VectorStoreFile.objects.create(
+            id='file_1', owner=self.user, vector_store_id='vs_1', usage_bytes=0, status='completed',
+            chunking_strategy={'type': 'auto'}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            VectorStoreFileIntegrationService(api_key='test_api_key').delete_vector_store_file('file_1', self.user)
+        self.assertInvalidated()
+
+    @patch('apps.assistant.services.vectorstorebatch_services.reverse', return_value='/status')
+    @patch('apps.assistant.services.vectorstorebatch_services.VectorStoreService')
+    def test_batch_creation_invalidates_the_vector_store(self, mock_service, mock_reverse):
+        with self.captureOnCommitCallbacks(execute=True):
+            VectorStoreBatchIntegrationService(api_key='test_api_key').create_vector_store_batch(
+                'vs_1', {'vector_store_id': 'vs_1', 'file_ids': ['file_1']}, self.user
+            )
+        self.assertInvalidated()
@@ -35,7 +35,7 @@ class VectorStoreBacthCreateView(VectorStoreBatchBaseView):
             
             try:
                 vector_store_id = input_serializer.validated_data.get("vector_store_id")
-                response = service.create_vector_store_batch(vector_store_id, input_serializer.validated_data)
+                response = service.create_vector_store_batch(vector_store_id, input_serializer.validated_data, request.user)
                 
                 response["sse_url"] = request.build_absolute_uri(response["sse_url"])
                 output_serializer = VectorStoreBatchSerializer(response)
@@ -68,6 +68,7 @@ class VectorStoreBatchStatusStreamView(APIView):
             for update in service.poll_vector_store_batch_status(
                 vector_store_id=vector_store_id,
                 batch_id=batch_id,
+                user=request.user,
                 polling_interval=self.polling_interval,
                 timeout=self.timeout,
             ):
@@ -30,8 +30,8 @@ class ConversationAdmin(admin.ModelAdmin):
     )
 
 class MessageAdmin(admin.ModelAdmin):
-    list_display = ('id', 'conversation', 'sender', 'short_message_body', 'timestamp')
-    list_filter = ('sender', 'timestamp')
+    list_display = ('id', 'conversation', 'sender', 'short_message_body', 'status', 'timestamp')
+    list_filter = ('sender', 'status', 'timestamp')
     search_fields = ('message_body', 'conversation__title', 'conversation__user__username')
     readonly_fields = ('timestamp',)
     ordering = ('-timestamp',)
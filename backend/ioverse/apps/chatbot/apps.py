@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ChatbotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.chatbot'
+
+    def ready(self):
+        # Register the signal handlers keeping the chat history cache in sync
+        from . import signals  # noqa: F401
@@ -0,0 +1,97 @@
+import json
+from types import SimpleNamespace
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .serializers import MessageSerializer, serialize_stream_event
+from .services.async_chat_service import AsyncChatService
+from .services.events import user_group_name
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChatStreamingConsumer(AsyncWebsocketConsumer):
+    """
+    Streams chatbot responses over WebSocket.
+    Expects {"message_body": ..., "conversation_id": ...} and replies with
+    the same 'start', 'chunk', 'end' and 'error' events of the SSE endpoint.
+    """
+    async def connect(self):
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        pass
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send(text_data=json.dumps({"type": "error", "message": "Invalid JSON"}))
+            return
+
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.send(text_data=json.dumps({"type": "error", "message": "Authentication required"}))
+            return
+
+        api_key = getattr(user, 'api_key', None)
+        if not api_key:
+            await self.send(text_data=json.dumps({"type": "error", "message": "API key not found"}))
+            return
+
+        serializer = await self.validate(data, user)
+        if serializer.errors:
+            await self.send(text_data=json.dumps({"type": "error", "message": serializer.errors}))
+            return
+
+        await self.stream_chat_response(api_key, user, serializer.validated_data)
+
+    async def stream_chat_response(self, api_key, user, validated_data):
+        chat_service = AsyncChatService(api_key=api_key)
+        events = chat_service.stream_user_message(
+            user=user,
+            message_body=validated_data['message_body'],
+            conversation_id=validated_data.get('conversation_id')
+        )
+        try:
+            async for event_type, payload in events:
+                await self.send(text_data=json.dumps(serialize_stream_event(event_type, payload)))
+        except Exception as e:
+            logger.exception(f"Unexpected error during message streaming: {e}")
+            await self.send(text_data=json.dumps({"type": "error", "message": "An unexpected error occurred."}))
+        finally:
+            await events.aclose()
+
+    @database_sync_to_async
+    def validate(self, data, user):
+        """
+        Validates the incoming message the same way the HTTP endpoints do.
+        """
+        serializer = MessageSerializer(data=data, context={'request': SimpleNamespace(user=user)})
+        serializer.is_valid()
+        return serializer
+
+class ChatEventsConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes the chatbot events of the connected user, such as
+    {"type": "title", "data": {"id": ..., "title": ...}} once a conversation title is generated.
+    """
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def conversation_title(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "title",
+            "data": {"id": event["conversation_id"], "title": event["title"]}
+        }))
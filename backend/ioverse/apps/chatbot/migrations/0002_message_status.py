@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed')], default='completed', help_text='Pending while the user message is awaiting the AI response.', max_length=10, verbose_name='Status'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0002_message_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='token_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Tokens taken by the message in the model context, counted once and reused.', null=True, verbose_name='Token Count'),
+        ),
+    ]
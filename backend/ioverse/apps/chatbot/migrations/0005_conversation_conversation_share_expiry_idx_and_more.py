@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_conversation_conversation_user_created_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(condition=models.Q(('is_shared', True)), fields=['expires_at'], name='conversation_share_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['timestamp'], name='message_pending_time_idx'),
+        ),
+    ]
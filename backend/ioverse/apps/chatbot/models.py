@@ -58,12 +58,22 @@ class Conversation(models.Model):
         ordering = ['-created_at']
         verbose_name = "Conversation"
         verbose_name_plural = "Conversations"
+        indexes = [
+            # Keyset pagination of the conversations of a user
+            models.Index(fields=['user', 'created_at', 'id'], name='conversation_user_created_idx'),
+            # Sweep of the expired shares, see `unshare_expired_conversations`
+            models.Index(fields=['expires_at'], condition=models.Q(is_shared=True), name='conversation_share_expiry_idx'),
+        ]
 
 class Message(models.Model):
     SENDER_CHOICES = (
         ('user', 'User'),
         ('ai', 'AI'),  # Capitalized "AI" for consistency
     )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+    )
     
     conversation = models.ForeignKey(
         Conversation,
@@ -87,6 +97,19 @@ class Message(models.Model):
         verbose_name="Timestamp",
         help_text="The date and time when the message was created."
     )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='completed',
+        verbose_name="Status",
+        help_text="Pending while the user message is awaiting the AI response."
+    )
+    token_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Token Count",
+        help_text="Tokens taken by the message in the model context, counted once and reused."
+    )
     
     def __str__(self):
         """
@@ -105,3 +128,9 @@ class Message(models.Model):
         ordering = ['timestamp']
         verbose_name = "Message"
         verbose_name_plural = "Messages"
+        indexes = [
+            # Keyset pagination of the messages of a conversation
+            models.Index(fields=['conversation', 'timestamp', 'id'], name='message_conversation_time_idx'),
+            # Sweep of the orphaned turns, see `discard_orphaned_turns`
+            models.Index(fields=['timestamp'], condition=models.Q(status='pending'), name='message_pending_time_idx'),
+        ]
@@ -0,0 +1,12 @@
+from ioverse.pagination import KeysetPagination
+
+class MessageCursorPagination(KeysetPagination):
+    """
+    Pages through the messages of a conversation from the most recent,
+    so that the chat loads its last messages first and older ones while scrolling up.
+    """
+    ordering = ('-timestamp', '-id')
+
+class ConversationCursorPagination(KeysetPagination):
+    page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,34 @@
+from rest_framework.renderers import BaseRenderer
+import json
+
+class ExportRenderer(BaseRenderer):
+    """
+    Base renderer of the conversation exports.
+
+    Exports are streamed by the views, so the renderers only make their `format`
+    acceptable to the content negotiation (`?format=`), and render the error payloads as JSON,
+    under the JSON content type rather than the one of the export.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, bytes):
+            return data
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return json.dumps(data).encode(self.charset)
+
+class MarkdownRenderer(ExportRenderer):
+    media_type = 'text/markdown'
+    format = 'markdown'
+
+class JSONLinesRenderer(ExportRenderer):
+    media_type = 'application/jsonl'
+    format = 'jsonl'
+
+class HTMLExportRenderer(ExportRenderer):
+    media_type = 'text/html'
+    format = 'html'
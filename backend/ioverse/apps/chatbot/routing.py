@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    path("ws/chatbot/stream", consumers.ChatStreamingConsumer.as_asgi()),
+    path("ws/chatbot/events", consumers.ChatEventsConsumer.as_asgi()),
+]
@@ -54,12 +54,27 @@ class MessageSerializer(serializers.ModelSerializer):
         return cleaned_content
     
 class ReadOnlyConversationSerializer(serializers.ModelSerializer):
+    """
+    Conversation details. The messages are not embedded but paginated
+    separately, and `message_count` is annotated on the queryset (see `ConversationViewSet`).
+    """
     user_username = serializers.CharField(source='user.username', read_only=True)
-    messages = MessageSerializer(many=True, read_only=True)
+    message_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Conversation
-        fields = ['id', 'title', 'user_username', 'created_at', 'updated_at', 'messages', 'share_token', 'is_shared', 'shared_at', 'expires_at']
+        fields = ['id', 'title', 'user_username', 'created_at', 'updated_at', 'message_count', 'share_token', 'is_shared', 'shared_at', 'expires_at']
+        read_only_fields = fields
+
+class ConversationListSerializer(ReadOnlyConversationSerializer):
+    """
+    Conversation summary for the sidebar, with a preview of the last message
+    annotated on the queryset instead of the messages themselves.
+    """
+    last_message = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta(ReadOnlyConversationSerializer.Meta):
+        fields = ReadOnlyConversationSerializer.Meta.fields + ['last_message']
         read_only_fields = fields
 
 class SharedConversationSerializer(serializers.ModelSerializer):
@@ -68,3 +83,12 @@ class SharedConversationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Conversation
         fields = ['title', 'messages']
+
+def serialize_stream_event(event_type, payload):
+    """
+    Converts an event yielded by `ChatService.stream_user_message` into a JSON-serializable dict.
+    Chunks carry the text delta, while 'start' and 'end' carry the saved message.
+    """
+    if event_type == 'chunk':
+        return {'type': event_type, 'message': payload}
+    return {'type': event_type, 'data': MessageSerializer(payload).data}
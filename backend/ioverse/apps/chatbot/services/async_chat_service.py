@@ -0,0 +1,142 @@
+from asgiref.sync import sync_to_async
+from ..models import Conversation, Message
+from chatbot_modules.core.chatbot import AsyncChatbot
+from chatbot_modules.services.openai_service import AsyncOpenAIService
+from ..tasks import generate_conversation_title
+from .chat_service import ChatService, run_title_generation, title_generation_deferred
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Title generations running on the event loop, referenced until done so that they aren't garbage collected
+background_tasks = set()
+
+class AsyncChatService:
+    """
+    Asynchronous counterpart of `ChatService` for the ASGI stack.
+
+    The AI service call is awaited, so no thread is held while the model answers.
+    Reads and single writes go through the async ORM, while the completion of a turn,
+    which must be atomic, runs the synchronous `ChatService.complete_turn` in a worker thread.
+    """
+    def __init__(self, api_key: str):
+        self.chat_service = ChatService(api_key=api_key)
+        self.ai_service = AsyncOpenAIService(api_key=api_key)
+        self.chat_logic = self.chat_service.chat_logic
+        self.context_window = self.chat_service.context_window
+        self.history_cache = self.chat_service.history_cache
+
+    async def process_user_message(self, user, message_body, conversation_id=None):
+        conversation, user_message, history, token_counts = await self.begin_turn(user, message_body, conversation_id)
+
+        try:
+            chatbot = self.create_chatbot(history, token_counts)
+            ai_response_text = await chatbot.get_response(user_message.message_body)
+        except Exception:
+            await self.discard_turn(conversation, user_message, is_new_conversation=not conversation_id)
+            raise
+
+        ai_message = await self.complete_turn(conversation, user_message, ai_response_text, is_new_conversation=not conversation_id)
+        return user_message, ai_message
+
+    async def stream_user_message(self, user, message_body, conversation_id=None):
+        """
+        Yields the same ('start', 'chunk', 'end') events of `ChatService.stream_user_message`.
+        If the stream fails or the consumer closes the generator, the pending turn is discarded.
+        """
+        conversation, user_message, history, token_counts = await self.begin_turn(user, message_body, conversation_id)
+
+        yield 'start', user_message
+
+        chatbot = self.create_chatbot(history, token_counts)
+        completed = False
+        try:
+            chunks = []
+            async for chunk in chatbot.stream_response(user_message.message_body):
+                chunks.append(chunk)
+                yield 'chunk', chunk
+
+            ai_message = await self.complete_turn(conversation, user_message, "".join(chunks), is_new_conversation=not conversation_id)
+            completed = True
+        finally:
+            if not completed:
+                logger.warning(f"Stream interrupted, discarding turn of conversation {conversation.id}")
+                await self.discard_turn(conversation, user_message, is_new_conversation=not conversation_id)
+
+        yield 'end', ai_message
+
+    async def begin_turn(self, user, message_body, conversation_id=None):
+        """
+        Saves the user message as pending and reconstructs the chat history.
+        A conversation left without messages by a failure in between is removed by `discard_orphaned_turns`.
+        """
+        conversation = await self.get_or_create_conversation(user, conversation_id, message_body)
+
+        user_message = await Message.objects.acreate(
+            conversation=conversation,
+            sender='user',
+            message_body=message_body,
+            status='pending',
+            token_count=self.chat_service.count_tokens(message_body)
+        )
+
+        history, token_counts = await self.build_chat_context(conversation)
+        return conversation, user_message, history, token_counts + [user_message.token_count]
+
+    async def complete_turn(self, conversation, user_message, ai_response_text, is_new_conversation=False):
+        ai_message = await sync_to_async(self.chat_service.complete_turn)(
+            conversation, user_message, ai_response_text, is_new_conversation=is_new_conversation, schedule_title=False
+        )
+        if is_new_conversation:
+            await self.schedule_title(conversation)
+        return ai_message
+
+    async def schedule_title(self, conversation):
+        """
+        Starts the generation of the title of a new conversation, whose turn is committed,
+        without delaying the reply: by a worker when a broker is configured, as a task of the event loop otherwise.
+        """
+        if title_generation_deferred():
+            await sync_to_async(generate_conversation_title.delay)(conversation.id, conversation.title)
+            return
+        task = asyncio.create_task(
+            sync_to_async(run_title_generation, thread_sensitive=False)(conversation.id, conversation.title)
+        )
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    async def discard_turn(self, conversation, user_message, is_new_conversation=False):
+        if is_new_conversation:
+            await conversation.adelete()
+        else:
+            await user_message.adelete()
+
+    async def get_or_create_conversation(self, user, conversation_id, first_message):
+        if conversation_id:
+            conversation = await Conversation.objects.aget(id=conversation_id, user=user)
+            logger.debug(f"Found existing conversation: {conversation.id} for user: {user.username}")
+        else:
+            title = self.chat_service.make_placeholder_title(first_message)
+            conversation = await Conversation.objects.acreate(user=user, title=title)
+            logger.debug(f"Created new conversation: {conversation.id} for user: {user.username}")
+        return conversation
+
+    async def build_chat_context(self, conversation):
+        history = self.chat_logic.prepare_initial_history()
+        token_counts = [None] * len(history)
+        for sender, content, token_count in await self.history_cache.aget(conversation.id):
+            role = 'user' if sender == 'user' else 'assistant'
+            history.append({'role': role, 'content': content})
+            token_counts.append(token_count)
+        return history, token_counts
+
+    def create_chatbot(self, history, token_counts):
+        return AsyncChatbot(
+            self.ai_service,
+            self.chat_logic,
+            model=self.chat_service.model,
+            history=history,
+            context_window=self.context_window,
+            token_counts=token_counts
+        )
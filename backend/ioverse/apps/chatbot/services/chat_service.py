@@ -1,28 +1,106 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import connections, transaction
 from ..models import Conversation, Message
 from chatbot_modules.core.chatbot import Chatbot
 from chatbot_modules.services.openai_service import OpenAIService
 from chatbot_modules.core.chat_logic_service import ChatLogicService
+from chatbot_modules.core.context_window import ContextWindowManager
+from .history_cache import ChatHistoryCache
+from ..tasks import generate_conversation_title
+from typing import Optional
 import logging
+import threading
 
-from openai import OpenAI
+from client_modules.registry import get_client
 
 logger = logging.getLogger(__name__)
 
+def title_generation_deferred():
+    """
+    Whether the titles are generated by a worker: without a broker the tasks run eagerly,
+    inline, and would delay the reply by the title request.
+    """
+    return not settings.CELERY_TASK_ALWAYS_EAGER
+
+def run_title_generation(conversation_id, placeholder_title):
+    """
+    Runs the title task in the current thread, outside of any request, then closes its database connections.
+    """
+    try:
+        generate_conversation_title(conversation_id, placeholder_title)
+    except Exception as e:
+        logger.error(f"Title generation of conversation {conversation_id} failed: {e}")
+    finally:
+        connections.close_all()
+
 class ChatService:
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
         self.ai_service = OpenAIService(api_key=api_key)
         self.chat_logic = ChatLogicService()
+        self.model = settings.CHATBOT_MODEL
+        self.context_window = ContextWindowManager(self.model, budgets=settings.CHATBOT_CONTEXT_BUDGETS)
+        self.history_cache = ChatHistoryCache(token_counter=self.context_window.counter)
 
     def process_user_message(self, user, message_body, conversation_id=None):
         """
-        Handles processing of a user message:
-        - Saves the message.
-        - Retrieves or creates the conversation.
-        - Reconstructs chat history.
-        - Gets AI response.
-        - Saves AI message.
+        Handles processing of a user message in two short transactions,
+        so that no transaction is held during the AI service call:
+        - Retrieves or creates the conversation and saves the user message as pending.
+        - Reconstructs chat history and gets AI response.
+        - Saves AI message and completes the turn.
+        
+        If the AI service call fails, the pending turn is discarded.
+        """
+        conversation, user_message, history, token_counts = self.begin_turn(user, message_body, conversation_id)
+
+        try:
+            # Create Chatbot instance
+            chatbot = self.create_chatbot(history, token_counts)
+
+            # Get AI response
+            ai_response_text = chatbot.get_response(user_message.message_body)
+        except Exception:
+            self.discard_turn(conversation, user_message, is_new_conversation=not conversation_id)
+            raise
+
+        ai_message = self.complete_turn(conversation, user_message, ai_response_text, is_new_conversation=not conversation_id)
+        return user_message, ai_message
+
+    def stream_user_message(self, user, message_body, conversation_id=None):
+        """
+        Streaming counterpart of `process_user_message`:
+        - Yields ('start', user_message) once the pending turn is saved.
+        - Yields ('chunk', text) for every delta received.
+        - Yields ('end', ai_message) once the AI message is saved.
+
+        If the stream fails or the consumer stops iterating, the pending turn is discarded.
+        """
+        conversation, user_message, history, token_counts = self.begin_turn(user, message_body, conversation_id)
+
+        yield 'start', user_message
+
+        chatbot = self.create_chatbot(history, token_counts)
+        completed = False
+        try:
+            chunks = []
+            for chunk in chatbot.stream_response(user_message.message_body):
+                chunks.append(chunk)
+                yield 'chunk', chunk
+
+            ai_message = self.complete_turn(conversation, user_message, "".join(chunks), is_new_conversation=not conversation_id)
+            completed = True
+        finally:
+            if not completed:
+                logger.warning(f"Stream interrupted, discarding turn of conversation {conversation.id}")
+                self.discard_turn(conversation, user_message, is_new_conversation=not conversation_id)
+
+        yield 'end', ai_message
+
+    def begin_turn(self, user, message_body, conversation_id=None):
+        """
+        First phase of a turn: saves the user message as pending and 
+        reconstructs the chat history of the completed messages, along with their token counts.
         """
         with transaction.atomic():
             # Retrieve or create conversation
@@ -32,51 +110,128 @@ class ChatService:
             user_message = Message.objects.create(
                 conversation=conversation,
                 sender='user',
-                message_body=message_body
+                message_body=message_body,
+                status='pending',
+                token_count=self.count_tokens(message_body)
             )
 
-            # Reconstruct chat history
-            history = self.build_chat_history(conversation)
-
-            # Create Chatbot instance
-            chatbot = Chatbot(self.ai_service, self.chat_logic, history=history)
-
-            # Get AI response
-            ai_response_text = chatbot.get_response(user_message.message_body)
+        # Reconstruct chat history (the Chatbot appends the pending prompt itself)
+        history, token_counts = self.build_chat_context(conversation)
+        return conversation, user_message, history, token_counts + [user_message.token_count]
 
-            # Save AI message
+    def complete_turn(self, conversation, user_message, ai_response_text, is_new_conversation=False, schedule_title=True):
+        """
+        Last phase of a turn: saves the AI message, marks the user message
+        as completed and updates the conversation.
+        The title of a new conversation is generated in background once the turn is committed,
+        unless `schedule_title` is False (the async service schedules it on the event loop).
+        """
+        with transaction.atomic():
             ai_message = Message.objects.create(
                 conversation=conversation,
                 sender='ai',
-                message_body=ai_response_text
+                message_body=ai_response_text,
+                token_count=self.count_tokens(ai_response_text)
             )
+            
+            user_message.status = 'completed'
+            user_message.save(update_fields=["status"])
 
             # Update the conversation
             conversation.save(update_fields=["updated_at"])
-            
-        return user_message, ai_message
+
+            if is_new_conversation and schedule_title:
+                self.schedule_title(conversation)
+
+        # Extend the cached history with the exchange instead of rebuilding it
+        self.history_cache.append(
+            conversation.id,
+            [
+                (user_message.sender, user_message.message_body, user_message.token_count),
+                (ai_message.sender, ai_message.message_body, ai_message.token_count),
+            ],
+            expected_length=conversation.messages.filter(status='completed').count()
+        )
+        return ai_message
+
+    def schedule_title(self, conversation):
+        """
+        Generates the title of a new conversation once the turn is committed:
+        by a worker when a broker is configured, in a thread of this process otherwise.
+        """
+        conversation_id, placeholder_title = conversation.id, conversation.title
+        if title_generation_deferred():
+            transaction.on_commit(lambda: generate_conversation_title.delay(conversation_id, placeholder_title))
+        else:
+            transaction.on_commit(lambda: threading.Thread(
+                target=run_title_generation, args=(conversation_id, placeholder_title), daemon=True
+            ).start())
+
+    def discard_turn(self, conversation, user_message, is_new_conversation=False):
+        """
+        Removes a turn whose AI response could not be obtained, 
+        along with the conversation if it was created by this turn.
+        Turns left pending by an interrupted process are removed by `discard_orphaned_turns`.
+        """
+        if is_new_conversation:
+            conversation.delete()
+        else:
+            user_message.delete()
 
     def get_or_create_conversation(self, user, conversation_id, first_message):
         if conversation_id:
             conversation = Conversation.objects.get(id=conversation_id, user=user)
             logger.debug(f"Found existing conversation: {conversation.id} for user: {user.username}")
         else:
-            title = self.generate_conversation_title(first_message)
+            # Placeholder until the title is generated, see `complete_turn`
+            title = self.make_placeholder_title(first_message)
             conversation = Conversation.objects.create(user=user, title=title)
             logger.debug(f"Created new conversation: {conversation.id} for user: {user.username}")
         return conversation
 
     def build_chat_history(self, conversation):
-        # Reconstruct the chat history from the conversation messages
+        history, _ = self.build_chat_context(conversation)
+        return history
+
+    def build_chat_context(self, conversation):
+        """
+        Reconstructs the chat history from the cached turns of the conversation,
+        returning it with the token counts of its messages (None for the system message).
+        """
         history = self.chat_logic.prepare_initial_history()
-        messages = conversation.messages.order_by('timestamp')
-        for message in messages:
-            role = 'user' if message.sender == 'user' else 'assistant'
-            content = message.message_body
+        token_counts = [None] * len(history)
+        for sender, content, token_count in self.history_cache.get(conversation.id):
+            role = 'user' if sender == 'user' else 'assistant'
             history.append({'role': role, 'content': content})
-        return history
+            token_counts.append(token_count)
+        return history, token_counts
+
+    def create_chatbot(self, history, token_counts):
+        # The chatbot sends only the most recent part of the history fitting the model budget
+        return Chatbot(
+            self.ai_service,
+            self.chat_logic,
+            model=self.model,
+            history=history,
+            context_window=self.context_window,
+            token_counts=token_counts
+        )
+
+    def count_tokens(self, message_body):
+        return self.context_window.counter.count_message({'content': message_body})
+
+    def make_placeholder_title(self, first_message: str, max_length: int = 40) -> str:
+        """
+        Builds a title from the first message, cutting it at a word boundary.
+        """
+        text = " ".join(first_message.split())
+        if not text:
+            return "New Conversation"
+        if len(text) <= max_length:
+            return text
+        return text[:max_length].rsplit(" ", 1)[0].rstrip(",.;:") + "..."
 
-    def generate_conversation_title(self, first_message: str) -> str:
+    def generate_conversation_title(self, first_message: str) -> Optional[str]:
         """
         Generates a title for the conversation based on the first message
 
@@ -84,7 +239,7 @@ class ChatService:
             first_message (str): The user's first message in the conversation.
 
         Returns:
-            str: A generated title for the conversation.
+            Optional[str]: A generated title for the conversation, None if the generation failed.
         """
         system_prompt = (
             "You are an assistant specialized in generating concise, relevant, and descriptive titles for conversations. "
@@ -114,8 +269,8 @@ class ChatService:
                 temperature=0.5,      # Balanced creativity and accuracy
                 n=1,
             )
-            title = response.choices[0].message.content.strip()
-            return title
+            title = response.choices[0].message.content.strip().strip('"')
+            return title[:255] or None
         except Exception as e:
             logger.error(f"Title generation failed: {e}")
-            return "Untitled Conversation"
\ No newline at end of file
+            return None
\ No newline at end of file
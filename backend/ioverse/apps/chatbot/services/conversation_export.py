@@ -0,0 +1,181 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from ..models import Message
+import html
+import io
+import json
+import zipfile
+
+# Messages read from the database at once
+CHUNK_SIZE = 500
+
+def messages_queryset(conversation_id):
+    return (
+        Message.objects
+        .filter(conversation_id=conversation_id, status='completed')
+        .order_by('timestamp', 'id')
+    )
+
+def iter_messages(conversation_id):
+    """
+    Yields the (sender, message_body, timestamp) rows of a conversation in chunks,
+    so that the memory used by an export doesn't depend on the conversation size.
+    """
+    return (
+        messages_queryset(conversation_id)
+        .values_list('sender', 'message_body', 'timestamp')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+async def aiter_messages(conversation_id):
+    """
+    Asynchronous variant of `iter_messages`, for the exports served through ASGI.
+    The chunks are fetched one at a time after the last row of the previous one,
+    as `aiterator` runs the whole query at once for `values_list` querysets.
+    """
+    queryset = messages_queryset(conversation_id).values_list('id', 'sender', 'message_body', 'timestamp')
+    chunk = await sync_to_async(list)(queryset[:CHUNK_SIZE])
+    while chunk:
+        for _, sender, message_body, timestamp in chunk:
+            yield sender, message_body, timestamp
+        if len(chunk) < CHUNK_SIZE:
+            break
+        last_id, _, _, last_timestamp = chunk[-1]
+        chunk = await sync_to_async(list)(queryset.filter(
+            Q(timestamp__gt=last_timestamp) | Q(timestamp=last_timestamp, id__gt=last_id)
+        )[:CHUNK_SIZE])
+
+def sender_label(sender):
+    return 'User' if sender == 'user' else 'AI'
+
+def markdown_header(conversation):
+    return f"# {conversation.title}\n\n"
+
+def markdown_message(sender, message_body, timestamp):
+    return f"**{sender_label(sender)}** ({timestamp.isoformat()}):\n\n{message_body}\n\n---\n\n"
+
+def jsonl_header(conversation):
+    return json.dumps({
+        "type": "conversation",
+        "id": conversation.id,
+        "title": conversation.title,
+        "created_at": conversation.created_at.isoformat(),
+    }) + "\n"
+
+def jsonl_message(sender, message_body, timestamp):
+    return json.dumps({
+        "type": "message",
+        "sender": sender,
+        "message_body": message_body,
+        "timestamp": timestamp.isoformat(),
+    }) + "\n"
+
+def html_header(conversation):
+    title = html.escape(conversation.title)
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{title}</title>\n"
+        "<style>body{font-family:Helvetica,Arial,sans-serif;max-width:800px;margin:auto}"
+        ".user{color:darkblue}.ai{color:darkgreen}.body{white-space:pre-wrap}</style>\n"
+        f"</head>\n<body>\n<h1>{title}</h1>\n<hr>\n"
+    )
+
+def html_message(sender, message_body, timestamp):
+    css_class = 'user' if sender == 'user' else 'ai'
+    return (
+        f"<div class=\"{css_class}\"><b>{sender_label(sender)}:</b> "
+        f"<small>{timestamp.isoformat()}</small>"
+        f"<div class=\"body\">{html.escape(message_body)}</div></div>\n<hr>\n"
+    )
+
+def html_footer(conversation):
+    return "</body>\n</html>\n"
+
+def no_footer(conversation):
+    return ""
+
+# Export format: (header, message and footer renderers, content type, file extension)
+EXPORT_FORMATS = {
+    'markdown': (markdown_header, markdown_message, no_footer, 'text/markdown; charset=utf-8', 'md'),
+    'jsonl': (jsonl_header, jsonl_message, no_footer, 'application/jsonl; charset=utf-8', 'jsonl'),
+    'html': (html_header, html_message, html_footer, 'text/html; charset=utf-8', 'html'),
+}
+
+def export_content_type(export_format):
+    return EXPORT_FORMATS[export_format][3]
+
+def export_filename(conversation, export_format):
+    return f"conversation_{conversation.id}.{EXPORT_FORMATS[export_format][4]}"
+
+def export_conversation(conversation, export_format):
+    """
+    Yields the export of a conversation in the given format, chunk by chunk.
+    """
+    header, message, footer, _, _ = EXPORT_FORMATS[export_format]
+    yield header(conversation)
+    for row in iter_messages(conversation.id):
+        yield message(*row)
+    yield footer(conversation)
+
+async def aexport_conversation(conversation, export_format):
+    """
+    Asynchronous variant of `export_conversation`: under ASGI Django collects
+    a synchronous streaming body whole before sending it.
+    """
+    header, message, footer, _, _ = EXPORT_FORMATS[export_format]
+    yield header(conversation)
+    async for row in aiter_messages(conversation.id):
+        yield message(*row)
+    yield footer(conversation)
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable file collecting what the zip writer produces until it's yielded.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def export_archive(conversations, export_format):
+    """
+    Yields a zip archive holding the export of each conversation, built while it's streamed:
+    the archive is never held in memory, nor is any of its entries.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for conversation in conversations:
+            with archive.open(export_filename(conversation, export_format), mode='w', force_zip64=True) as entry:
+                for chunk in export_conversation(conversation, export_format):
+                    entry.write(chunk.encode('utf-8'))
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    yield buffer.pop()
+
+async def aexport_archive(conversations, export_format):
+    """
+    Asynchronous variant of `export_archive`, taking an async iterable of conversations.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        async for conversation in conversations:
+            with archive.open(export_filename(conversation, export_format), mode='w', force_zip64=True) as entry:
+                async for chunk in aexport_conversation(conversation, export_format):
+                    entry.write(chunk.encode('utf-8'))
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    yield buffer.pop()
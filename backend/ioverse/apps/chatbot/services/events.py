@@ -0,0 +1,31 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+import logging
+
+logger = logging.getLogger(__name__)
+
+def user_group_name(user_id):
+    """
+    Name of the channel layer group receiving the chatbot events of a user.
+    """
+    return f"chatbot_user_{user_id}"
+
+def send_conversation_title(conversation):
+    """
+    Pushes the title of a conversation to the connected clients of its owner.
+    Delivery is best effort: clients not connected get the title with the next list refresh.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            user_group_name(conversation.user_id),
+            {
+                "type": "conversation.title",
+                "conversation_id": conversation.id,
+                "title": conversation.title,
+            }
+        )
+    except Exception as e:
+        logger.warning(f"Could not push the title of conversation {conversation.id}: {e}")
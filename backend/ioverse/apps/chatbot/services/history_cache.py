@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import caches
+from ..models import Message
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChatHistoryCache:
+    """
+    Per-conversation cache of the completed chat turns.
+
+    Turns are stored in a compact form, a list of (sender, message_body, token_count) tuples,
+    so that a cached history costs no query and no model instantiation.
+    The backend is the Django cache named by `CHATBOT_HISTORY_CACHE`: local memory
+    by default, while deployments with several processes should plug in a shared one.
+    """
+    key_prefix = 'chatbot:history'
+
+    def __init__(self, token_counter=None):
+        """
+        With a `token_counter`, the messages loaded without a token count are counted
+        and their count is saved, so that each message is counted only once.
+        """
+        self.cache = caches[settings.CHATBOT_HISTORY_CACHE]
+        self.timeout = settings.CHATBOT_HISTORY_CACHE_TIMEOUT
+        self.token_counter = token_counter
+
+    def make_key(self, conversation_id):
+        return f"{self.key_prefix}:{conversation_id}"
+
+    def get(self, conversation_id):
+        """
+        Returns the compact history of a conversation, loading it from the database on a miss.
+        """
+        key = self.make_key(conversation_id)
+        turns = self.cache.get(key)
+        if turns is None:
+            turns = self.load(conversation_id)
+            self.cache.set(key, turns, self.timeout)
+        return turns
+
+    def load(self, conversation_id):
+        """
+        Loads the completed turns of a conversation without instantiating models.
+        """
+        turns, counted_messages = self.build_turns(self.completed_rows(conversation_id))
+        if counted_messages:
+            # Messages saved before token counting was introduced
+            Message.objects.bulk_update(counted_messages, ['token_count'])
+        return turns
+
+    async def aget(self, conversation_id):
+        """
+        Asynchronous counterpart of `get`.
+        """
+        key = self.make_key(conversation_id)
+        turns = await self.cache.aget(key)
+        if turns is None:
+            turns = await self.aload(conversation_id)
+            await self.cache.aset(key, turns, self.timeout)
+        return turns
+
+    async def aload(self, conversation_id):
+        """
+        Asynchronous counterpart of `load`.
+        """
+        rows = [row async for row in self.completed_rows(conversation_id)]
+        turns, counted_messages = self.build_turns(rows)
+        if counted_messages:
+            await Message.objects.abulk_update(counted_messages, ['token_count'])
+        return turns
+
+    def completed_rows(self, conversation_id):
+        return (
+            Message.objects
+            .filter(conversation_id=conversation_id, status='completed')
+            .order_by('timestamp')
+            .values_list('id', 'sender', 'message_body', 'token_count')
+        )
+
+    def build_turns(self, rows):
+        """
+        Builds the compact turns from the message rows, counting the tokens missing a count.
+        Returns the turns and the messages to update with their new count.
+        """
+        turns = []
+        counted_messages = []
+        for message_id, sender, message_body, token_count in rows:
+            if token_count is None and self.token_counter is not None:
+                token_count = self.token_counter.count_message({'content': message_body})
+                counted_messages.append(Message(id=message_id, token_count=token_count))
+            turns.append((sender, message_body, token_count))
+        return turns, counted_messages
+
+    def append(self, conversation_id, turns, expected_length):
+        """
+        Appends the turns of a completed exchange to the cached history.
+
+        `expected_length` is the number of completed messages of the conversation
+        after the exchange: if the cached history doesn't match it (e.g. a concurrent
+        exchange on the same conversation), it is invalidated rather than patched.
+        On a miss nothing is done, as the next read will load the history anyway.
+        """
+        key = self.make_key(conversation_id)
+        cached_turns = self.cache.get(key)
+        if cached_turns is None:
+            return
+        updated_turns = cached_turns + list(turns)
+        if len(updated_turns) == expected_length:
+            self.cache.set(key, updated_turns, self.timeout)
+        else:
+            logger.debug(f"Cached history of conversation {conversation_id} is out of sync, invalidating")
+            self.invalidate(conversation_id)
+
+    def invalidate(self, conversation_id):
+        self.cache.delete(self.make_key(conversation_id))
@@ -0,0 +1,212 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_LEFT
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus.flowables import HRFlowable
+
+from ..models import Message
+import glob
+import hashlib
+import html
+import logging
+import os
+import re
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Markdown patterns, compiled once for every message of every export
+BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+ITALIC_PATTERN = re.compile(r'\*(.*?)\*')
+UNDERLINE_PATTERN = re.compile(r'__(.*?)__')
+CODE_PATTERN = re.compile(r'`(.*?)`')
+LINE_BREAK_PATTERN = re.compile(r'(<br\s*\/?>|\n)')
+
+def markdown_to_reportlab(text):
+    """
+    Converts Markdown to ReportLab-compatible HTML.
+    """
+    # Decode HTML entities
+    text = html.unescape(text)
+
+    # Convert Markdown to HTML tags
+    text = BOLD_PATTERN.sub(r'<b>\1</b>', text)
+    text = ITALIC_PATTERN.sub(r'<i>\1</i>', text)
+    text = UNDERLINE_PATTERN.sub(r'<u>\1</u>', text)
+    text = CODE_PATTERN.sub(r'<font face="Courier">\1</font>', text)
+
+    # Replace <br> tags and newline characters with <br/>
+    return LINE_BREAK_PATTERN.sub('<br/>', text)
+
+def build_styles():
+    styles = getSampleStyleSheet()
+
+    # Define a more professional base style
+    base_style = ParagraphStyle(
+        'BaseStyle',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=12,
+        leading=15,
+        textColor=colors.black,
+        alignment=TA_LEFT,
+    )
+    return {
+        # Style for user messages
+        'user': ParagraphStyle(
+            'UserStyle',
+            parent=base_style,
+            textColor=colors.darkblue,  # Subtle color for differentiation
+            leftIndent=10,
+            spaceBefore=6,
+            spaceAfter=6,
+        ),
+        # Style for AI messages
+        'ai': ParagraphStyle(
+            'AIStyle',
+            parent=base_style,
+            textColor=colors.darkgreen,  # Subtle color for differentiation
+            leftIndent=10,
+            spaceBefore=6,
+            spaceAfter=6,
+        ),
+        # Style for the conversation title
+        'title': ParagraphStyle(
+            'TitleStyle',
+            parent=styles['Title'],
+            fontName='Helvetica-Bold',
+            fontSize=16,
+            leading=20,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            spaceAfter=20,
+        ),
+    }
+
+STYLES = build_styles()
+
+class ConversationPDFExporter:
+    """
+    Renders a conversation as a PDF file, cached until the conversation changes.
+
+    Files are named after the conversation id and a version hashing the timestamp of
+    its last message and its title, so a repeated download is served from disk.
+    They live in `CHATBOT_EXPORTS_ROOT`, outside of the public media files.
+    Conversations longer than `CHATBOT_PDF_EXPORT_SYNC_LIMIT` messages are rendered by a worker.
+    """
+    chunk_size = 500
+    lock_timeout = 10 * 60
+
+    def __init__(self, conversation):
+        self.conversation = conversation
+        self._summary = None
+
+    @property
+    def summary(self):
+        if self._summary is None:
+            self._summary = Message.objects.filter(conversation_id=self.conversation.id).aggregate(
+                count=Count('id'), last_timestamp=Max('timestamp')
+            )
+        return self._summary
+
+    @property
+    def path(self):
+        last_timestamp = self.summary['last_timestamp']
+        version = hashlib.sha256(
+            f"{last_timestamp.isoformat() if last_timestamp else ''}:{self.conversation.title}".encode()
+        ).hexdigest()[:16]
+        return os.path.join(settings.CHATBOT_EXPORTS_ROOT, f"conversation_{self.conversation.id}_{version}.pdf")
+
+    @property
+    def lock_key(self):
+        return f"chatbot:export:pdf:{self.conversation.id}"
+
+    def cached_path(self):
+        path = self.path
+        return path if os.path.exists(path) else None
+
+    def is_large(self):
+        return self.summary['count'] > settings.CHATBOT_PDF_EXPORT_SYNC_LIMIT
+
+    def schedule(self):
+        """
+        Dispatches the rendering to a worker, unless a rendering of the conversation is already in progress.
+        """
+        from ..tasks import render_conversation_pdf  # The tasks use the exporter
+
+        if cache.add(self.lock_key, True, timeout=self.lock_timeout):
+            render_conversation_pdf.delay(self.conversation.id)
+
+    def release(self):
+        cache.delete(self.lock_key)
+
+    def render(self):
+        """
+        Renders the PDF to its cached path, replacing the stale versions, and returns the path.
+        """
+        path = self.path
+        os.makedirs(settings.CHATBOT_EXPORTS_ROOT, exist_ok=True)
+
+        # Written aside and moved in place, so that a partial file is never served
+        fd, temp_path = tempfile.mkstemp(suffix='.pdf', dir=settings.CHATBOT_EXPORTS_ROOT)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                doc = SimpleDocTemplate(
+                    file,
+                    pagesize=letter,
+                    rightMargin=72,
+                    leftMargin=72,
+                    topMargin=72,
+                    bottomMargin=72
+                )
+                doc.build(self.build_story())
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        self.remove_exports(self.conversation.id, keep=path)
+        logger.info(f"Rendered PDF export of conversation {self.conversation.id}")
+        return path
+
+    def build_story(self):
+        story = [
+            Paragraph(self.conversation.title, STYLES['title']),
+            HRFlowable(width="100%", thickness=1, color=colors.grey),
+            Spacer(1, 12),  # Adds space after the title
+        ]
+
+        # Messages are read in chunks, without instantiating models
+        messages = (
+            Message.objects
+            .filter(conversation_id=self.conversation.id)
+            .order_by('timestamp')
+            .values_list('sender', 'message_body')
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for sender, message_body in messages:
+            formatted_message = markdown_to_reportlab(message_body)
+            if sender.lower() == 'user':
+                story.append(Paragraph(f'<b>User:</b> {formatted_message}', STYLES['user']))
+            else:
+                story.append(Paragraph(f'<b>AI:</b> {formatted_message}', STYLES['ai']))
+
+            # Subtle separator between messages
+            story.append(Spacer(1, 4))
+            story.append(HRFlowable(width="100%", thickness=0.5, color=colors.lightgrey))
+            story.append(Spacer(1, 8))
+        return story
+
+    @staticmethod
+    def remove_exports(conversation_id, keep=None):
+        for path in glob.glob(os.path.join(settings.CHATBOT_EXPORTS_ROOT, f"conversation_{conversation_id}_*.pdf")):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,7 @@
+from django.conf import settings
+
+from ioverse.cache import CacheAside
+
+# Payloads of the shared conversations, read by anyone having the link.
+# Keyed by share token, invalidated by the signal handlers when the conversation changes
+shared_conversation_cache = CacheAside('chatbot:shared-conversations', timeout=settings.SHARED_CONTENT_CACHE_TIMEOUT)
@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Conversation, Message
+from .services.history_cache import ChatHistoryCache
+from .services.pdf_export import ConversationPDFExporter
+from .services.sharing import shared_conversation_cache
+
+@receiver(post_save, sender=Message)
+def invalidate_history_on_message_edit(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidates the cached history when a message is edited.
+    New messages and status changes are appended by the ChatService instead.
+    """
+    if created or (update_fields and set(update_fields) <= {'status'}):
+        return
+    ChatHistoryCache().invalidate(instance.conversation_id)
+
+@receiver(post_delete, sender=Message)
+def invalidate_history_on_message_delete(sender, instance, **kwargs):
+    ChatHistoryCache().invalidate(instance.conversation_id)
+
+@receiver(post_save, sender=Conversation)
+def invalidate_history_on_rename(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidates the cached history on full saves, such as a rename.
+    The `updated_at` bump at the end of every exchange is ignored.
+    """
+    if created or (update_fields and 'title' not in update_fields):
+        return
+    ChatHistoryCache().invalidate(instance.id)
+
+@receiver(post_delete, sender=Conversation)
+def invalidate_history_on_conversation_delete(sender, instance, **kwargs):
+    ChatHistoryCache().invalidate(instance.id)
+
+@receiver(post_delete, sender=Conversation)
+def remove_exports_on_conversation_delete(sender, instance, **kwargs):
+    ConversationPDFExporter.remove_exports(instance.id)
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_delete, sender=Conversation)
+def invalidate_shared_conversation(sender, instance, **kwargs):
+    """
+    Invalidates the cached shared payload on every change of the conversation,
+    including the `updated_at` bump at the end of every exchange.
+    """
+    shared_conversation_cache.invalidate(instance.share_token)
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_shared_conversation_on_message_change(sender, instance, created=False, update_fields=None, origin=None, **kwargs):
+    """
+    Invalidates the cached shared payload when a message is edited or deleted.
+    New messages and status changes are followed by the conversation update of the exchange,
+    and the deletion of a whole conversation is handled by `invalidate_shared_conversation`.
+    """
+    if created or (update_fields and set(update_fields) <= {'status'}) or isinstance(origin, Conversation):
+        return
+    share_token = (
+        Conversation.objects
+        .filter(id=instance.conversation_id, is_shared=True)
+        .values_list('share_token', flat=True)
+        .first()
+    )
+    if share_token is not None:
+        shared_conversation_cache.invalidate(share_token)
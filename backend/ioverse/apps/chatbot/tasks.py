@@ -1,6 +1,10 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
-from .models import Conversation
+from .models import Conversation, Message
+from .services.events import send_conversation_title
+from .services.pdf_export import ConversationPDFExporter
+from .services.sharing import shared_conversation_cache
 import logging
 
 logger = logging.getLogger('celery')
@@ -23,3 +27,69 @@ def unshare_expired_conversations():
 
     # Update the expired conversations to mark them as unshared and reset the related fields
     expired_conversations.update(is_shared=False, shared_at=None, expires_at=None)
+
+@shared_task
+def discard_orphaned_turns():
+    """
+    A Celery task that discards the turns left pending by an interrupted
+    request (e.g. a worker stopped while waiting for the AI service),
+    along with the conversations that are left without messages.
+    """
+    threshold = timezone.now() - timezone.timedelta(minutes=settings.CHATBOT_PENDING_TURN_TIMEOUT)
+    
+    orphaned_messages = Message.objects.filter(status='pending', timestamp__lt=threshold)
+    discarded_count, _ = orphaned_messages.delete()
+    
+    empty_conversations = Conversation.objects.filter(messages__isnull=True, created_at__lt=threshold)
+    empty_count, _ = empty_conversations.delete()
+    
+    logger.info(f"Discarded {discarded_count} orphaned turns and {empty_count} empty conversations.")
+
+@shared_task(soft_time_limit=60, time_limit=90)
+def generate_conversation_title(conversation_id, placeholder_title):
+    """
+    A Celery task that replaces the placeholder title of a new conversation
+    with a generated one and pushes it to the owner.
+    The title is left untouched if the user renamed the conversation in the meantime.
+    """
+    conversation = Conversation.objects.select_related('user').filter(id=conversation_id).first()
+    if conversation is None or conversation.title != placeholder_title:
+        return
+
+    api_key = getattr(conversation.user, 'api_key', None)
+    if not api_key:
+        logger.warning(f"No API key to generate the title of conversation {conversation_id}.")
+        return
+
+    first_message = conversation.messages.filter(sender='user').values_list('message_body', flat=True).first()
+    if first_message is None:
+        return
+
+    from .services.chat_service import ChatService  # The ChatService dispatches this task
+    title = ChatService(api_key=api_key).generate_conversation_title(first_message)
+    if not title:
+        return
+
+    # Conditional update, so that a rename done during the generation wins
+    updated = Conversation.objects.filter(id=conversation_id, title=placeholder_title).update(title=title)
+    if updated:
+        conversation.title = title
+        shared_conversation_cache.invalidate(conversation.share_token)   # Not signaled by `update`
+        send_conversation_title(conversation)
+        logger.info(f"Generated title for conversation {conversation_id}.")
+
+@shared_task(soft_time_limit=60 * 9, time_limit=60 * 10)  # Within the lock taken when scheduled
+def render_conversation_pdf(conversation_id):
+    """
+    A Celery task that renders the PDF export of a large conversation,
+    releasing the lock taken when it was scheduled.
+    """
+    conversation = Conversation.objects.filter(id=conversation_id).first()
+    if conversation is None:
+        return
+
+    exporter = ConversationPDFExporter(conversation)
+    try:
+        exporter.render()
+    finally:
+        exporter.release()
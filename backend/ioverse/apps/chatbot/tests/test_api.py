@@ -3,7 +3,11 @@ from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from ..models import Conversation, Message
 from unittest.mock import patch
+import httpx
+import openai
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.cache import cache
 
 User = get_user_model()
 
@@ -115,3 +119,137 @@ class MessageCreateViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('message_body', response.data)
         self.assertEqual(response.data['message_body'][0], "Message content is required.")
+
+class MessageCreateRateLimitTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('messages-list')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_upstream_rate_limit_is_reported(self, mock_get_response):
+        """Test that a rate limit of the user's key is reported as 429 with its retry hint."""
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        response = httpx.Response(429, headers={"retry-after": "20"}, request=request)
+        mock_get_response.side_effect = openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+        data = {"message_body": "Hello, AI!", "conversation_id": self.conversation.id}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(self.conversation.messages.count(), 0)
+
+class ConversationListViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            conversation = Conversation.objects.create(user=self.user, title=f'Conversation {i}')
+            for j in range(3):
+                Message.objects.create(conversation=conversation, sender='user', message_body=f'Message {i}.{j} ' + 'x' * 200)
+        self.empty_conversation = Conversation.objects.create(user=self.user, title='Empty Conversation')
+
+    def test_list_is_summarized_in_constant_queries(self):
+        """Test that the list carries counts and previews instead of the messages, in a fixed number of queries."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('conversations-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        conversations = {conversation['title']: conversation for conversation in response.data['results']}
+        self.assertNotIn('messages', conversations['Conversation 0'])
+        self.assertEqual(conversations['Conversation 0']['message_count'], 3)
+        self.assertTrue(conversations['Conversation 0']['last_message'].startswith('Message 0.2 '))
+        self.assertEqual(len(conversations['Conversation 0']['last_message']), 100)
+        self.assertEqual(conversations['Empty Conversation']['message_count'], 0)
+        self.assertIsNone(conversations['Empty Conversation']['last_message'])
+
+    def test_retrieve_counts_messages(self):
+        conversation = Conversation.objects.get(title='Conversation 1')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('conversations-detail', args=[conversation.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message_count'], 3)
+        self.assertEqual(response.data['user_username'], self.user.username)
+
+    def test_messages_are_cursor_paginated(self):
+        """Test that the messages are paged from the most recent, following the cursors."""
+        conversation = Conversation.objects.get(title='Conversation 1')
+        url = reverse('conversations-messages', args=[conversation.id])
+
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+        first_page = [message['message_body'][:11] for message in response.data['results']]
+        self.assertEqual(first_page, ['Message 1.2', 'Message 1.1'])
+
+        # A message added meanwhile doesn't shift the next page
+        Message.objects.create(conversation=conversation, sender='ai', message_body='Newer message')
+        response = self.client.get(response.data['next'])
+        self.assertEqual([message['message_body'][:11] for message in response.data['results']], ['Message 1.0'])
+        self.assertIsNone(response.data['next'])
+
+        # Walking back reaches the message added meanwhile
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([message['message_body'][:11] for message in response.data['results']], ['Message 1.2', 'Message 1.1'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([message['message_body'][:11] for message in response.data['results']], ['Newer messa'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_conversations_are_keyset_paginated(self):
+        """Test that the conversations are paged on (created_at, id), even when they share a timestamp."""
+        Conversation.objects.filter(user=self.user).update(created_at=timezone.now())
+        expected = list(Conversation.objects.filter(user=self.user).order_by('-id').values_list('id', flat=True))
+
+        ids, url = [], reverse('conversations-list') + '?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [conversation['id'] for conversation in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('conversations-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_messages_of_other_users_are_not_accessible(self):
+        other_user = User.objects.create_user(username='otheruser', password='testpass')
+        other_conversation = Conversation.objects.create(user=other_user, title='Private')
+        response = self.client.get(reverse('conversations-messages', args=[other_conversation.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class SharedConversationCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.conversation = Conversation.objects.create(user=self.user, title='Shared Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        self.conversation.share(duration_hours=1)
+        self.url = reverse('shared-conversation-detail', args=[self.conversation.share_token])
+
+    def test_payload_is_cached(self):
+        self.assertEqual(len(self.client.get(self.url).data['messages']), 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Shared Conversation')
+
+    def test_payload_is_invalidated_on_changes(self):
+        """Test that the payload is invalidated once the changes are committed."""
+        self.client.get(self.url)
+
+        # A new exchange ends with the update of the conversation
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello user!')
+            self.conversation.save(update_fields=['updated_at'])
+        self.assertEqual(len(self.client.get(self.url).data['messages']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.filter(conversation=self.conversation).first().delete()
+        self.assertEqual(len(self.client.get(self.url).data['messages']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conversation.unshare()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
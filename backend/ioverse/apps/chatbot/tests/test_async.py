@@ -0,0 +1,146 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest.mock import patch
+from ..consumers import ChatStreamingConsumer
+from ..models import Conversation, Message
+from ..services.async_chat_service import AsyncChatService, background_tasks
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+async def mock_stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+async def failing_stream():
+    yield 'Partial '
+    raise RuntimeError("Upstream failure")
+
+class AsyncChatServiceTests(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello!')
+
+    @patch('apps.chatbot.services.async_chat_service.AsyncOpenAIService.chat_completion')
+    async def test_process_user_message(self, mock_chat_completion):
+        mock_chat_completion.return_value = 'Mock AI response'
+        chat_service = AsyncChatService(api_key='test_api_key')
+        user_message, ai_message = await chat_service.process_user_message(
+            user=self.user,
+            message_body="How are you?",
+            conversation_id=self.conversation.id
+        )
+        self.assertEqual(ai_message.message_body, 'Mock AI response')
+        await user_message.arefresh_from_db()
+        self.assertEqual(user_message.status, 'completed')
+
+        sent_messages = mock_chat_completion.call_args.args[1]
+        self.assertEqual([message['content'] for message in sent_messages[1:4]], ['Hello AI!', 'Hello!', 'How are you?'])
+
+    @patch('apps.chatbot.services.async_chat_service.AsyncChatbot.stream_response')
+    async def test_failed_stream_discards_turn(self, mock_stream_response):
+        mock_stream_response.return_value = failing_stream()
+        chat_service = AsyncChatService(api_key='test_api_key')
+        events = chat_service.stream_user_message(
+            user=self.user,
+            message_body="How are you?",
+            conversation_id=self.conversation.id
+        )
+        with self.assertRaises(RuntimeError):
+            async for _ in events:
+                pass
+        self.assertEqual(await self.conversation.messages.acount(), 2)
+
+    @patch('apps.chatbot.services.async_chat_service.run_title_generation')
+    @patch('apps.chatbot.services.async_chat_service.AsyncChatbot.stream_response')
+    async def test_title_is_generated_on_the_event_loop(self, mock_stream_response, mock_run_title_generation):
+        mock_stream_response.return_value = mock_stream('Mock ', 'response')
+        chat_service = AsyncChatService(api_key='test_api_key')
+        events = [event async for event in chat_service.stream_user_message(user=self.user, message_body="Hello AI!")]
+        self.assertEqual(events[-1][0], 'end')
+
+        # Started once the turn completed, awaited by nobody
+        self.assertEqual(len(background_tasks), 1)
+        await asyncio.gather(*background_tasks)
+        mock_run_title_generation.assert_called_once_with(events[0][1].conversation_id, "Hello AI!")
+
+class AsyncMessageStreamViewTests(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        self.url = reverse('messages-async-stream')
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    async def read_events(self, response):
+        content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        return [json.loads(line[len("data: "):]) for line in content.split("\n\n") if line]
+
+    @patch('apps.chatbot.services.async_chat_service.AsyncChatbot.stream_response')
+    async def test_stream_message(self, mock_stream_response):
+        mock_stream_response.return_value = mock_stream('Mock ', 'AI ', 'response')
+        data = {"message_body": "Stream me a reply.", "conversation_id": self.conversation.id}
+        response = await self.async_client.post(self.url, data, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = await self.read_events(response)
+        self.assertEqual([event['type'] for event in events], ['start', 'chunk', 'chunk', 'chunk', 'end'])
+        self.assertEqual(events[-1]['data']['message_body'], 'Mock AI response')
+        self.assertEqual(await self.conversation.messages.filter(status='completed').acount(), 2)
+
+    async def test_unauthenticated_request_is_rejected(self):
+        response = await self.async_client.post(self.url, {"message_body": "Hi"}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_invalid_conversation_id(self):
+        data = {"message_body": "Stream me a reply.", "conversation_id": 9999}
+        response = await self.async_client.post(self.url, data, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('conversation_id', json.loads(response.content))
+
+    @patch('apps.chatbot.services.async_chat_service.AsyncChatbot.stream_response')
+    async def test_drf_stream_is_asynchronous_under_asgi(self, mock_stream_response):
+        mock_stream_response.return_value = mock_stream('Mock ', 'response')
+        data = {"message_body": "Stream me a reply.", "conversation_id": self.conversation.id}
+        response = await self.async_client.post(reverse('messages-stream'), data, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        # Sent chunk by chunk, not collected whole by Django
+        self.assertTrue(response.is_async)
+
+        events = await self.read_events(response)
+        self.assertEqual([event['type'] for event in events], ['start', 'chunk', 'chunk', 'end'])
+        self.assertEqual(await self.conversation.messages.filter(status='completed').acount(), 2)
+
+class ChatStreamingConsumerTests(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+
+    @patch('apps.chatbot.services.async_chat_service.AsyncChatbot.stream_response')
+    async def test_stream_over_websocket(self, mock_stream_response):
+        mock_stream_response.return_value = mock_stream('Mock ', 'response')
+        communicator = WebsocketCommunicator(ChatStreamingConsumer.as_asgi(), "/ws/chatbot/stream")
+        communicator.scope['user'] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"message_body": "Stream me a reply.", "conversation_id": self.conversation.id})
+        event_types = []
+        while not event_types or event_types[-1] not in ('end', 'error'):
+            event_types.append((await communicator.receive_json_from())['type'])
+        await communicator.disconnect()
+
+        self.assertEqual(event_types, ['start', 'chunk', 'chunk', 'end'])
+        self.assertEqual(await sync_to_async(self.conversation.messages.count)(), 2)
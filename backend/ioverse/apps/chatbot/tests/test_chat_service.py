@@ -1,5 +1,13 @@
-from django.test import TestCase
+import threading
+from django.test import TestCase, override_settings
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from unittest.mock import patch
+from apps.chatbot.models import Conversation, Message
 from apps.chatbot.services.chat_service import ChatService
+from apps.chatbot.services.history_cache import ChatHistoryCache
+from apps.chatbot.tasks import discard_orphaned_turns, generate_conversation_title
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -25,3 +33,162 @@ class ChatServiceTestCase(TestCase):
         self.assertEqual(ai_message.sender, 'ai')
         self.assertEqual(ai_message.conversation, user_message.conversation)
         self.assertIsNotNone(ai_message.message_body)
+
+class ChatServiceTurnTestCase(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        self.chat_service = ChatService(api_key="test_api_key")
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_turn_is_completed(self, mock_get_response):
+        mock_get_response.return_value = 'Mock AI response'
+        user_message, ai_message = self.chat_service.process_user_message(
+            user=self.user,
+            message_body="Hello, AI!",
+            conversation_id=self.conversation.id
+        )
+        user_message.refresh_from_db()
+        self.assertEqual(user_message.status, 'completed')
+        self.assertEqual(ai_message.status, 'completed')
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_failed_turn_is_discarded(self, mock_get_response):
+        mock_get_response.side_effect = RuntimeError("Upstream failure")
+        with self.assertRaises(RuntimeError):
+            self.chat_service.process_user_message(
+                user=self.user,
+                message_body="Hello, AI!",
+                conversation_id=self.conversation.id
+            )
+        self.assertFalse(Message.objects.filter(conversation=self.conversation).exists())
+        self.assertTrue(Conversation.objects.filter(id=self.conversation.id).exists())
+
+    def test_history_excludes_pending_messages(self):
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Answered')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Answer')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='In flight', status='pending')
+        history = self.chat_service.build_chat_history(self.conversation)
+        self.assertEqual([entry['content'] for entry in history[1:]], ['Answered', 'Answer'])
+
+    def test_orphaned_turns_are_discarded(self):
+        empty_conversation = Conversation.objects.create(user=self.user, title='Interrupted Conversation')
+        Message.objects.create(conversation=empty_conversation, sender='user', message_body='Orphaned', status='pending')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Orphaned', status='pending')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Answered')
+        later = timezone.now() + timezone.timedelta(minutes=settings.CHATBOT_PENDING_TURN_TIMEOUT + 1)
+        with patch('apps.chatbot.tasks.timezone.now', return_value=later):
+            discard_orphaned_turns()
+        self.assertFalse(Message.objects.filter(status='pending').exists())
+        self.assertTrue(Message.objects.filter(message_body='Answered').exists())
+        self.assertFalse(Conversation.objects.filter(id=empty_conversation.id).exists())
+        self.assertTrue(Conversation.objects.filter(id=self.conversation.id).exists())
+
+class ChatHistoryCacheTestCase(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello!')
+        self.chat_service = ChatService(api_key="test_api_key")
+        self.history_cache = ChatHistoryCache()
+
+    def test_cached_history_costs_no_query(self):
+        self.chat_service.build_chat_history(self.conversation)
+        with self.assertNumQueries(0):
+            history = self.chat_service.build_chat_history(self.conversation)
+        self.assertEqual(history[1:], [
+            {'role': 'user', 'content': 'Hello AI!'},
+            {'role': 'assistant', 'content': 'Hello!'},
+        ])
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_exchange_is_appended(self, mock_get_response):
+        mock_get_response.return_value = 'Mock AI response'
+        self.chat_service.build_chat_history(self.conversation)
+        self.chat_service.process_user_message(
+            user=self.user,
+            message_body="How are you?",
+            conversation_id=self.conversation.id
+        )
+        self.assertEqual(self.history_cache.get(self.conversation.id), self.history_cache.load(self.conversation.id))
+        sender, message_body, token_count = self.history_cache.get(self.conversation.id)[-1]
+        self.assertEqual((sender, message_body), ('ai', 'Mock AI response'))
+        self.assertEqual(token_count, self.conversation.messages.last().token_count)
+
+    def test_out_of_sync_append_invalidates(self):
+        self.history_cache.get(self.conversation.id)
+        self.history_cache.append(self.conversation.id, [('user', 'Lost'), ('ai', 'Turn')], expected_length=6)
+        self.assertIsNone(self.history_cache.cache.get(self.history_cache.make_key(self.conversation.id)))
+
+    def test_rename_and_delete_invalidate(self):
+        key = self.history_cache.make_key(self.conversation.id)
+        self.history_cache.get(self.conversation.id)
+        self.conversation.save(update_fields=['updated_at'])
+        self.assertIsNotNone(self.history_cache.cache.get(key))
+
+        self.conversation.title = 'Renamed Conversation'
+        self.conversation.save()
+        self.assertIsNone(self.history_cache.cache.get(key))
+
+        self.history_cache.get(self.conversation.id)
+        self.conversation.messages.first().delete()
+        self.assertIsNone(self.history_cache.cache.get(key))
+
+class ConversationTitleTestCase(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.chat_service = ChatService(api_key="test_api_key")
+
+    @patch('apps.chatbot.services.chat_service.run_title_generation')
+    @patch('apps.chatbot.services.chat_service.ChatService.generate_conversation_title')
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_title_is_generated_after_the_reply(self, mock_get_response, mock_generate_title, mock_run_title_generation):
+        mock_get_response.return_value = 'Mock AI response'
+        mock_generate_title.return_value = 'Marketing Strategies'
+        started = threading.Event()
+        mock_run_title_generation.side_effect = lambda *args: started.set()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            user_message, _ = self.chat_service.process_user_message(
+                user=self.user,
+                message_body="Can you suggest some marketing strategies for my online store?"
+            )
+        conversation = user_message.conversation
+        self.assertEqual(conversation.title, "Can you suggest some marketing...")
+        mock_run_title_generation.assert_not_called()
+
+        # Without a broker, started in a thread once committed rather than run inline
+        for callback in callbacks:
+            callback()
+        self.assertTrue(started.wait(timeout=5))
+        mock_run_title_generation.assert_called_once_with(conversation.id, "Can you suggest some marketing...")
+
+        generate_conversation_title(conversation.id, "Can you suggest some marketing...")
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.title, 'Marketing Strategies')
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    @patch('apps.chatbot.services.chat_service.generate_conversation_title.delay')
+    @patch('apps.chatbot.services.chat_service.Chatbot.get_response')
+    def test_title_is_generated_by_a_worker_with_a_broker(self, mock_get_response, mock_delay):
+        mock_get_response.return_value = 'Mock AI response'
+        with self.captureOnCommitCallbacks(execute=True):
+            user_message, _ = self.chat_service.process_user_message(user=self.user, message_body="Hello AI!")
+        mock_delay.assert_called_once_with(user_message.conversation.id, "Hello AI!")
+
+    @patch('apps.chatbot.services.chat_service.ChatService.generate_conversation_title')
+    def test_renamed_conversation_keeps_its_title(self, mock_generate_title):
+        mock_generate_title.return_value = 'Generated Title'
+        conversation = Conversation.objects.create(user=self.user, title='Renamed Conversation')
+        Message.objects.create(conversation=conversation, sender='user', message_body='Hello AI!')
+        generate_conversation_title(conversation.id, 'Hello AI!')
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.title, 'Renamed Conversation')
+        mock_generate_title.assert_not_called()
+
+    def test_placeholder_title(self):
+        self.assertEqual(self.chat_service.make_placeholder_title("  Hello   AI! "), "Hello AI!")
+        self.assertEqual(self.chat_service.make_placeholder_title(""), "New Conversation")
@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.conf import settings
+from django.core.cache import caches
+from unittest.mock import patch
+from apps.chatbot.models import Conversation, Message
+from apps.chatbot.services.chat_service import ChatService
+from chatbot_modules.core.context_window import ContextWindowManager
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+class ContextWindowManagerTestCase(TestCase):
+    def setUp(self):
+        self.manager = ContextWindowManager("gpt-4", budgets={"gpt-4": 100})
+        self.system = {'role': 'system', 'content': 'You are a helpful assistant.'}
+
+    def make_turns(self, count):
+        messages = []
+        for index in range(count):
+            messages.append({'role': 'user', 'content': f"Question {index} " + "x" * 80})
+            messages.append({'role': 'assistant', 'content': f"Answer {index} " + "y" * 80})
+        return messages
+
+    def test_history_within_budget_is_untouched(self):
+        messages = [self.system] + self.make_turns(1)
+        self.assertEqual(self.manager.fit(messages), messages)
+
+    def test_oldest_turns_are_dropped(self):
+        prompt = {'role': 'user', 'content': 'Latest question'}
+        messages = [self.system] + self.make_turns(5) + [prompt]
+        fitted = self.manager.fit(messages)
+
+        self.assertEqual(fitted[0], self.system)
+        self.assertEqual(fitted[-1], prompt)
+        self.assertEqual(fitted[1]['role'], 'user')
+        self.assertLess(len(fitted), len(messages))
+        counts = [self.manager.counter.count_message(message) for message in fitted]
+        self.assertLessEqual(sum(counts), self.manager.budget)
+
+    def test_latest_message_is_always_kept(self):
+        prompt = {'role': 'user', 'content': 'z' * 1000}
+        fitted = self.manager.fit([self.system] + self.make_turns(2) + [prompt])
+        self.assertEqual(fitted, [self.system, prompt])
+
+    def test_known_token_counts_are_used(self):
+        messages = [self.system] + self.make_turns(1)
+        fitted = self.manager.fit(messages, token_counts=[None, 90, 90])
+        self.assertEqual(fitted, [self.system, messages[-1]])
+
+class ChatServiceContextWindowTestCase(TestCase):
+    def setUp(self):
+        caches[settings.CHATBOT_HISTORY_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello!')
+        self.chat_service = ChatService(api_key="test_api_key")
+
+    def test_token_counts_are_saved(self):
+        self.chat_service.build_chat_history(self.conversation)
+        self.assertFalse(self.conversation.messages.filter(token_count__isnull=True).exists())
+
+    @patch('apps.chatbot.services.chat_service.OpenAIService.chat_completion')
+    def test_prompt_is_trimmed_to_budget(self, mock_chat_completion):
+        mock_chat_completion.return_value = 'Mock AI response'
+        self.chat_service.context_window.budget = 10
+        self.chat_service.process_user_message(
+            user=self.user,
+            message_body="How are you?",
+            conversation_id=self.conversation.id
+        )
+        sent_messages = mock_chat_completion.call_args.args[1]
+        self.assertEqual(sent_messages[0]['role'], 'system')
+        self.assertEqual(sent_messages[-1], {'role': 'user', 'content': 'How are you?'})
+        self.assertEqual(len(sent_messages), 2)
+        self.assertIsNotNone(self.conversation.messages.last().token_count)
@@ -0,0 +1,180 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest.mock import patch
+from ..models import Conversation, Message
+from ..services.pdf_export import ConversationPDFExporter, markdown_to_reportlab
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+class ConversationPDFExportTests(APITestCase):
+    def setUp(self):
+        self.exports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.exports_root, ignore_errors=True)
+        settings_override = override_settings(CHATBOT_EXPORTS_ROOT=self.exports_root, CHATBOT_PDF_EXPORT_SYNC_LIMIT=5)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello **AI**!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello!\nHow can I help?')
+        self.url = reverse('conversations-download', args=[self.conversation.id])
+
+    def download(self):
+        response = self.client.get(self.url)
+        if response.status_code == status.HTTP_200_OK:
+            content = b"".join(response.streaming_content)
+            response.close()
+            return response, content
+        return response, None
+
+    def test_repeated_download_is_served_from_cache(self):
+        with patch.object(ConversationPDFExporter, 'build_story', wraps=ConversationPDFExporter(self.conversation).build_story) as mock_build_story:
+            response, content = self.download()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/pdf')
+            self.assertTrue(content.startswith(b'%PDF'))
+
+            _, cached_content = self.download()
+            self.assertEqual(cached_content, content)
+            self.assertEqual(mock_build_story.call_count, 1)
+
+    def test_new_message_replaces_cached_export(self):
+        first_path = ConversationPDFExporter(self.conversation).render()
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='One more thing')
+        response, _ = self.download()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        second_path = ConversationPDFExporter(self.conversation).cached_path()
+        self.assertIsNotNone(second_path)
+        self.assertNotEqual(first_path, second_path)
+        self.assertEqual(ConversationPDFExporter(self.conversation).cached_path(), second_path)
+        self.assertFalse(os.path.exists(first_path))
+
+    @patch('apps.chatbot.tasks.render_conversation_pdf.delay')
+    def test_large_conversation_is_rendered_in_background(self, mock_delay):
+        for index in range(5):
+            Message.objects.create(conversation=self.conversation, sender='user', message_body=f'Message {index}')
+        response, _ = self.download()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Retry-After'], '5')
+
+        # A single rendering is scheduled for concurrent downloads
+        self.download()
+        mock_delay.assert_called_once_with(self.conversation.id)
+
+        ConversationPDFExporter(self.conversation).render()
+        response, content = self.download()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(content.startswith(b'%PDF'))
+
+    def test_markdown_conversion(self):
+        self.assertEqual(
+            markdown_to_reportlab("**bold** *italic* `code`\nnext"),
+            '<b>bold</b> <i>italic</i> <font face="Courier">code</font><br/>next'
+        )
+
+class ConversationExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing <Conversation>')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello <b>user</b>!')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Pending', status='pending')
+        self.url = reverse('conversations-export', args=[self.conversation.id])
+
+    def export(self, url, params):
+        response = self.client.get(url, params)
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_markdown_export(self):
+        response, content = self.export(self.url, {'format': 'markdown'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/markdown'))
+        self.assertIn('attachment; filename="conversation_', response['Content-Disposition'])
+        text = content.decode()
+        self.assertTrue(text.startswith('# Existing <Conversation>'))
+        self.assertIn('Hello AI!', text)
+        self.assertNotIn('Pending', text)
+
+    def test_jsonl_export(self):
+        response, content = self.export(self.url, {'format': 'jsonl'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(lines[0]['title'], 'Existing <Conversation>')
+        self.assertEqual([line['message_body'] for line in lines[1:]], ['Hello AI!', 'Hello <b>user</b>!'])
+
+    def test_html_export_is_escaped(self):
+        response, content = self.export(self.url, {'format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Hello &lt;b&gt;user&lt;/b&gt;!', content.decode())
+
+    def test_unsupported_format(self):
+        response, _ = self.export(self.url, {'format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_errors_are_json(self):
+        response = self.client.get(reverse('conversations-export', args=[9999]), {'format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', json.loads(response.content))
+
+    async def async_export(self, url, params):
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        response = await self.async_client.get(url, params, headers=headers)
+        # Sent chunk by chunk, not collected whole by Django
+        self.assertTrue(response.is_async)
+        return response, b"".join([chunk async for chunk in response.streaming_content])
+
+    @patch('apps.chatbot.services.conversation_export.CHUNK_SIZE', 1)
+    async def test_export_is_asynchronous_under_asgi(self):
+        response, content = await self.async_export(self.url, {'format': 'jsonl'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([line['message_body'] for line in lines[1:]], ['Hello AI!', 'Hello <b>user</b>!'])
+
+        response, content = await self.async_export(reverse('conversations-archive'), {'format': 'markdown'})
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(archive.namelist(), [f"conversation_{self.conversation.id}.md"])
+            self.assertIn(b'Hello AI!', archive.read(f"conversation_{self.conversation.id}.md"))
+
+    def test_other_users_conversation_is_not_exported(self):
+        other_user = User.objects.create_user(username='otheruser', password='testpass')
+        other_conversation = Conversation.objects.create(user=other_user, title='Private')
+        response, _ = self.export(reverse('conversations-export', args=[other_conversation.id]), {'format': 'markdown'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_archive_export(self):
+        second_conversation = Conversation.objects.create(user=self.user, title='Second Conversation')
+        Message.objects.create(conversation=second_conversation, sender='user', message_body='Second')
+        response, content = self.export(reverse('conversations-archive'), {'format': 'jsonl'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                sorted([f"conversation_{self.conversation.id}.jsonl", f"conversation_{second_conversation.id}.jsonl"])
+            )
+            self.assertIn(b'Second', archive.read(f"conversation_{second_conversation.id}.jsonl"))
+
+        response, content = self.export(reverse('conversations-archive'), {'format': 'markdown', 'ids': str(self.conversation.id)})
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(archive.namelist(), [f"conversation_{self.conversation.id}.md"])
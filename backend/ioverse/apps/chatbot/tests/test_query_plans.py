@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+
+from ioverse.testing import QueryPlanTestMixin
+from ..models import Conversation, Message
+from ..services.history_cache import ChatHistoryCache
+
+User = get_user_model()
+
+class ChatbotQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """
+    Runs EXPLAIN on the hot queries of the chatbot, failing if one regresses to a full scan.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+        Message.objects.create(conversation=self.conversation, sender='user', message_body='Hello AI!')
+        Message.objects.create(conversation=self.conversation, sender='ai', message_body='Hello user!')
+
+    def test_conversation_list(self):
+        with self.assertNoFullScans('chatbot_conversation', 'chatbot_message'):
+            response = self.client.get(reverse('conversations-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conversation_messages(self):
+        url = reverse('conversations-messages', args=[self.conversation.id])
+        with self.assertNoFullScans('chatbot_conversation', 'chatbot_message'):
+            response = self.client.get(url, {'page_size': 1})
+            self.client.get(response.data['next'])
+
+    def test_chat_history(self):
+        self.assertUsesIndex(ChatHistoryCache().completed_rows(self.conversation.id), 'message_conversation_time_idx')
+
+    def test_expired_shares_sweep(self):
+        # Unordered, as read by the update of the sweep
+        expired_conversations = Conversation.objects.filter(is_shared=True, expires_at__lt=timezone.now()).order_by()
+        self.assertUsesIndex(expired_conversations, 'conversation_share_expiry_idx')
+
+    def test_orphaned_turns_sweep(self):
+        threshold = timezone.now() - timezone.timedelta(minutes=settings.CHATBOT_PENDING_TURN_TIMEOUT)
+        orphaned_messages = Message.objects.filter(status='pending', timestamp__lt=threshold).order_by()
+        self.assertUsesIndex(orphaned_messages, 'message_pending_time_idx')
@@ -0,0 +1,84 @@
+import json
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from ..consumers import ChatEventsConsumer
+from ..models import Conversation, Message
+from ..services.events import send_conversation_title
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+class MessageStreamViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('messages-stream')
+        self.conversation = Conversation.objects.create(user=self.user, title='Existing Conversation')
+
+    def read_events(self, response):
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line[len("data: "):]) for line in content.split("\n\n") if line]
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.stream_response')
+    def test_stream_message_existing_conversation(self, mock_stream_response):
+        """Test that deltas are relayed and the AI message is saved once the stream ends."""
+        mock_stream_response.return_value = iter(['Mock ', 'AI ', 'response'])
+        data = {"message_body": "Stream me a reply.", "conversation_id": self.conversation.id}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = self.read_events(response)
+        self.assertEqual([event['type'] for event in events], ['start', 'chunk', 'chunk', 'chunk', 'end'])
+        self.assertEqual(events[0]['data']['message_body'], data['message_body'])
+        self.assertEqual(''.join(event['message'] for event in events[1:-1]), 'Mock AI response')
+
+        ai_message = Message.objects.get(id=events[-1]['data']['id'])
+        self.assertEqual(ai_message.sender, 'ai')
+        self.assertEqual(ai_message.message_body, 'Mock AI response')
+        self.assertEqual(ai_message.conversation, self.conversation)
+
+    @patch('apps.chatbot.services.chat_service.Chatbot.stream_response')
+    def test_stream_failure_discards_turn(self, mock_stream_response):
+        """Test that a failed stream reports an error and leaves no orphaned user message."""
+        def failing_stream(prompt):
+            yield 'Partial'
+            raise RuntimeError("Upstream failure")
+        mock_stream_response.side_effect = failing_stream
+        data = {"message_body": "This will fail.", "conversation_id": self.conversation.id}
+        response = self.client.post(self.url, data, format='json')
+
+        events = self.read_events(response)
+        self.assertEqual(events[-1], {'type': 'error', 'message': 'An unexpected error occurred.'})
+        self.assertFalse(Message.objects.filter(conversation=self.conversation).exists())
+
+    def test_stream_message_invalid_conversation_id(self):
+        """Test that validation errors are returned before any streaming starts."""
+        data = {"message_body": "Invalid conversation.", "conversation_id": 999}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('conversation_id', response.data)
+
+class ChatEventsConsumerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.conversation = Conversation.objects.create(user=self.user, title='Generated Title')
+
+    def test_title_is_pushed_to_the_owner(self):
+        async def receive_title():
+            communicator = WebsocketCommunicator(ChatEventsConsumer.as_asgi(), "/ws/chatbot/events")
+            communicator.scope['user'] = self.user
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await sync_to_async(send_conversation_title)(self.conversation)
+            event = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return event
+
+        event = async_to_sync(receive_title)()
+        self.assertEqual(event, {"type": "title", "data": {"id": self.conversation.id, "title": "Generated Title"}})
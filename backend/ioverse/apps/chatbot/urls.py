@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework import routers
-from .views import MessageViewSet, ConversationViewSet, SharedConversationView
+from .views import MessageViewSet, ConversationViewSet, SharedConversationView, AsyncMessageStreamView
 
 router = routers.DefaultRouter()
 router.register(r'messages', MessageViewSet, basename='messages')
 router.register(r'conversations', ConversationViewSet, basename='conversations')
 
 urlpatterns = [
+    # Before the router, which would read 'async-stream' as a message id
+    path('messages/async-stream/', AsyncMessageStreamView.as_view(), name='messages-async-stream'),
     path('', include(router.urls)),
     path('shared/<uuid:share_token>/', SharedConversationView.as_view(), name='shared-conversation-detail'),
 ]
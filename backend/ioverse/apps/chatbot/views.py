@@ -3,29 +3,92 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
 from rest_framework.views import APIView
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Substr
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
+from asgiref.sync import sync_to_async
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.platypus.flowables import HRFlowable
-
-from ioverse.exceptions import MissingApiKeyException
+from ioverse.exceptions import MissingApiKeyException, UpstreamRateLimitException
+from client_modules.retry import retry_after
 from .models import Message, Conversation
-from .serializers import MessageSerializer, ReadOnlyConversationSerializer, SharedConversationSerializer
+from .serializers import (
+    MessageSerializer,
+    ReadOnlyConversationSerializer,
+    ConversationListSerializer,
+    SharedConversationSerializer,
+    serialize_stream_event,
+)
+from .pagination import ConversationCursorPagination, MessageCursorPagination
 from .services.chat_service import ChatService
+from .services.async_chat_service import AsyncChatService
+from .services.pdf_export import ConversationPDFExporter
+from .services.sharing import shared_conversation_cache
+from .services.conversation_export import (
+    EXPORT_FORMATS,
+    aexport_archive,
+    aexport_conversation,
+    export_archive,
+    export_content_type,
+    export_conversation,
+    export_filename,
+)
+from .renderers import MarkdownRenderer, JSONLinesRenderer, HTMLExportRenderer
 import logging
-import html
-import re
+import json
+import openai
 
 logger = logging.getLogger(__name__)
 
+def served_by_asgi(request):
+    """
+    Whether the request is served through ASGI, where Django collects a synchronous
+    streaming body whole before sending its first byte: streams must be async iterators there.
+    """
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+def stream_events(events):
+    """
+    Formats the events of a turn as Server-Sent Events, reporting a failure as a final 'error' event.
+    """
+    try:
+        for event_type, payload in events:
+            yield f"data: {json.dumps(serialize_stream_event(event_type, payload))}\n\n"
+    except Exception as e:
+        logger.exception(f"Unexpected error during message streaming: {e}")
+        # sensitive information not sent to client
+        yield f"data: {json.dumps({'type': 'error', 'message': 'An unexpected error occurred.'})}\n\n"
+
+async def astream_events(events):
+    """
+    Asynchronous variant of `stream_events`, closing the events once the client is gone.
+    """
+    try:
+        async for event_type, payload in events:
+            yield f"data: {json.dumps(serialize_stream_event(event_type, payload))}\n\n"
+    except Exception as e:
+        logger.exception(f"Unexpected error during message streaming: {e}")
+        # sensitive information not sent to client
+        yield f"data: {json.dumps({'type': 'error', 'message': 'An unexpected error occurred.'})}\n\n"
+    finally:
+        await events.aclose()
+
+def event_stream_response(event_stream):
+    response = StreamingHttpResponse(event_stream, content_type="text/event-stream")
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'    # Prevents proxies from buffering the stream
+    return response
+
 class MessageViewSet(viewsets.ModelViewSet):
     
     queryset = Message.objects.all()    # For efficency will apply constraints later on..
@@ -66,6 +129,8 @@ class MessageViewSet(viewsets.ModelViewSet):
                     'ai_message': ai_message_data
                 }
                 return Response(response_data, status=status.HTTP_201_CREATED)
+            except openai.RateLimitError as e:
+                raise UpstreamRateLimitException(wait=retry_after(e))
             except Exception as e:
                 logger.exception(f"Unexpected error during message processing: {e}")
                 return Response(
@@ -76,14 +141,118 @@ class MessageViewSet(viewsets.ModelViewSet):
             logger.error(f"Serializer validation error: {serializer.errors}")
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def stream(self, request):
+        """
+        Streaming variant of `create`.
+        Relays the AI response as Server-Sent Events while it is generated,
+        and persists it once the stream ends.
+
+        Under ASGI the response is generated by `AsyncChatService`, see `served_by_asgi`.
+        """
+        serializer = self.get_serializer(data=request.data)
+        
+        # Retrieve the OpenAI api key for the user
+        api_key = getattr(request.user, 'api_key', None)
+        if not api_key:
+            raise MissingApiKeyException()
+        
+        if not serializer.is_valid():
+            logger.error(f"Serializer validation error: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        turn = dict(
+            user=request.user,
+            message_body=serializer.validated_data['message_body'],
+            conversation_id=serializer.validated_data.get('conversation_id')
+        )
+        if served_by_asgi(request):
+            return event_stream_response(astream_events(AsyncChatService(api_key=api_key).stream_user_message(**turn)))
+        return event_stream_response(stream_events(ChatService(api_key=api_key).stream_user_message(**turn)))
+
+@method_decorator(csrf_exempt, name='dispatch')   # Token authenticated, like the DRF views
+class AsyncMessageStreamView(View):
+    """
+    Async-native variant of `MessageViewSet.stream`, for ASGI deployments:
+    no thread is held while the AI response is generated.
+    DRF views are synchronous, so authentication, throttling and validation are run here explicitly.
+    """
+    async def post(self, request):
+        try:
+            auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+            return JsonResponse(detail, status=status.HTTP_401_UNAUTHORIZED)
+        if auth is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+        request.user, _ = auth
+
+        throttle = UserRateThrottle()
+        if not await sync_to_async(throttle.allow_request)(request, self):
+            return JsonResponse({"detail": "Request was throttled."}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # Retrieve the OpenAI api key for the user
+        api_key = getattr(request.user, 'api_key', None)
+        if not api_key:
+            return JsonResponse({"detail": MissingApiKeyException.default_detail}, status=MissingApiKeyException.status_code)
+
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"detail": "Invalid JSON."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = MessageSerializer(data=data, context={'request': request})
+        if not await sync_to_async(serializer.is_valid)():
+            logger.error(f"Serializer validation error: {serializer.errors}")
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        chat_service = AsyncChatService(api_key=api_key)
+        events = chat_service.stream_user_message(
+            user=request.user,
+            message_body=serializer.validated_data['message_body'],
+            conversation_id=serializer.validated_data.get('conversation_id')
+        )
+        return event_stream_response(astream_events(events))
+
 class ConversationViewSet(viewsets.ModelViewSet):
     
     serializer_class = ReadOnlyConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversationCursorPagination
+
+    LAST_MESSAGE_PREVIEW_LENGTH = 100
     
     # Custom queryset to filter by owner
     def get_queryset(self):
-        return Conversation.objects.filter(user = self.request.user)
+        queryset = Conversation.objects.filter(user = self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # Summaries computed by the database in the same query, instead of one query per conversation
+            queryset = queryset.select_related('user').annotate(message_count=Count('messages'))
+        if self.action == 'list':
+            last_message = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+            queryset = queryset.annotate(
+                last_message=Subquery(
+                    last_message.values(preview=Substr('message_body', 1, self.LAST_MESSAGE_PREVIEW_LENGTH))[:1]
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ConversationListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['get'], pagination_class=MessageCursorPagination)
+    def messages(self, request, pk=None):
+        """
+        Custom action to page through the messages of a conversation, most recent first.
+        Follow the `next` cursor to load older messages.
+        """
+        conversation = self.get_object()
+        messages = Message.objects.filter(conversation=conversation)
+        page = self.paginate_queryset(messages)
+        serializer = MessageSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def share(self, request, pk=None):
@@ -137,118 +306,93 @@ class ConversationViewSet(viewsets.ModelViewSet):
     def download(self, request, pk=None):
         """
         Custom action to download a conversation as a PDF with improved styling and Markdown support.
+        The PDF is cached until the conversation changes. Large conversations are rendered
+        in background: until the file is ready, 202 is returned and the client should retry.
         """
         conversation = self.get_object()
+        exporter = ConversationPDFExporter(conversation)
 
-        # Retrieve the messages of the conversation
-        messages = Message.objects.filter(conversation_id=conversation.id).order_by('timestamp')
-
-        # Create a file-like HTTP response to hold the PDF
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="conversation_{conversation.id}.pdf"'
+        path = exporter.cached_path()
+        if path is None:
+            if exporter.is_large():
+                exporter.schedule()
+                path = exporter.cached_path()   # Already there if the worker runs eagerly
+                if path is None:
+                    return Response(
+                        {'detail': 'The export is being prepared, retry shortly.'},
+                        status=status.HTTP_202_ACCEPTED,
+                        headers={'Retry-After': '5'}
+                    )
+            else:
+                path = exporter.render()
 
-        # Create a PDF document using ReportLab
-        doc = SimpleDocTemplate(
-            response,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            # Replaced by a newer version in the meantime
+            file = open(ConversationPDFExporter(conversation).render(), 'rb')
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=f"conversation_{conversation.id}.pdf",
+            content_type='application/pdf'
         )
-        story = []  # List to hold the PDF elements
+    
+    # `format` is also DRF's format override, so the export formats need a matching renderer
+    export_renderer_classes = [JSONRenderer, MarkdownRenderer, JSONLinesRenderer, HTMLExportRenderer]
 
-        # Styles and formatting
-        styles = getSampleStyleSheet()
-        
-        # Define a more professional base style
-        base_style = ParagraphStyle(
-            'BaseStyle',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=12,
-            leading=15,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-        )
-        
-        # Style for user messages
-        user_style = ParagraphStyle(
-            'UserStyle',
-            parent=base_style,
-            textColor=colors.darkblue,  # Subtle color for differentiation
-            leftIndent=10,
-            spaceBefore=6,
-            spaceAfter=6,
-        )
-        
-        # Style for AI messages
-        ai_style = ParagraphStyle(
-            'AIStyle',
-            parent=base_style,
-            textColor=colors.darkgreen,  # Subtle color for differentiation
-            leftIndent=10,
-            spaceBefore=6,
-            spaceAfter=6,
-        )
-        
-        # Style for the conversation title
-        title_style = ParagraphStyle(
-            'TitleStyle',
-            parent=styles['Title'],
-            fontName='Helvetica-Bold',
-            fontSize=16,
-            leading=20,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            spaceAfter=20,
-        )
-        
-        # Add conversation title
-        story.append(Paragraph(conversation.title, title_style))
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.grey))
-        story.append(Spacer(1, 12))  # Adds space after the title
+    def get_export_format(self, request):
+        export_format = request.query_params.get('format', 'markdown')
+        if export_format not in EXPORT_FORMATS:
+            return None
+        return export_format
 
-        # Function to convert Markdown to ReportLab-compatible HTML
-        def markdown_to_reportlab(text):
-            # Decode HTML entities
-            text = html.unescape(text)
-            
-            # Convert Markdown to HTML tags
-            text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-            text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-            text = re.sub(r'__(.*?)__', r'<u>\1</u>', text)
-            text = re.sub(r'`(.*?)`', r'<font face="Courier">\1</font>', text)
-            
-            # Replace <br> tags and newline characters with <br/>
-            text = re.sub(r'(<br\s*\/?>|\n)', '<br/>', text)
-            
-            return text
+    @action(detail=True, methods=['get'], renderer_classes=export_renderer_classes)
+    def export(self, request, pk=None):
+        """
+        Custom action to export a conversation as Markdown, JSONL or HTML (`?format=`, Markdown by default).
+        The export is streamed while the messages are read, in constant memory.
+        """
+        export_format = self.get_export_format(request)
+        if export_format is None:
+            return Response({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Loop through the messages and format them
-        for msg in messages:
-            # Process Markdown in the message body
-            formatted_message = markdown_to_reportlab(msg.message_body)
-            
-            if msg.sender.lower() == 'user':
-                # User message formatting with a label
-                content = f'<b>User:</b> {formatted_message}'
-                story.append(Paragraph(content, user_style))
-            else:
-                # AI message formatting with a label
-                content = f'<b>AI:</b> {formatted_message}'
-                story.append(Paragraph(content, ai_style))
-            
-            # Subtle separator between messages
-            story.append(Spacer(1, 4))
-            story.append(HRFlowable(width="100%", thickness=0.5, color=colors.lightgrey))
-            story.append(Spacer(1, 8))
+        conversation = self.get_object()
+        if served_by_asgi(request):
+            content = aexport_conversation(conversation, export_format)
+        else:
+            content = export_conversation(conversation, export_format)
+        response = StreamingHttpResponse(content, content_type=export_content_type(export_format))
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(conversation, export_format)}"'
+        return response
+
+    @action(detail=False, methods=['get'], renderer_classes=export_renderer_classes)
+    def archive(self, request):
+        """
+        Custom action to export many conversations at once as a zip archive streamed while it's built.
+        Takes the `format` of the exports and optionally the comma-separated `ids` of the conversations,
+        all of the user's conversations being exported otherwise.
+        """
+        export_format = self.get_export_format(request)
+        if export_format is None:
+            return Response({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Build the PDF document
-        doc.build(story)
+        conversations = self.get_queryset().only('id', 'title', 'created_at')
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                conversations = conversations.filter(id__in=[int(id) for id in ids.split(',')])
+            except ValueError:
+                return Response({'error': 'Ids must be comma-separated integers'}, status=status.HTTP_400_BAD_REQUEST)
 
+        if served_by_asgi(request):
+            content = aexport_archive(conversations.aiterator(), export_format)
+        else:
+            content = export_archive(conversations.iterator(), export_format)
+        response = StreamingHttpResponse(content, content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="conversations.zip"'
         return response
-    
+
     @action(detail=True, methods=['patch'])
     def rename(self, request, pk=None):
         conversation = self.get_object()
@@ -269,13 +413,17 @@ class SharedConversationView(APIView):
         """
         Retrieve a shared conversation using the 'share_token'
         Only returns the covnversation if 'is_shared=True'
+        The payload is cached until the conversation changes, and never past the expiration.
         """
-        conversation = get_object_or_404(Conversation, share_token=share_token, is_shared=True)
-        
-        # Check for expiration
-        if conversation.expires_at and timezone.now() > conversation.expires_at:
-            conversation.unshare()
-            return Response({'detail': 'This shared link has expired'}, status=status.HTTP_200_OK)
+        payload = shared_conversation_cache.get(share_token)
+        if payload is None:
+            conversation = get_object_or_404(Conversation, share_token=share_token, is_shared=True)
+            
+            # Check for expiration
+            if conversation.expires_at and timezone.now() > conversation.expires_at:
+                conversation.unshare()
+                return Response({'detail': 'This shared link has expired'}, status=status.HTTP_200_OK)
 
-        serializer = SharedConversationSerializer(conversation)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            payload = SharedConversationSerializer(conversation).data
+            shared_conversation_cache.set(share_token, payload, timeout=shared_conversation_cache.timeout_until(conversation.expires_at))
+        return Response(payload, status=status.HTTP_200_OK)
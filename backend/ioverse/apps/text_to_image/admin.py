@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import ImageGeneration
+from .models import ImageGeneration, ImageGenerationJob
 
 @admin.register(ImageGeneration)
 class ImageGenerationAdmin(admin.ModelAdmin):
@@ -83,3 +83,31 @@ class ImageGenerationAdmin(admin.ModelAdmin):
         if obj:
             return self.readonly_fields + ('user',)
         return self.readonly_fields
+
+@admin.register(ImageGenerationJob)
+class ImageGenerationJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'user',
+        'status',
+        'created_at',
+        'updated_at',
+    )
+    list_filter = (
+        'status',
+        'created_at',
+    )
+    search_fields = (
+        'user__username',
+        'idempotency_key',
+    )
+    readonly_fields = (
+        'user',
+        'idempotency_key',
+        'parameters',
+        'result',
+        'error',
+        'created_at',
+        'updated_at',
+    )
+    ordering = ('-created_at',)
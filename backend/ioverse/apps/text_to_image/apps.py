@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class TextToImageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.text_to_image'
+
+    def ready(self):
+        # Register the signal handlers keeping the shared image cache in sync
+        from . import signals  # noqa: F401
@@ -0,0 +1,33 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .services.events import user_group_name
+
+class ImageEventsConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes the text to image events of the connected user, such as
+    {"type": "job", "data": {"id": ..., "status": ..., "url": ...}} when a generation job progresses,
+    the job being fetched from its URL once finished.
+    """
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def image_job(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "job",
+            "data": {
+                "id": event["job_id"],
+                "status": event["status"],
+                "url": event["url"],
+            }
+        }))
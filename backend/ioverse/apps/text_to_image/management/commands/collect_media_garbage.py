@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from ioverse.media import collect_media_garbage
+
+class Command(BaseCommand):
+    help = (
+        "Removes the files of the media directories no longer referenced by the generated images "
+        "and the assistant files, such as those left behind by bulk deletions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report the unreferenced files and their size.")
+        parser.add_argument('--batch-size', type=int, help="Files removed per batch (default MEDIA_GC_BATCH_SIZE).")
+        parser.add_argument('--workers', type=int, help="Threads removing the batches (default MEDIA_GC_WORKERS).")
+        parser.add_argument(
+            '--grace-period', type=int,
+            help="Seconds during which new files are kept even if unreferenced (default MEDIA_GC_GRACE_PERIOD)."
+        )
+
+    def handle(self, *args, **options):
+        metrics = collect_media_garbage(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            grace_period=options['grace_period'],
+        )
+        if metrics['dry_run']:
+            summary = f"{metrics['orphaned']} unreferenced files, {metrics['bytes']} bytes reclaimable"
+        else:
+            summary = f"{metrics['removed']} unreferenced files removed, {metrics['bytes']} bytes reclaimed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary} ({metrics['scanned']} files scanned in {metrics['seconds']}s)."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='imagegeneration',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='image_user_created_idx'),
+        ),
+    ]
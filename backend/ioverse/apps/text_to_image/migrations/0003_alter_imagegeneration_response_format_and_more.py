@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0002_imagegeneration_image_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imagegeneration',
+            name='response_format',
+            field=models.CharField(choices=[('url', 'URL'), ('b64_json', 'Base64 JSON')], default='url', help_text="The response format (e.g., 'url', 'b64_json').", max_length=20, verbose_name='Response Format'),
+        ),
+        migrations.AddIndex(
+            model_name='imagegeneration',
+            index=models.Index(condition=models.Q(('is_shared', True)), fields=['expires_at'], name='image_share_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagegeneration',
+            index=models.Index(condition=models.Q(('response_format', 'url')), fields=['created_at'], name='image_url_created_idx'),
+        ),
+    ]
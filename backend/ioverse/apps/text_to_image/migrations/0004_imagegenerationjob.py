@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:49
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0003_alter_imagegeneration_response_format_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageGenerationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('idempotency_key', models.CharField(blank=True, help_text='Key given by the client, identifying the retries of the same submission.', max_length=255, null=True, verbose_name='Idempotency Key')),
+                ('parameters', models.JSONField(help_text='The prompt and options of the generation.', verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', help_text='The progress of the job.', max_length=20, verbose_name='Status')),
+                ('result', models.JSONField(blank=True, help_text='The generated images, once the job succeeded.', null=True, verbose_name='Result')),
+                ('error', models.TextField(blank=True, default='', help_text='The reason of the failure, once the job failed.', verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The date and time when the job was submitted.', verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date and time of the last change of status.', verbose_name='Updated At')),
+                ('user', models.ForeignKey(help_text='The user who submitted the job.', on_delete=django.db.models.deletion.CASCADE, related_name='image_generation_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Image Generation Job',
+                'verbose_name_plural': 'Image Generation Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='image_job_created_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('user', 'idempotency_key'), name='image_job_idempotency_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0004_imagegenerationjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='imagegeneration',
+            name='image_url_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='imagegeneration',
+            index=models.Index(condition=models.Q(('image_url__isnull', False)), fields=['created_at'], name='image_url_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0005_imagegeneration_image_url_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagegeneration',
+            name='preview_file',
+            field=models.ImageField(blank=True, help_text='A medium version of the image, for the previews.', null=True, upload_to='generated_images/', verbose_name='Preview File'),
+        ),
+        migrations.AddField(
+            model_name='imagegeneration',
+            name='thumbnail_file',
+            field=models.ImageField(blank=True, help_text='A small version of the image, for the galleries.', null=True, upload_to='generated_images/', verbose_name='Thumbnail File'),
+        ),
+    ]
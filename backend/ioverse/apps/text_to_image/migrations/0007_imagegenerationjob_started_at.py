@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_to_image', '0006_imagegeneration_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagegenerationjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='The date and time when a worker started the job.', null=True, verbose_name='Started At'),
+        ),
+    ]
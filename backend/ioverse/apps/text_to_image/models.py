@@ -61,6 +61,20 @@ class ImageGeneration(models.Model):
         null=True,
         blank=True
     )
+    thumbnail_file = models.ImageField(
+        upload_to='generated_images/',
+        verbose_name="Thumbnail File",
+        help_text="A small version of the image, for the galleries.",
+        null=True,
+        blank=True
+    )
+    preview_file = models.ImageField(
+        upload_to='generated_images/',
+        verbose_name="Preview File",
+        help_text="A medium version of the image, for the previews.",
+        null=True,
+        blank=True
+    )
     image_url = models.URLField(
         max_length=500,
         verbose_name="Image URL",
@@ -99,8 +113,7 @@ class ImageGeneration(models.Model):
         choices=RESPONSE_FORMAT_CHOICES,
         default="url",
         verbose_name="Response Format",
-        help_text="The response format (e.g., 'url', 'b64_json').",
-        db_index=True
+        help_text="The response format (e.g., 'url', 'b64_json')."
     )
     size = models.CharField(
         max_length=20,
@@ -174,9 +187,9 @@ class ImageGeneration(models.Model):
             raise ValidationError({'n': "The number of images 'n' must be between 1 and 10."})
 
         if self.model_used == 'dall-e-3':
-            # For 'dall-e-3', 'n' must be 1
-            if self.n != 1:
-                raise ValidationError({'n': "For 'dall-e-3', only n=1 is supported."})
+            # For 'dall-e-3', 'n' must be between 1 and 4, the images being generated one per request
+            if not (1 <= self.n <= 4):
+                raise ValidationError({'n': "For 'dall-e-3', 'n' must be between 1 and 4."})
             # 'quality' and 'style' are supported
             if not self.quality:
                 self.quality = 'standard'  # Default value
@@ -208,9 +221,10 @@ class ImageGeneration(models.Model):
             raise ValidationError({'model_used': "Invalid model selected."})
 
     def delete(self, *args, **kwargs):
-        # If the image file exists, delete it
-        if self.image_file and os.path.isfile(self.image_file.path):
-            os.remove(self.image_file.path)
+        # If the image file and its derivatives exist, delete them
+        for file in (self.image_file, self.thumbnail_file, self.preview_file):
+            if file and os.path.isfile(file.path):
+                os.remove(file.path)
         
         # Call the superclass delete method
         super().delete(*args, **kwargs)
@@ -222,3 +236,108 @@ class ImageGeneration(models.Model):
         ordering = ['-created_at']
         verbose_name = "Image Generation"
         verbose_name_plural = "Image Generations"
+        indexes = [
+            # Keyset pagination of the images of a user
+            models.Index(fields=['user', 'created_at', 'id'], name='image_user_created_idx'),
+            # Sweep of the expired shares, see `unshare_expired_images`
+            models.Index(fields=['expires_at'], condition=models.Q(is_shared=True), name='image_share_expiry_idx'),
+            # Cleanup of the images whose URL expired before being downloaded, see `cleanup_service.sweep_expired_url_images`
+            models.Index(fields=['created_at'], condition=models.Q(image_url__isnull=False), name='image_url_created_idx'),
+        ]
+
+class ImageGenerationJob(models.Model):
+    """
+    A generation of images run by a worker, whose result is polled or pushed to the user.
+    A job submitted again with the same idempotency key is returned instead of being run twice.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+    FINISHED_STATUSES = ('succeeded', 'failed')
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='image_generation_jobs',
+        verbose_name="User",
+        help_text="The user who submitted the job."
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name="Idempotency Key",
+        help_text="Key given by the client, identifying the retries of the same submission."
+    )
+    parameters = models.JSONField(
+        verbose_name="Parameters",
+        help_text="The prompt and options of the generation."
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="Status",
+        help_text="The progress of the job."
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Result",
+        help_text="The generated images, once the job succeeded."
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Error",
+        help_text="The reason of the failure, once the job failed."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Created At",
+        help_text="The date and time when the job was submitted."
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Started At",
+        help_text="The date and time when a worker started the job."
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At",
+        help_text="The date and time of the last change of status."
+    )
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    def __str__(self):
+        return f"Image generation job {self.id} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Image Generation Job"
+        verbose_name_plural = "Image Generation Jobs"
+        constraints = [
+            # A submission retried with the same key finds the job of the first attempt
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='image_job_idempotency_key'
+            ),
+        ]
+        indexes = [
+            # Removal of the old jobs, see `delete_expired_generation_jobs`
+            models.Index(fields=['created_at'], name='image_job_created_idx'),
+        ]
@@ -0,0 +1,5 @@
+from ioverse.pagination import KeysetPagination
+
+class ImageGenerationCursorPagination(KeysetPagination):
+    page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    path("ws/text-to-image/events", consumers.ImageEventsConsumer.as_asgi()),
+]
@@ -2,7 +2,7 @@ from rest_framework import serializers
 
 from django.contrib.auth import get_user_model
 
-from .models import ImageGeneration
+from .models import ImageGeneration, ImageGenerationJob
 
 import logging
 
@@ -17,6 +17,8 @@ class ImageGenerationSerializer(serializers.ModelSerializer):
     image_url = serializers.URLField(required=False, allow_null=True, read_only=True)
     image_file = serializers.ImageField(required=False, allow_null=True, read_only=True)
     image_data = serializers.CharField(write_only=True, required=False)
+    # Binary alternative to the Base64 'image_data', sent as multipart/form-data
+    image_upload = serializers.ImageField(write_only=True, required=False)
     created_at = serializers.DateTimeField(read_only=True)
     revised_prompt = serializers.CharField(required=False, allow_null=True, read_only=True)
     share_token = serializers.UUIDField(read_only=True)
@@ -31,6 +33,7 @@ class ImageGenerationSerializer(serializers.ModelSerializer):
             'user',
             'prompt',
             'image_data',
+            'image_upload',
             'image_url',
             'image_file',
             'created_at',
@@ -68,6 +71,13 @@ class ImageGenerationSerializer(serializers.ModelSerializer):
         style = data.get('style')
         size = data.get('size', '512x512')
 
+        # An uploaded image is stored as a file, like the Base64 images
+        if data.get('image_upload') is not None:
+            if data.get('image_data'):
+                raise serializers.ValidationError({'image_upload': 'Send either image_data or image_upload, not both.'})
+            if data.get('response_format', 'url') != 'b64_json':
+                raise serializers.ValidationError({'image_upload': "Uploaded images require response_format 'b64_json'."})
+
         # Validate 'prompt'
         if not prompt.strip():
             raise serializers.ValidationError({'prompt': 'Prompt cannot be empty.'})
@@ -76,9 +86,9 @@ class ImageGenerationSerializer(serializers.ModelSerializer):
             # For 'dall-e-3', prompt length must be <= 4000 characters
             if len(prompt) > 4000:
                 raise serializers.ValidationError({'prompt': 'For dall-e-3, prompt length must be 4000 characters or fewer.'})
-            # 'n' must be 1
-            if n != 1:
-                raise serializers.ValidationError({'n': 'For dall-e-3, only n=1 is supported.'})
+            # 'n' must be between 1 and 4, the images being generated one per request
+            if not (1 <= n <= 4):
+                raise serializers.ValidationError({'n': 'For dall-e-3, n must be between 1 and 4.'})
             # 'quality' must be one of the allowed choices
             if quality not in dict(ImageGeneration.QUALITY_CHOICES):
                 raise serializers.ValidationError({'quality': 'Invalid quality for dall-e-3.'})
@@ -110,6 +120,7 @@ class ImageGenerationSerializer(serializers.ModelSerializer):
 
 class ImageGenerationListSerializer(serializers.ModelSerializer):
     image_thumbnail = serializers.SerializerMethodField()
+    image_preview = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(read_only=True)
     image_url = serializers.URLField(required=False, allow_null=True, read_only=True)
     image_file = serializers.ImageField(required=False, allow_null=True, read_only=True)
@@ -132,12 +143,23 @@ class ImageGenerationListSerializer(serializers.ModelSerializer):
             'created_at',
             'response_format',
             'image_thumbnail',
+            'image_preview',
         ]
 
     def get_image_thumbnail(self, obj):
         # Return a small version or URL of the image for listing purposes
-        if obj.image_file and hasattr(obj.image_file, 'url'):
-            return obj.image_file.url
+        return self.get_derivative_url(obj, obj.thumbnail_file)
+
+    def get_image_preview(self, obj):
+        # Return a medium version or URL of the image for previewing purposes
+        return self.get_derivative_url(obj, obj.preview_file)
+
+    def get_derivative_url(self, obj, derivative):
+        # The original is returned until its derivatives are built
+        file = derivative or obj.image_file
+        if file:
+            request = self.context.get('request')
+            return request.build_absolute_uri(file.url) if request else file.url
         elif obj.image_url:
             return obj.image_url
         else:
@@ -206,11 +228,24 @@ class SharedImageSerializer(serializers.ModelSerializer):
         fields = ['image']
 
     def get_image(self, obj):
-        # Conditionally return either the image URL or file path based on the response format
-        if obj.response_format == 'url' and obj.image_url:
-            return obj.image_url
-        elif obj.response_format == 'b64_json' and obj.image_file:
+        # Return the stored file, or the URL of a 'url' image not downloaded yet
+        if obj.image_file:
             # Construct the absolute URI for the image file if using a file-based image
             return self.context['request'].build_absolute_uri(obj.image_file.url)
+        elif obj.image_url:
+            return obj.image_url
         return None
-    
\ No newline at end of file
+    
+class ImageGenerationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageGenerationJob
+        fields = [
+            'id',
+            'status',
+            'parameters',
+            'result',
+            'error',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
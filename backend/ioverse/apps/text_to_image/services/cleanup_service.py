@@ -1,33 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.utils import timezone
 from ..models import ImageGeneration
 import logging
+import time
 
 logger = logging.getLogger('text_to_image_project')
 
-def clean():
+SWEEP_LOCK_KEY = 'text_to_image:sweep-expired-url-images'
+
+def url_expiration_threshold():
+    """
+    Returns the creation time before which the URL of an image has expired
+    (60 minutes as default of OpenAI API).
+    """
+    return timezone.now() - timezone.timedelta(minutes=settings.TEXT_TO_IMAGE_URL_EXPIRATION)
+
+def sweep_expired_url_images(batch_size=None, lock_timeout=60 * 5):
     """
-    A helper function that cleans all the images stored in the
-    database whose response_format is 'url' and the access 
-    is expired (60 minutes as default of OpenAI API).
+    Deletes the images still referring to their URL once it expired, i.e. those
+    whose download failed (see `download_service.persist_image_url`).
+
+    The images are deleted in batches read from the `created_at` index, each batch in its
+    own short transaction, so that the sweep never holds the database for long.
+    A single sweep runs at a time: the others return right away, reporting nothing removed.
+
+    Returns the metrics of the sweep: rows removed, batches and seconds taken.
     """
+    batch_size = batch_size or settings.TEXT_TO_IMAGE_SWEEP_BATCH_SIZE
+    metrics = {'deleted': 0, 'batches': 0, 'seconds': 0.0, 'skipped': False}
+
+    if not cache.add(SWEEP_LOCK_KEY, True, timeout=lock_timeout):
+        logger.info("Expired URL images sweep already running, skipped.")
+        metrics['skipped'] = True
+        return metrics
+
+    started = time.monotonic()
     try:
-        expiration_threshold = timezone.now() - timezone.timedelta(minutes=60)
-        expired_images = ImageGeneration.objects.filter(
-            response_format='url',
-            created_at__lt=expiration_threshold
-        )
-        deleted_count, _ = expired_images.delete()
-        if (deleted_count > 0):
-            logger.info(f"Cleaned up {deleted_count} expired URL images.")
-    except Exception as e:
-        logger.exception(f"Error during cleanup: {e}")
-
-import threading
-
-def trigger_clean():
+        # Fixed threshold, so that the sweep ends even while new images expire
+        threshold = url_expiration_threshold()
+        while True:
+            batch = list(
+                ImageGeneration.objects
+                .filter(image_url__isnull=False, created_at__lt=threshold)
+                .order_by('created_at')
+                .values_list('id', 'image_file')[:batch_size]
+            )
+            if not batch:
+                break
+
+            with transaction.atomic():
+                deleted, _ = ImageGeneration.objects.filter(id__in=[id for id, _ in batch]).delete()
+            remove_files([image_file for _, image_file in batch if image_file])
+
+            metrics['deleted'] += deleted
+            metrics['batches'] += 1
+            if len(batch) < batch_size:
+                break
+    finally:
+        metrics['seconds'] = round(time.monotonic() - started, 3)
+        cache.delete(SWEEP_LOCK_KEY)
+
+    logger.info(
+        f"Swept {metrics['deleted']} expired URL images in {metrics['batches']} batches "
+        f"and {metrics['seconds']}s."
+    )
+    return metrics
+
+def remove_files(names):
     """
-    Triggers the clean function in a separate thread to avoid blocking.
+    Removes the files of deleted images, which the bulk deletion doesn't do unlike `ImageGeneration.delete`.
     """
-    cleanup_thread = threading.Thread(target=clean, name="ImageCleanupThread")
-    cleanup_thread.daemon = True  # Ensures the thread exits when the main program does
-    cleanup_thread.start()
\ No newline at end of file
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not remove image file {name}: {e}")
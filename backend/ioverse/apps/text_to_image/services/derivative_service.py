@@ -0,0 +1,91 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from io import BytesIO
+from PIL import Image, features
+from ..models import ImageGeneration
+from .sharing import shared_image_cache
+import logging
+import os
+
+logger = logging.getLogger('text_to_image_project')
+
+# Derivatives of the images and their longest side (pixels), built from the largest to the smallest.
+# Each is stored in the `<name>_file` field, next to the original
+DERIVATIVE_SIZES = (
+    ('preview', 1024),
+    ('thumbnail', 512),
+)
+# WebP when Pillow supports it, JPEG otherwise
+DERIVATIVE_FORMAT, DERIVATIVE_EXTENSION = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+DERIVATIVE_QUALITY = 80
+
+def schedule_derivatives(image_generation_id):
+    """
+    Dispatches the building of the derivatives of an image to a worker, once its file is committed.
+    """
+    from ..tasks import build_image_derivatives  # The tasks use the derivative service
+    transaction.on_commit(lambda: build_image_derivatives.delay(image_generation_id))
+
+def render_derivatives(file):
+    """
+    Renders the derivatives of the image read from `file`.
+    Returns the content of each derivative by name.
+    """
+    with Image.open(file) as original:
+        has_alpha = 'A' in original.getbands() or 'transparency' in original.info
+        mode = 'RGBA' if has_alpha and DERIVATIVE_FORMAT == 'WEBP' else 'RGB'
+        image = original.convert(mode)
+
+    rendered = {}
+    for name, size in DERIVATIVE_SIZES:
+        # Scaled down in place, so that each derivative is built from the previous, smaller one
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format=DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+        rendered[name] = buffer.getvalue()
+    return rendered
+
+def build_derivatives(image_generation_id):
+    """
+    Builds the thumbnail and preview of a stored image, saved next to its file.
+    Returns whether the derivatives were stored.
+    """
+    image_generation = ImageGeneration.objects.filter(id=image_generation_id).first()
+    if image_generation is None or not image_generation.image_file:
+        return False
+
+    original_name = image_generation.image_file.name
+    stem = os.path.splitext(original_name)[0]
+    names = {}
+    try:
+        with image_generation.image_file.open('rb') as file:
+            rendered = render_derivatives(file)
+        for name, content in rendered.items():
+            names[f'{name}_file'] = default_storage.save(f"{stem}_{name}.{DERIVATIVE_EXTENSION}", ContentFile(content))
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not build the derivatives of ImageGeneration {image_generation.id}: {e}")
+        remove_derivatives(names.values())
+        return False
+
+    # Conditional update, as the image may have been deleted or replaced in the meantime
+    updated = ImageGeneration.objects.filter(id=image_generation.id, image_file=original_name).update(**names)
+    if not updated:
+        remove_derivatives(names.values())
+        return False
+    shared_image_cache.invalidate(image_generation.share_token)   # Not signaled by `update`
+
+    # Derivatives of a previous build, e.g. of a task delivered twice
+    remove_derivatives(
+        file.name for file in (image_generation.thumbnail_file, image_generation.preview_file)
+        if file and file.name not in names.values()
+    )
+    logger.info(f"Built the derivatives of ImageGeneration {image_generation.id}.")
+    return True
+
+def remove_derivatives(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not remove derivative file {name}: {e}")
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from urllib.parse import urlsplit
+from ..models import ImageGeneration
+from .derivative_service import schedule_derivatives
+from .sharing import shared_image_cache
+import httpx
+import logging
+import tempfile
+import threading
+import uuid
+
+logger = logging.getLogger('text_to_image_project')
+
+# Bytes read from the response at a time, and kept in memory before spilling to a temporary file
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+# Downloads running at once in a process, whatever the concurrency of the worker
+download_slots = threading.BoundedSemaphore(settings.TEXT_TO_IMAGE_DOWNLOAD_CONCURRENCY)
+
+class DownloadError(Exception):
+    pass
+
+def check_download_url(url):
+    """
+    Only the HTTPS URLs of the hosts serving the generated images are downloaded,
+    as the URLs of the saved images are sent by the clients.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != 'https' or parts.hostname not in settings.TEXT_TO_IMAGE_DOWNLOAD_HOSTS:
+        raise DownloadError(f"Host not allowed: {parts.hostname}")
+
+def download(url, buffer):
+    """
+    Streams the content at `url` into `buffer` chunk by chunk, up to `TEXT_TO_IMAGE_DOWNLOAD_MAX_SIZE` bytes.
+    """
+    check_download_url(url)
+    with httpx.stream('GET', url, timeout=settings.TEXT_TO_IMAGE_DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        size = 0
+        for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.TEXT_TO_IMAGE_DOWNLOAD_MAX_SIZE:
+                raise DownloadError(f"Image larger than {settings.TEXT_TO_IMAGE_DOWNLOAD_MAX_SIZE} bytes")
+            buffer.write(chunk)
+
+def persist_image_url(image_generation_id):
+    """
+    Downloads the image of a saved 'url' image generation to the storage, replacing its URL,
+    which expires upstream, so that the image is kept like the 'b64_json' ones.
+
+    Returns whether the image was stored. On failure the URL is kept,
+    and the image is deleted once it expires by `sweep_expired_url_images`.
+    """
+    image = ImageGeneration.objects.filter(id=image_generation_id, image_url__isnull=False).first()
+    if image is None or image.image_file:
+        return False
+
+    try:
+        with download_slots, tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as buffer:
+            download(image.image_url, buffer)
+            buffer.seek(0)
+            name = image.image_file.field.generate_filename(image, f"{uuid.uuid4()}.png")
+            name = default_storage.save(name, File(buffer))
+    except (httpx.HTTPError, DownloadError) as e:
+        logger.warning(f"Could not download the image of ImageGeneration {image.id}: {e}")
+        return False
+
+    # Conditional update, as the image may have been deleted in the meantime
+    updated = ImageGeneration.objects.filter(id=image.id, image_url=image.image_url).update(image_file=name, image_url=None)
+    if not updated:
+        default_storage.delete(name)
+        return False
+
+    shared_image_cache.invalidate(image.share_token)   # Not signaled by `update`
+    schedule_derivatives(image.id)
+    logger.info(f"Stored the image of ImageGeneration {image.id} as {name}.")
+    return True
@@ -0,0 +1,34 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.urls import reverse
+import logging
+
+logger = logging.getLogger('text_to_image_project')
+
+def user_group_name(user_id):
+    """
+    Name of the channel layer group receiving the text to image events of a user.
+    """
+    return f"text_to_image_user_{user_id}"
+
+def send_job_update(job):
+    """
+    Pushes the status of a generation job to the connected clients of its owner, with the URL to fetch it from.
+    The result isn't pushed, as it can weigh several MB through the channel layer.
+    Delivery is best effort: clients not connected get the job by polling it.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            user_group_name(job.user_id),
+            {
+                "type": "image.job",
+                "job_id": str(job.id),
+                "status": job.status,
+                "url": reverse('image-generation-job-detail', args=[job.id]),
+            }
+        )
+    except Exception as e:
+        logger.warning(f"Could not push the status of image generation job {job.id}: {e}")
@@ -1,15 +1,26 @@
 import logging
-import base64
+import binascii
+import os
+import tempfile
 import uuid
-from django.core.files.base import ContentFile
+from django.core.files import File
+from django.db import transaction
 from ..models import ImageGeneration
+from ..tasks import persist_image_url
+from ..utils.decoding import decode_base64
+from .derivative_service import schedule_derivatives
 
 logger = logging.getLogger('text_to_image_log')
 
+# Bytes of a decoded image kept in memory before spilling to a temporary file
+SPOOL_SIZE = 1024 * 1024
+# Extensions kept for the uploaded images, the others are stored as '.png'
+UPLOAD_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
 class ImageCreationService:
     """
     Service responsible for saving generated images based on user selection.
-    Handles both URL and Base64 image data formats.
+    Handles both URL and Base64 image data formats, and the images uploaded as files.
     """
 
     def process_image_generation(self, user, validated_data):
@@ -18,17 +29,19 @@ class ImageCreationService:
 
         Args:
             user (User): The authenticated user saving the image.
-            validated_data (dict): Dictionary containing validated data including 'image_data'.
+            validated_data (dict): Dictionary containing validated data including 'image_data' (a URL or Base64 data)
+                or 'image_upload' (an uploaded file).
 
         Returns:
             ImageGeneration: The saved ImageGeneration instance.
 
         Raises:
-            ValueError: If no image data is provided or response_format is unsupported.
+            ValueError: If no image data is provided, the Base64 data is invalid or response_format is unsupported.
             Exception: If an error occurs during saving the image.
         """
         image_data = validated_data.pop('image_data', None)
-        if not image_data:
+        image_upload = validated_data.pop('image_upload', None)
+        if not image_data and image_upload is None:
             logger.error("No image data provided for saving.")
             raise ValueError("No image data provided for saving.")
 
@@ -47,17 +60,38 @@ class ImageCreationService:
             if image_generation.response_format == 'url':
                 image_generation.image_url = image_data
             elif image_generation.response_format == 'b64_json':
-                image_data_decoded = base64.b64decode(image_data)
-                filename = f"{uuid.uuid4()}.png"
-                image_file = ContentFile(image_data_decoded, name=filename)
-                image_generation.image_file = image_file
+                if image_upload is not None:
+                    # Written to the storage chunk by chunk, from memory or from the temporary file of the upload
+                    extension = os.path.splitext(image_upload.name)[1].lower()
+                    filename = f"{uuid.uuid4()}{extension if extension in UPLOAD_EXTENSIONS else '.png'}"
+                    image_generation.image_file.save(filename, image_upload, save=False)
+                else:
+                    self.save_base64(image_generation, image_data)
             else:
                 logger.error(f"Unsupported response_format: {image_generation.response_format}")
                 raise ValueError(f"Unsupported response_format: {image_generation.response_format}")
             image_generation.save()
+            if image_generation.image_url:
+                # Downloaded in background, before the URL expires upstream
+                transaction.on_commit(lambda: persist_image_url.delay(image_generation.id))
+            else:
+                schedule_derivatives(image_generation.id)
             logger.info(f"Image saved successfully for user {user.username}.")
             return image_generation
         except Exception as e:
             logger.error(f"Error saving image: {e}")
             image_generation.delete()
             raise e
+
+    def save_base64(self, image_generation, image_data):
+        """
+        Decode the Base64 image data in chunks to a temporary file, spilled to disk beyond `SPOOL_SIZE`,
+        and save it as the image file, so that the decoded image is never held in memory at once.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as buffer:
+            try:
+                decode_base64(image_data, buffer)
+            except binascii.Error as e:
+                raise ValueError(f"Invalid Base64 image data: {e}")
+            buffer.seek(0)
+            image_generation.image_file.save(f"{uuid.uuid4()}.png", File(buffer), save=False)
@@ -6,6 +6,9 @@ from rest_framework import status
 from rest_framework.response import Response
 from ..utils.handle_data import extract_data, validate_extracted_data
 from text_to_image_modules.exceptions import InvalidResponseError
+from ioverse.exceptions import UpstreamRateLimitException
+from client_modules.retry import retry_after
+import openai
 
 logger = logging.getLogger('text_to_image_log')
 
@@ -39,6 +42,31 @@ class ImageGenerationService:
             logger.error(f"Validation errors: {errors}")
             return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
+        # Generate images
+        try:
+            response_data = self.generate(extracted_data)
+            return Response({'images': response_data}, status=status.HTTP_200_OK)
+
+        except InvalidResponseError as e:
+            logger.error(f"Invalid response from AI service: {e}")
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except openai.RateLimitError as e:
+            logger.warning(f"Rate limit reached during image generation: {e}")
+            raise UpstreamRateLimitException(wait=retry_after(e))
+        except Exception as e:
+            logger.error(f"Error during image generation: {e}", exc_info=True)
+            return Response({'detail': 'Error during image generation.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def generate(self, extracted_data):
+        """
+        Generate the images of validated data, see `extract_data` and `validate_extracted_data`.
+
+        Returns:
+            list: The generated images, as {'image_url': ...} or {'image_base64': ...}.
+
+        Raises:
+            InvalidResponseError, openai.OpenAIError: If the generation fails.
+        """
         # Initialize TextToImage
         text_to_image_generator = TextToImage(
             ai_service=self.ai_service,
@@ -50,28 +78,18 @@ class ImageGenerationService:
             response_format=extracted_data['response_format'],
             style=extracted_data['style'],
         )
-        
-        # Generate images
-        try:
-            image_data_list = text_to_image_generator.generate_image(extracted_data['prompt'])
-            logger.info(f"{len(image_data_list)} image(s) generated successfully.")
-
-            # Prepare the response data
-            response_data = []
-            for image_data in image_data_list:
-                if extracted_data['response_format'] == 'url':
-                    response_data.append({'image_url': image_data})
-                elif extracted_data['response_format'] == 'b64_json':
-                    response_data.append({'image_base64': image_data})
-                else:
-                    # This should not happen due to prior validation
-                    logger.warning(f"Unhandled response_format: {extracted_data['response_format']}")
 
-            return Response({'images': response_data}, status=status.HTTP_200_OK)
+        image_data_list = text_to_image_generator.generate_image(extracted_data['prompt'])
+        logger.info(f"{len(image_data_list)} image(s) generated successfully.")
 
-        except InvalidResponseError as e:
-            logger.error(f"Invalid response from AI service: {e}")
-            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            logger.error(f"Error during image generation: {e}", exc_info=True)
-            return Response({'detail': 'Error during image generation.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Prepare the response data
+        response_data = []
+        for image_data in image_data_list:
+            if extracted_data['response_format'] == 'url':
+                response_data.append({'image_url': image_data})
+            elif extracted_data['response_format'] == 'b64_json':
+                response_data.append({'image_base64': image_data})
+            else:
+                # This should not happen due to prior validation
+                logger.warning(f"Unhandled response_format: {extracted_data['response_format']}")
+        return response_data
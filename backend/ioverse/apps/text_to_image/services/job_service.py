@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from text_to_image_modules.exceptions import InvalidResponseError
+from ioverse.exceptions import MissingApiKeyException, UpstreamRateLimitException
+from ..models import ImageGenerationJob
+from .events import send_job_update
+from .image_generation_service import ImageGenerationService
+import logging
+import openai
+
+logger = logging.getLogger('text_to_image_project')
+
+INTERRUPTED_ERROR = 'The generation was interrupted.'
+
+def submit_generation_job(user, parameters, idempotency_key=None):
+    """
+    Creates a job generating the images of validated `parameters` (see `validate_extracted_data`),
+    dispatched to a worker once the job is committed.
+
+    A job already submitted by the user with the same `idempotency_key` is returned instead,
+    so that a retried submission (e.g. a double click) doesn't generate and bill the images twice.
+
+    Returns the job and whether it was created.
+    """
+    from ..tasks import run_image_generation_job  # The tasks use the job service
+
+    if idempotency_key:
+        job = ImageGenerationJob.objects.filter(user=user, idempotency_key=idempotency_key).first()
+        if job is not None:
+            return job, False
+
+    try:
+        with transaction.atomic():
+            job = ImageGenerationJob.objects.create(
+                user=user,
+                idempotency_key=idempotency_key or None,
+                parameters=parameters,
+            )
+    except IntegrityError:
+        # Submitted concurrently with the same key
+        return ImageGenerationJob.objects.get(user=user, idempotency_key=idempotency_key), False
+
+    transaction.on_commit(lambda: run_image_generation_job.delay(str(job.id)))
+    logger.info(f"Image generation job {job.id} submitted by user {user.username}.")
+    return job, True
+
+def run_generation_job(job_id):
+    """
+    Runs a pending job, recording its result and pushing it to the owner.
+    A job already taken (e.g. by a task delivered twice) is left alone,
+    and the result of a job failed by `expire_generation_jobs` in the meantime is discarded.
+    """
+    now = timezone.now()
+    claimed = ImageGenerationJob.objects.filter(id=job_id, status='pending').update(
+        status='running', started_at=now, updated_at=now
+    )
+    if not claimed:
+        logger.info(f"Image generation job {job_id} already taken, skipped.")
+        return None
+
+    job = ImageGenerationJob.objects.select_related('user').get(id=job_id)
+    send_job_update(job)
+
+    api_key = getattr(job.user, 'api_key', None)
+    result, error = None, ''
+    if not api_key:
+        error = MissingApiKeyException.default_detail
+    else:
+        try:
+            result = {'images': ImageGenerationService(api_key=api_key).generate(job.parameters)}
+        except InvalidResponseError as e:
+            logger.error(f"Invalid response from AI service for job {job.id}: {e}")
+            error = str(e)
+        except openai.RateLimitError as e:
+            logger.warning(f"Rate limit reached during image generation job {job.id}: {e}")
+            error = UpstreamRateLimitException.default_detail
+        except Exception as e:
+            logger.error(f"Error during image generation job {job.id}: {e}", exc_info=True)
+            error = 'Error during image generation.'
+
+    job.status = 'failed' if error else 'succeeded'
+    job.result = result
+    job.error = error
+    job.updated_at = timezone.now()
+    # Conditional update, as the job may have been expired in the meantime, its failure already pushed
+    finished = ImageGenerationJob.objects.filter(id=job.id, status='running').update(
+        status=job.status, result=job.result, error=job.error, updated_at=job.updated_at
+    )
+    if not finished:
+        logger.warning(f"Image generation job {job.id} expired while running, result discarded.")
+        return None
+
+    send_job_update(job)
+    return job
+
+def expire_generation_jobs():
+    """
+    Fails the jobs left pending or running by a lost worker, pushing the failure to their owners,
+    and deletes the jobs older than their retention, after which their idempotency keys can be used again.
+    Returns the number of jobs failed and deleted.
+    """
+    now = timezone.now()
+    timeout = now - timezone.timedelta(minutes=settings.TEXT_TO_IMAGE_JOB_TIMEOUT)
+    # Running jobs from their start, as they may have waited in the queue
+    lost = Q(status='pending', created_at__lt=timeout) | Q(status='running', started_at__lt=timeout)
+    expired_ids = list(ImageGenerationJob.objects.filter(lost).values_list('id', flat=True))
+    interrupted = 0
+    if expired_ids:
+        # Conditions repeated, as the jobs may have been started or finished in the meantime
+        interrupted = ImageGenerationJob.objects.filter(lost, id__in=expired_ids).update(
+            status='failed', error=INTERRUPTED_ERROR, updated_at=now
+        )
+        for job in ImageGenerationJob.objects.filter(id__in=expired_ids, status='failed', updated_at=now):
+            send_job_update(job)
+
+    deleted, _ = ImageGenerationJob.objects.filter(
+        created_at__lt=now - timezone.timedelta(hours=settings.TEXT_TO_IMAGE_JOB_RETENTION)
+    ).delete()
+    return interrupted, deleted
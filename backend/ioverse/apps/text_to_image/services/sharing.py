@@ -0,0 +1,7 @@
+from django.conf import settings
+
+from ioverse.cache import CacheAside
+
+# Shared images, read by anyone having the link.
+# Keyed by share token, invalidated by the signal handlers when the image changes
+shared_image_cache = CacheAside('text_to_image:shared-images', timeout=settings.SHARED_CONTENT_CACHE_TIMEOUT)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ImageGeneration
+from .services.sharing import shared_image_cache
+
+@receiver(post_save, sender=ImageGeneration)
+@receiver(post_delete, sender=ImageGeneration)
+def invalidate_shared_image(sender, instance, **kwargs):
+    shared_image_cache.invalidate(instance.share_token)
@@ -1,7 +1,12 @@
 from celery import shared_task
 from django.utils import timezone
 
-from .services.cleanup_service import trigger_clean
+from ioverse.media import collect_media_garbage as collect_garbage
+
+from .services.cleanup_service import sweep_expired_url_images
+from .services.derivative_service import build_derivatives
+from .services.download_service import persist_image_url as download_image_url
+from .services.job_service import expire_generation_jobs, run_generation_job
 from .models import ImageGeneration
 import logging
 
@@ -24,14 +29,48 @@ def unshare_expired_images():
 
     expired_images.update(is_shared=False, shared_at=None, expires_at=None)
 
-@shared_task
+@shared_task(soft_time_limit=60 * 4, time_limit=60 * 5)
 def cleanup_expired_url_images():
     """
     Celery task to clean up expired images with response_format 'url'.
-    This task triggers the clean function in a separate thread.
+    Returns the metrics of the sweep.
+    """
+    return sweep_expired_url_images()
+
+@shared_task(soft_time_limit=60, time_limit=90)
+def persist_image_url(image_generation_id):
+    """
+    Celery task downloading the image of a saved 'url' image generation, before its URL expires.
+    """
+    return download_image_url(image_generation_id)
+
+@shared_task(soft_time_limit=60, time_limit=90)
+def build_image_derivatives(image_generation_id):
+    """
+    Celery task building the thumbnail and preview of a stored image.
+    """
+    return build_derivatives(image_generation_id)
+
+@shared_task(soft_time_limit=60 * 25, time_limit=60 * 30)
+def collect_media_garbage(dry_run=False):
+    """
+    Celery task removing the media files no longer referenced by the images and assistant files.
+    Returns the metrics of the collection.
+    """
+    return collect_garbage(dry_run=dry_run)
+
+@shared_task(soft_time_limit=60 * 2, time_limit=60 * 3)
+def run_image_generation_job(job_id):
+    """
+    Celery task generating the images of a job submitted through the API.
+    """
+    run_generation_job(job_id)
+
+@shared_task
+def expire_image_generation_jobs():
+    """
+    A Celery task that fails the generation jobs interrupted by a lost worker
+    and deletes the jobs past their retention.
     """
-    try:
-        logger.info("Starting cleanup of expired URL images.")
-        trigger_clean()
-    except Exception as e:
-        logger.exception(f"Error while triggering cleanup: {e}")
\ No newline at end of file
+    interrupted, deleted = expire_generation_jobs()
+    logger.info(f"Failed {interrupted} interrupted and deleted {deleted} expired image generation jobs.")
@@ -1,3 +1,573 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import base64
+import binascii
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
+import httpx
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from PIL import Image
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from ioverse.testing import QueryPlanTestMixin
+from .consumers import ImageEventsConsumer
+from .models import ImageGeneration, ImageGenerationJob
+from .services.cleanup_service import SWEEP_LOCK_KEY, sweep_expired_url_images
+from .services.derivative_service import DERIVATIVE_EXTENSION, build_derivatives
+from .services.events import send_job_update
+from .services.image_generation_service import ImageGenerationService
+from .services.sharing import shared_image_cache
+from .services.job_service import expire_generation_jobs, run_generation_job
+from .utils.handle_data import extract_data
+from .utils.decoding import decode_base64
+
+User = get_user_model()
+
+class ImageGenerationQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """
+    Runs EXPLAIN on the hot queries of text_to_image, failing if one regresses to a full scan.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        ImageGeneration.objects.create(user=self.user, prompt='A cat', image_url='https://example.com/cat.png')
+        ImageGeneration.objects.create(user=self.user, prompt='A dog', response_format='b64_json')
+
+    def test_image_list(self):
+        with self.assertNoFullScans('text_to_image_imagegeneration'):
+            response = self.client.get(reverse('image-generation-list'), {'page_size': 1})
+            self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_expired_shares_sweep(self):
+        # Unordered, as read by the update of the sweep
+        expired_images = ImageGeneration.objects.filter(is_shared=True, expires_at__lt=timezone.now()).order_by()
+        self.assertUsesIndex(expired_images, 'image_share_expiry_idx')
+
+    def test_expired_url_cleanup(self):
+        expiration_threshold = timezone.now() - timezone.timedelta(minutes=60)
+        expired_images = ImageGeneration.objects.filter(image_url__isnull=False, created_at__lt=expiration_threshold).order_by()
+        self.assertUsesIndex(expired_images, 'image_url_created_idx')
+
+class ExpiredImageSweepTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        expired = timezone.now() - timezone.timedelta(hours=2)
+        for i in range(5):
+            image = ImageGeneration.objects.create(user=self.user, prompt=f'Expired {i}', image_url='https://example.com/image.png')
+            ImageGeneration.objects.filter(id=image.id).update(created_at=expired)
+        self.recent = ImageGeneration.objects.create(user=self.user, prompt='Recent', image_url='https://example.com/image.png')
+        self.b64 = ImageGeneration.objects.create(user=self.user, prompt='Stored', response_format='b64_json')
+        ImageGeneration.objects.filter(id=self.b64.id).update(created_at=expired)
+
+    def test_sweep_deletes_expired_url_images_in_batches(self):
+        metrics = sweep_expired_url_images(batch_size=2)
+        self.assertEqual(metrics['deleted'], 5)
+        self.assertEqual(metrics['batches'], 3)
+        self.assertFalse(metrics['skipped'])
+        self.assertEqual(
+            set(ImageGeneration.objects.values_list('id', flat=True)),
+            {self.recent.id, self.b64.id}
+        )
+        # The lock is released
+        self.assertIsNone(cache.get(SWEEP_LOCK_KEY))
+
+    def test_single_flight(self):
+        cache.add(SWEEP_LOCK_KEY, True)
+        metrics = sweep_expired_url_images()
+        self.assertTrue(metrics['skipped'])
+        self.assertEqual(ImageGeneration.objects.count(), 7)
+
+    def test_requests_do_not_sweep(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse('image-generation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Listed until swept, as the listing doesn't filter on the expiration
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertEqual(ImageGeneration.objects.count(), 7)
+
+class SharedImageTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.image = ImageGeneration.objects.create(
+            user=self.user, prompt='A cat', image_url='https://example.com/cat.png',
+            is_shared=True, shared_at=timezone.now(), expires_at=timezone.now() + timezone.timedelta(hours=1)
+        )
+        self.url = reverse('shared-image', args=[self.image.share_token])
+
+    def test_payload_is_cached(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {'image': 'https://example.com/cat.png'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data, response.data)
+
+    def test_expired_share_only_resets_the_sharing(self):
+        ImageGeneration.objects.filter(id=self.image.id).update(expires_at=timezone.now() - timezone.timedelta(minutes=1))
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {'detail': 'This shared link has expired'})
+
+        self.image.refresh_from_db()
+        self.assertFalse(self.image.is_shared)
+        self.assertIsNone(self.image.expires_at)
+        self.assertEqual(self.image.image_url, 'https://example.com/cat.png')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+class SlowAIService:
+    """
+    Stands in for the OpenAI service, taking `delay` seconds per request.
+    """
+    def __init__(self, delay=0.3):
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def generate_image(self, prompt, n=1, **kwargs):
+        with self.lock:
+            self.requests.append(n)
+            index = len(self.requests)
+        time.sleep(self.delay)
+        return SimpleNamespace(data=[
+            SimpleNamespace(url=f'https://example.com/{index}-{i}.png', b64_json=None, revised_prompt=None)
+            for i in range(n)
+        ])
+
+class ParallelGenerationTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ImageGenerationService(api_key='sk-test')
+        self.ai_service = self.service.ai_service = SlowAIService()
+        self.data = {
+            'prompt': 'A lighthouse',
+            'model_used': 'dall-e-3',
+            'n': 4,
+            'quality': 'standard',
+            'size': '1024x1024',
+            'style': 'vivid',
+        }
+
+    def test_dalle3_images_are_requested_in_parallel(self):
+        started = time.monotonic()
+        response = self.service.generate_images(self.data)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['images']), 4)
+        self.assertEqual(len({image['image_url'] for image in response.data['images']}), 4)
+        self.assertEqual(self.ai_service.requests, [1, 1, 1, 1])
+        # About one request long, not four
+        self.assertLess(elapsed, self.ai_service.delay * 2)
+
+    def test_images_of_the_successful_requests_are_returned(self):
+        generate_image = self.ai_service.generate_image
+
+        def fail_second_request(prompt, **kwargs):
+            response = generate_image(prompt, **kwargs)
+            # Rejected on the first attempt: not retried
+            return SimpleNamespace(data=[]) if response.data[0].url.startswith('https://example.com/2-') else response
+
+        self.ai_service.generate_image = fail_second_request
+        response = self.service.generate_images(self.data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['images']), 3)
+
+    def test_error_is_returned_when_every_request_failed(self):
+        self.ai_service.generate_image = lambda prompt, **kwargs: SimpleNamespace(data=[])
+        response = self.service.generate_images(self.data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dalle2_images_are_requested_at_once(self):
+        response = self.service.generate_images({'prompt': 'A lighthouse', 'model_used': 'dall-e-2', 'n': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['images']), 3)
+        self.assertEqual(self.ai_service.requests, [3])
+
+    def test_dalle3_n_is_bounded(self):
+        response = self.service.generate_images({**self.data, 'n': 5})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('n', response.data)
+        self.assertEqual(self.ai_service.requests, [])
+
+class ImageGenerationJobTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', api_key='test_api_key')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('image-generation-job-list')
+        self.data = {'prompt': 'A lighthouse', 'model_used': 'dall-e-2', 'n': 2, 'size': '256x256'}
+
+        self.ai_service = SlowAIService(delay=0)
+        patcher = patch('apps.text_to_image.services.image_generation_service.OpenAIService', return_value=self.ai_service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, data=None, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, data or self.data, format='json', **headers)
+
+    def test_job_is_answered_at_once_and_run_by_a_worker(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertIn('Retry-After', response)
+        self.assertTrue(response['Location'].endswith(reverse('image-generation-job-detail', args=[response.data['id']])))
+
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'succeeded')
+        self.assertEqual(len(response.data['result']['images']), 2)
+        self.assertNotIn('Retry-After', response)
+
+    def test_idempotent_submission(self):
+        first = self.submit(key='click-1')
+        second = self.submit(key='click-1')
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(ImageGenerationJob.objects.count(), 1)
+        # Generated (and billed) once
+        self.assertEqual(self.ai_service.requests, [2])
+
+        self.submit(key='click-2')
+        self.assertEqual(ImageGenerationJob.objects.count(), 2)
+
+    def test_idempotency_key_reused_for_another_request(self):
+        self.submit(key='click-1')
+        response = self.submit({**self.data, 'prompt': 'A harbour'}, key='click-1')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_invalid_parameters(self):
+        response = self.submit({**self.data, 'model_used': 'dall-e-3', 'n': 5})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('n', response.data)
+        self.assertFalse(ImageGenerationJob.objects.exists())
+
+    def test_failed_generation(self):
+        self.ai_service.generate_image = lambda prompt, **kwargs: SimpleNamespace(data=[])
+        response = self.submit()
+        job = ImageGenerationJob.objects.get(id=response.data['id'])
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.result)
+        self.assertTrue(job.error)
+
+    def test_jobs_of_other_users_are_hidden(self):
+        other = User.objects.create_user(username='other', password='testpass')
+        job = ImageGenerationJob.objects.create(user=other, parameters=self.data)
+        response = self.client.get(reverse('image-generation-job-detail', args=[job.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expiration(self):
+        long_ago = timezone.now() - timezone.timedelta(minutes=30)
+        interrupted = ImageGenerationJob.objects.create(user=self.user, parameters=self.data, status='running')
+        lost = ImageGenerationJob.objects.create(user=self.user, parameters=self.data)
+        # Waited in the queue, but started recently
+        queued = ImageGenerationJob.objects.create(
+            user=self.user, parameters=self.data, status='running', started_at=timezone.now()
+        )
+        old = ImageGenerationJob.objects.create(user=self.user, parameters=self.data, status='succeeded', idempotency_key='click-1')
+        recent = ImageGenerationJob.objects.create(user=self.user, parameters=self.data)
+        ImageGenerationJob.objects.filter(id=interrupted.id).update(created_at=long_ago, started_at=long_ago)
+        ImageGenerationJob.objects.filter(id__in=[lost.id, queued.id]).update(created_at=long_ago)
+        ImageGenerationJob.objects.filter(id=old.id).update(created_at=timezone.now() - timezone.timedelta(days=2))
+
+        with patch('apps.text_to_image.services.job_service.send_job_update') as send_job_update:
+            self.assertEqual(expire_generation_jobs(), (2, 1))
+        for job in (interrupted, lost):
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'failed')
+        # The failures are pushed to the owner
+        self.assertEqual(
+            {(job.id, job.status) for job, in (call.args for call in send_job_update.call_args_list)},
+            {(interrupted.id, 'failed'), (lost.id, 'failed')}
+        )
+        self.assertFalse(ImageGenerationJob.objects.filter(id=old.id).exists())
+        for job in (queued, recent):
+            status_before = job.status
+            job.refresh_from_db()
+            self.assertEqual(job.status, status_before)
+
+    def test_result_of_an_expired_job_is_discarded(self):
+        job = ImageGenerationJob.objects.create(user=self.user, parameters=extract_data(self.data))
+        generate_image = self.ai_service.generate_image
+
+        def expire_then_generate(prompt, **kwargs):
+            # Expired by `expire_generation_jobs` while generating
+            ImageGenerationJob.objects.filter(id=job.id).update(status='failed', error='The generation was interrupted.')
+            return generate_image(prompt, **kwargs)
+
+        self.ai_service.generate_image = expire_then_generate
+        with patch('apps.text_to_image.services.job_service.send_job_update') as send_job_update:
+            self.assertIsNone(run_generation_job(job.id))
+        job.refresh_from_db()
+        self.assertIsNotNone(job.started_at)
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.result)
+        # Only the start is pushed, not the discarded result
+        self.assertEqual(send_job_update.call_count, 1)
+
+    def test_progress_is_pushed_to_the_owner(self):
+        job = ImageGenerationJob.objects.create(
+            user=self.user, parameters=self.data, status='succeeded', result={'images': []}
+        )
+
+        async def receive_update():
+            communicator = WebsocketCommunicator(ImageEventsConsumer.as_asgi(), "/ws/text-to-image/events")
+            communicator.scope['user'] = self.user
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await sync_to_async(send_job_update)(job)
+            event = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return event
+
+        event = async_to_sync(receive_update)()
+        self.assertEqual(event, {
+            "type": "job",
+            "data": {
+                "id": str(job.id),
+                "status": "succeeded",
+                "url": reverse('image-generation-job-detail', args=[job.id]),
+            }
+        })
+
+IMAGE_URL = 'https://images.example.com/generated.png'
+
+@override_settings(TEXT_TO_IMAGE_DOWNLOAD_HOSTS=['images.example.com'])
+class ImageDownloadTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.content = b'\x89PNG' + os.urandom(200 * 1024)
+        self.serve(lambda request: httpx.Response(200, content=self.content))
+
+    def serve(self, handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        patcher = patch(
+            'apps.text_to_image.services.download_service.httpx.stream',
+            lambda method, url, **kwargs: client.stream(method, url, **kwargs)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, image_url=IMAGE_URL):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('image-generation-list'), {
+                'prompt': 'A lighthouse',
+                'image_data': image_url,
+                'response_format': 'url',
+                'size': '512x512',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return ImageGeneration.objects.get(id=response.data['id'])
+
+    def test_url_image_is_stored_when_saved(self):
+        image = self.save()
+        self.assertIsNone(image.image_url)
+        self.assertTrue(image.image_file.name.startswith('generated_images/'))
+        with image.image_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+        # Kept once its URL expired
+        ImageGeneration.objects.filter(id=image.id).update(created_at=timezone.now() - timezone.timedelta(hours=2))
+        sweep_expired_url_images()
+        self.assertTrue(ImageGeneration.objects.filter(id=image.id).exists())
+
+    def test_other_hosts_are_not_downloaded(self):
+        requests = []
+        self.serve(lambda request: requests.append(request) or httpx.Response(200, content=self.content))
+        image = self.save('https://internal.example.org/secret.png')
+        self.assertEqual(requests, [])
+        self.assertEqual(image.image_url, 'https://internal.example.org/secret.png')
+        self.assertFalse(image.image_file)
+
+    def test_failed_download_keeps_the_url(self):
+        self.serve(lambda request: httpx.Response(403))
+        image = self.save()
+        self.assertEqual(image.image_url, IMAGE_URL)
+        self.assertFalse(image.image_file)
+
+    @override_settings(TEXT_TO_IMAGE_DOWNLOAD_MAX_SIZE=100 * 1024)
+    def test_oversized_download_is_dropped(self):
+        image = self.save()
+        self.assertEqual(image.image_url, IMAGE_URL)
+        self.assertFalse(image.image_file)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'generated_images')))
+
+class ImageDerivativeTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def save(self, size=(1280, 720)):
+        buffer = BytesIO()
+        Image.effect_noise(size, 64).convert('RGB').save(buffer, format='PNG')
+        self.original_size = len(buffer.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('image-generation-list'), {
+                'prompt': 'A lighthouse',
+                'image_data': base64.b64encode(buffer.getvalue()).decode(),
+                'response_format': 'b64_json',
+                'size': '512x512',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return ImageGeneration.objects.get(id=response.data['id'])
+
+    def test_derivatives_are_built_when_saved(self):
+        image = self.save()
+        stem = os.path.splitext(image.image_file.name)[0]
+        for file, longest_side in ((image.thumbnail_file, 512), (image.preview_file, 1024)):
+            self.assertTrue(file.name.startswith(stem))
+            self.assertTrue(file.name.endswith(f'.{DERIVATIVE_EXTENSION}'))
+            with Image.open(file.path) as derivative:
+                self.assertEqual(max(derivative.size), longest_side)
+                # The aspect ratio is kept
+                self.assertAlmostEqual(derivative.size[0] / derivative.size[1], 1280 / 720, places=1)
+        self.assertLess(image.thumbnail_file.size * 10, self.original_size)
+
+    def test_list_exposes_the_derivatives(self):
+        image = self.save()
+        response = self.client.get(reverse('image-generation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertTrue(result['image_thumbnail'].endswith(image.thumbnail_file.url))
+        self.assertTrue(result['image_preview'].endswith(image.preview_file.url))
+
+    def test_list_falls_back_to_the_original(self):
+        ImageGeneration.objects.create(user=self.user, prompt='A cat', image_url='https://example.com/cat.png')
+        response = self.client.get(reverse('image-generation-list'))
+        self.assertEqual(response.data['results'][0]['image_thumbnail'], 'https://example.com/cat.png')
+
+    def test_derivatives_are_deleted_with_the_image(self):
+        image = self.save()
+        paths = [image.image_file.path, image.thumbnail_file.path, image.preview_file.path]
+        image.delete()
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    def test_build_invalidates_the_shared_image(self):
+        image = self.save()
+        shared_image_cache.set(image.share_token, {'image': 'cached'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(build_derivatives(image.id))
+        self.assertIsNone(shared_image_cache.get(image.share_token))
+
+    def test_rebuild_replaces_the_derivatives(self):
+        image = self.save()
+        previous = image.thumbnail_file.path
+        self.assertTrue(build_derivatives(image.id))
+        image.refresh_from_db()
+        self.assertTrue(os.path.exists(image.thumbnail_file.path))
+        self.assertFalse(os.path.exists(previous))
+
+    def test_invalid_image(self):
+        image = ImageGeneration.objects.create(user=self.user, prompt='A cat', response_format='b64_json')
+        image.image_file.save('broken.png', ContentFile(b'not an image'))
+        self.assertFalse(build_derivatives(image.id))
+        image.refresh_from_db()
+        self.assertFalse(image.thumbnail_file)
+
+class Base64DecodingTests(SimpleTestCase):
+    def test_decodes_across_chunks(self):
+        content = os.urandom(1000)
+        encoded = base64.b64encode(content).decode()
+        for chunk_size in (4, 7, 64, 4096):
+            output = BytesIO()
+            self.assertEqual(decode_base64(encoded, output, chunk_size=chunk_size), len(content))
+            self.assertEqual(output.getvalue(), content)
+
+    def test_skips_whitespace(self):
+        content = os.urandom(300)
+        encoded = base64.encodebytes(content).decode()   # Lines of 76 characters
+        output = BytesIO()
+        decode_base64(encoded, output, chunk_size=50)
+        self.assertEqual(output.getvalue(), content)
+
+    def test_invalid_data(self):
+        for data in ('QUJD?', 'QUJDRA=', 'QQ==QUJD'):
+            with self.assertRaises(binascii.Error):
+                decode_base64(data, BytesIO(), chunk_size=4)
+
+class ImageUploadTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('image-generation-list')
+        self.data = {'prompt': 'A lighthouse', 'response_format': 'b64_json', 'size': '512x512'}
+
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), 'navy').save(buffer, format='PNG')
+        self.content = buffer.getvalue()
+
+    def test_multipart_upload(self):
+        upload = SimpleUploadedFile('image.png', self.content, content_type='image/png')
+        response = self.client.post(self.url, {**self.data, 'image_upload': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        image = ImageGeneration.objects.get(id=response.data['id'])
+        self.assertTrue(image.image_file.name.endswith('.png'))
+        with image.image_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_base64_data(self):
+        response = self.client.post(self.url, {**self.data, 'image_data': base64.b64encode(self.content).decode()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        image = ImageGeneration.objects.get(id=response.data['id'])
+        with image.image_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_invalid_base64_data(self):
+        response = self.client.post(self.url, {**self.data, 'image_data': 'not base64!'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImageGeneration.objects.exists())
+
+    def test_upload_requires_an_image(self):
+        upload = SimpleUploadedFile('image.png', b'not an image', content_type='image/png')
+        response = self.client.post(self.url, {**self.data, 'image_upload': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image_upload', response.data)
+
+    def test_upload_requires_b64_json_format(self):
+        upload = SimpleUploadedFile('image.png', self.content, content_type='image/png')
+        response = self.client.post(self.url, {**self.data, 'response_format': 'url', 'image_upload': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image_upload', response.data)
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ImageGenerationViewSet, SharedImageView
+from .views import ImageGenerationJobViewSet, ImageGenerationViewSet, SharedImageView
 
 router = DefaultRouter()
 router.register(r'image-generations', ImageGenerationViewSet, basename='image-generation')
+router.register(r'image-generation-jobs', ImageGenerationJobViewSet, basename='image-generation-job')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,39 @@
+import base64
+import binascii
+
+# Base64 characters decoded at a time, a multiple of 4 (48 KiB of binary data)
+BASE64_CHUNK_SIZE = 64 * 1024
+
+def decode_base64(data, output, chunk_size=BASE64_CHUNK_SIZE):
+    """
+    Decodes the base64 string `data` into the binary file `output` chunk by chunk,
+    so that the decoded content is never held in memory at once.
+    Whitespace, such as line breaks, is skipped.
+
+    Args:
+        data (str): The base64 data.
+        output (file): A binary file open for writing.
+        chunk_size (int): The number of characters of `data` decoded at a time.
+
+    Returns:
+        int: The number of bytes written.
+
+    Raises:
+        binascii.Error: If `data` is not valid base64.
+    """
+    pending = ''
+    padded = False
+    written = 0
+    for start in range(0, len(data), chunk_size):
+        chunk = pending + ''.join(data[start:start + chunk_size].split())
+        if padded and chunk:
+            # Padding only ends the data, which each chunk can't tell on its own
+            raise binascii.Error("Excess data after padding")
+        # Only whole groups of 4 characters are decoded, the rest is carried to the next chunk
+        usable = len(chunk) - len(chunk) % 4
+        written += output.write(base64.b64decode(chunk[:usable], validate=True))
+        padded = chunk[:usable].endswith('=')
+        pending = chunk[usable:]
+    if pending:
+        raise binascii.Error("Incorrect padding")
+    return written
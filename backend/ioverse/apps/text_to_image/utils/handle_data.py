@@ -39,8 +39,9 @@ def validate_extracted_data(data):
             errors['prompt'] = f'Prompt must be less than {max_length} characters.'
 
     if data['model_used'] == 'dall-e-3':
-        if data['n'] != 1:
-            errors['n'] = 'For dall-e-3, only n=1 is supported.'
+        # Generated one per request, in parallel
+        if not (1 <= data['n'] <= 4):
+            errors['n'] = 'For dall-e-3, n must be between 1 and 4.'
 
     elif data['model_used'] == 'dall-e-2':
         if not (1 <= data['n'] <= 10):
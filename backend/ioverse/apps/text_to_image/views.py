@@ -1,23 +1,27 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
-from django.db.models import Q
 
 from ioverse.exceptions import MissingApiKeyException
-from .models import ImageGeneration
+from .models import ImageGeneration, ImageGenerationJob
+from .pagination import ImageGenerationCursorPagination
 from .serializers import (
     ImageGenerationSerializer,
     ImageGenerationDetailSerializer,
     ImageGenerationListSerializer,
+    ImageGenerationJobSerializer,
     SharedImageSerializer,
 )
 from .services.image_creation_service import ImageCreationService
 from .services.image_generation_service import ImageGenerationService
-from .services.cleanup_service import trigger_clean
+from .services.job_service import submit_generation_job
+from .services.sharing import shared_image_cache
+from .utils.handle_data import extract_data, validate_extracted_data
 
 import logging
 
@@ -31,25 +35,16 @@ class ImageGenerationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     queryset = ImageGeneration.objects.all()
     serializer_class = ImageGenerationSerializer  # Default serializer
+    pagination_class = ImageGenerationCursorPagination
     throttle_scope = 'images'
         
     def get_queryset(self):
         """
-        Retrieve ImageGeneration objects for the authenticated user,
-        excluding expired 'url' images.
-        Also triggers a background cleanup of expired images.
+        Retrieve ImageGeneration objects for the authenticated user.
+        The 'url' images are stored locally once saved, those whose download failed
+        are deleted when their URL expires by the periodic `cleanup_expired_url_images` task.
         """
-        # Trigger the cleanup asynchronously
-        trigger_clean()
-        
-        user = self.request.user
-        now = timezone.now()
-        expiration_threshold = now - timezone.timedelta(minutes=60)
-        
-        return ImageGeneration.objects.filter(user=user).filter(
-            Q(response_format='b64_json') |
-            Q(response_format='url', created_at__gte=expiration_threshold)
-        )
+        return ImageGeneration.objects.filter(user=self.request.user)
 
     def get_serializer_class(self):
         """
@@ -65,7 +60,8 @@ class ImageGenerationViewSet(viewsets.ModelViewSet):
     
     def create(self, request, *args, **kwargs):
         """
-        Save a generated image selected by the user.
+        Save a generated image selected by the user, sent as `image_data` (a URL or Base64 data),
+        or as an `image_upload` file of a multipart request, which avoids the Base64 overhead.
         """
         serializer = self.get_serializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -80,6 +76,8 @@ class ImageGenerationViewSet(viewsets.ModelViewSet):
                 )
                 logger.info(f"Image saved successfully for user {request.user.username}.")
                 return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 logger.exception(f"Unexpected error during image saving: {e}")
                 return Response(
@@ -163,6 +161,72 @@ class ImageGenerationViewSet(viewsets.ModelViewSet):
         logger.info(f"ImageGeneration {image_generation.id} deleted by user {request.user.username}.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class ImageGenerationJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Generation of images in background: a job is submitted and answered at once,
+    then polled until finished, or its progress received on `ws/text-to-image/events`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ImageGenerationJobSerializer
+    # Seconds after which the clients should poll an unfinished job again
+    poll_interval = 2
+
+    @property
+    def throttle_scope(self):
+        # Only the submissions are throttled as generations, the polling by the user rate
+        return 'images' if self.action == 'create' else None
+
+    def get_queryset(self):
+        return ImageGenerationJob.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Submit the generation of images, with the same prompt and options of the `generate` action.
+        A submission retried with the same `Idempotency-Key` header returns the job of the first one.
+        Returns 202 with the job when submitted, 200 when already submitted.
+        """
+        # Retrieve the OpenAI api key for the user
+        api_key = getattr(request.user, 'api_key', None)
+        if not api_key:
+            raise MissingApiKeyException()
+
+        parameters = extract_data(request.data)
+        errors = validate_extracted_data(parameters)
+        if errors:
+            logger.error(f"Validation errors: {errors}")
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key and len(idempotency_key) > ImageGenerationJob._meta.get_field('idempotency_key').max_length:
+            return Response({'detail': 'Idempotency key too long.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        job, created = submit_generation_job(request.user, parameters, idempotency_key)
+        if not created and job.parameters != parameters:
+            return Response(
+                {'detail': 'Idempotency key already used for a different request.'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        job.refresh_from_db()   # Already finished if the worker runs eagerly
+        serializer = self.get_serializer(job)
+        headers = {'Location': request.build_absolute_uri(reverse('image-generation-job-detail', args=[job.id]))}
+        if not job.is_finished:
+            headers['Retry-After'] = str(self.poll_interval)
+        return Response(
+            serializer.data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+            headers=headers
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve the status of a job, and its result once finished.
+        """
+        job = self.get_object()
+        serializer = self.get_serializer(job)
+        headers = {} if job.is_finished else {'Retry-After': str(self.poll_interval)}
+        return Response(serializer.data, headers=headers)
+
 class SharedImageView(APIView):
     permission_classes = [permissions.AllowAny]
     
@@ -170,13 +234,19 @@ class SharedImageView(APIView):
         """
         Retrieve a shared image using the 'share_token'
         Only returns the image if 'is_shared=True'
+        The payload is cached until the image changes, and never past the expiration.
         """
-        image = get_object_or_404(ImageGeneration, share_token=share_token, is_shared=True)
-        
-        # Check for expiration
-        if image.expires_at and timezone.now() > image.expires_at:
-            image.unshare()
-            return Response({'detail': 'This shared link has expired'}, status=status.HTTP_200_OK)
+        payload = shared_image_cache.get(share_token)
+        if payload is None:
+            image = get_object_or_404(ImageGeneration, share_token=share_token, is_shared=True)
+
+            # Check for expiration
+            if image.expires_at and timezone.now() > image.expires_at:
+                # Only the sharing columns, the files may have changed since the image was read
+                ImageGeneration.objects.filter(id=image.id).update(is_shared=False, shared_at=None, expires_at=None)
+                shared_image_cache.invalidate(share_token)   # Not signaled by `update`
+                return Response({'detail': 'This shared link has expired'}, status=status.HTTP_200_OK)
 
-        serializer = SharedImageSerializer(image, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            payload = SharedImageSerializer(image, context={'request': request}).data
+            shared_image_cache.set(share_token, payload, timeout=shared_image_cache.timeout_until(image.expires_at))
+        return Response(payload, status=status.HTTP_200_OK)
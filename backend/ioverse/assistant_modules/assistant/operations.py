@@ -1,8 +1,8 @@
-from openai import OpenAI
+from client_modules.registry import get_client
 
 class AssistantClient:
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
 
     def create_assistant(self, **kwargs):
         return self.client.beta.assistants.create(**kwargs)
@@ -1,8 +1,8 @@
-from openai import OpenAI
+from client_modules.registry import get_client
 
 class MessageClient:
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
 
     def create_message(self, thread_id, **kwargs):
         return self.client.beta.threads.messages.create(thread_id, **kwargs)
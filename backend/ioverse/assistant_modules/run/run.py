@@ -1,5 +1,4 @@
-from openai import OpenAI
-from openai import AsyncOpenAI
+from client_modules.registry import get_client, get_async_client
 from .helpers import handle_errors, clean
 
 class Run:
@@ -12,8 +11,16 @@ class Run:
         """
         Initializes the Run class with the provided OpenAI API key.
         """
-        self.client = OpenAI(api_key=api_key)
-        self.async_client = AsyncOpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.client = get_client(api_key)
+
+    @property
+    def async_client(self):
+        """
+        The shared async client of the running event loop, as async clients can't be used across loops.
+        """
+        return get_async_client(self.api_key)
+
     @handle_errors
     def create(self, **kwargs):
         """
@@ -1,4 +1,4 @@
-from openai import OpenAI
+from client_modules.registry import get_client
 from .helpers import handle_errors, clean
 
 class RunStep:
@@ -10,7 +10,7 @@ class RunStep:
         """
         Initializes the Run class with the provided OpenAI API key.
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
     
     @handle_errors
     def list(self, **kwargs):
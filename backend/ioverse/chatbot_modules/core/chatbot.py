@@ -1,8 +1,10 @@
-from ..services.abstract_ai_service import AbstractAIService
+from ..services.abstract_ai_service import AbstractAIService, AsyncAbstractAIService
 from ..exceptions import MessageLengthException
 from .chat_logic_service import ChatLogicService
+from .context_window import ContextWindowManager
 from tenacity import retry, stop_after_attempt, wait_exponential
-from typing import Any, Union, Type, Dict
+from client_modules.retry import openai_retry
+from typing import Any, Union, Type, Dict, Iterator, AsyncIterator, List, Optional
 from pydantic import BaseModel
 import logging
 import openai
@@ -11,26 +13,46 @@ logger = logging.getLogger("chatbot_project")
 chat_logger = logging.getLogger("chat_log")
 
 class Chatbot:
-    def __init__(self, ai_service: AbstractAIService, chat_logic: ChatLogicService, model: str = "gpt-4", history = None):
+    def __init__(
+        self,
+        ai_service: AbstractAIService,
+        chat_logic: ChatLogicService,
+        model: str = "gpt-4",
+        history = None,
+        context_window: Optional[ContextWindowManager] = None,
+        token_counts: Optional[List[Optional[int]]] = None
+    ):
         """
         Initializes the Chatbot instance with the provided AI service and model.
+
+        When a `context_window` is given, only the part of the history fitting its budget is sent
+        to the model; `token_counts` holds the known counts of the history messages, aligned with it.
         """
         self.ai_service = ai_service
         self.chat_logic = chat_logic
         self.model = model
         self.chat_history = history or self.chat_logic.prepare_initial_history()
+        self.context_window = context_window
+        self.token_counts = token_counts or []
         logger.info("Chatbot initialized with model %s", model)
+
+    def fit_context(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Returns the messages to send to the model, trimmed to the context window if any.
+        """
+        if self.context_window is None:
+            return messages
+        return self.context_window.fit(messages, self.token_counts)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @openai_retry()
     def get_response(self, prompt: str) -> str:
         """
         Adds the user's prompt to the chat history and generates a response.
         """
-        temp_history = self.chat_history.copy()
-        self.chat_history = self.chat_logic.append_user_message(temp_history, prompt)
+        temp_history = self.chat_logic.append_user_message(self.chat_history.copy(), prompt)
         chat_logger.info(f"User: {prompt}")
         try:
-            response = self.ai_service.chat_completion(self.model, temp_history)
+            response = self.ai_service.chat_completion(self.model, self.fit_context(temp_history))
         except Exception as e:
             logger.error(f"Error during AI service call: {e}")
             raise  # Let the exception propagate for the retry decorator
@@ -39,6 +61,25 @@ class Chatbot:
         chat_logger.info(f"Assistant: {response}")
         return response
 
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """
+        Adds the user's prompt to the chat history and yields the response chunk by chunk.
+        Not retried, as part of the response may already have been delivered to the caller.
+        """
+        temp_history = self.chat_logic.append_user_message(self.chat_history.copy(), prompt)
+        chat_logger.info(f"User: {prompt}")
+        chunks = []
+        try:
+            for chunk in self.ai_service.chat_completion_stream(self.model, self.fit_context(temp_history)):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error during AI service stream: {e}")
+            raise
+        response = "".join(chunks)
+        self.chat_history = self.chat_logic.append_assistant_message(temp_history, response)  # Only a completed stream enters the history
+        chat_logger.info(f"Assistant: {response}")
+
     @retry(stop=stop_after_attempt(1), wait=wait_exponential(multiplier=1, min=4, max=10))
     def get_structured_output(
         self,
@@ -102,4 +143,68 @@ class Chatbot:
         """
         Reset the chat history and redefine the system instructions
         """
-        self.chat_history = [{"role": "system", "content": system_instructions}]
\ No newline at end of file
+        self.chat_history = [{"role": "system", "content": system_instructions}]
+
+class AsyncChatbot:
+    """
+    Asynchronous counterpart of `Chatbot` for conversations, to be used on the ASGI stack.
+    """
+    def __init__(
+        self,
+        ai_service: AsyncAbstractAIService,
+        chat_logic: ChatLogicService,
+        model: str = "gpt-4",
+        history = None,
+        context_window: Optional[ContextWindowManager] = None,
+        token_counts: Optional[List[Optional[int]]] = None
+    ):
+        self.ai_service = ai_service
+        self.chat_logic = chat_logic
+        self.model = model
+        self.chat_history = history or self.chat_logic.prepare_initial_history()
+        self.context_window = context_window
+        self.token_counts = token_counts or []
+        logger.info("AsyncChatbot initialized with model %s", model)
+
+    def fit_context(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Returns the messages to send to the model, trimmed to the context window if any.
+        """
+        if self.context_window is None:
+            return messages
+        return self.context_window.fit(messages, self.token_counts)
+
+    @openai_retry()
+    async def get_response(self, prompt: str) -> str:
+        """
+        Adds the user's prompt to the chat history and generates a response.
+        """
+        temp_history = self.chat_logic.append_user_message(self.chat_history.copy(), prompt)
+        chat_logger.info(f"User: {prompt}")
+        try:
+            response = await self.ai_service.chat_completion(self.model, self.fit_context(temp_history))
+        except Exception as e:
+            logger.error(f"Error during AI service call: {e}")
+            raise  # Let the exception propagate for the retry decorator
+        self.chat_history = self.chat_logic.append_assistant_message(temp_history, response)
+        chat_logger.info(f"Assistant: {response}")
+        return response
+
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Adds the user's prompt to the chat history and yields the response chunk by chunk.
+        Not retried, as part of the response may already have been delivered to the caller.
+        """
+        temp_history = self.chat_logic.append_user_message(self.chat_history.copy(), prompt)
+        chat_logger.info(f"User: {prompt}")
+        chunks = []
+        try:
+            async for chunk in self.ai_service.chat_completion_stream(self.model, self.fit_context(temp_history)):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error during AI service stream: {e}")
+            raise
+        response = "".join(chunks)
+        self.chat_history = self.chat_logic.append_assistant_message(temp_history, response)
+        chat_logger.info(f"Assistant: {response}")
@@ -0,0 +1,89 @@
+from typing import List, Dict, Optional, Sequence
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # Listed in requirements.txt, token counts are only estimated without it
+    tiktoken = None
+
+logger = logging.getLogger("chatbot_project")
+
+# Tokens the chat format adds to every message (role and separators)
+MESSAGE_OVERHEAD = 4
+
+# Prompt budgets (in tokens) per model, leaving room in the context window for the completion
+DEFAULT_BUDGETS = {
+    "gpt-4": 6000,
+    "gpt-4-turbo": 100000,
+    "gpt-4o": 100000,
+    "gpt-4o-mini": 100000,
+    "chatgpt-4o-latest": 100000,
+    "gpt-3.5-turbo": 12000,
+}
+DEFAULT_BUDGET = 6000
+
+class TokenCounter:
+    """
+    Counts the tokens of chat messages with the model's tokenizer,
+    falling back to an estimate of 4 characters per token.
+    """
+    def __init__(self, model: str):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"Tokenizer unavailable for model {model}, estimating token counts: {e}")
+
+    def count_text(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return len(text) // 4 + 1
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        return MESSAGE_OVERHEAD + self.count_text(message["content"])
+
+class ContextWindowManager:
+    """
+    Fits a chat history into the prompt budget of a model by dropping the oldest turns.
+    The system message and the latest message are always kept.
+    """
+    def __init__(self, model: str, budgets: Optional[Dict[str, int]] = None, counter: Optional[TokenCounter] = None):
+        budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.model = model
+        self.budget = budgets.get(model, DEFAULT_BUDGET)
+        self.counter = counter or TokenCounter(model)
+
+    def fit(self, messages: List[Dict[str, str]], token_counts: Optional[Sequence[Optional[int]]] = None) -> List[Dict[str, str]]:
+        """
+        Returns the most recent messages fitting the budget, preceded by the system message.
+
+        `token_counts` holds the already known counts, aligned with `messages`:
+        missing or None entries are counted on the fly.
+        """
+        token_counts = list(token_counts or [])
+        counts = [
+            token_counts[index] if index < len(token_counts) and token_counts[index] is not None
+            else self.counter.count_message(message)
+            for index, message in enumerate(messages)
+        ]
+        total = sum(counts)
+        if total <= self.budget:
+            return messages
+
+        has_system = bool(messages) and messages[0]["role"] == "system"
+        start = 1 if has_system else 0
+        first_kept = start
+        # Drop the oldest messages, never the latest one
+        while total > self.budget and first_kept < len(messages) - 1:
+            total -= counts[first_kept]
+            first_kept += 1
+        # Don't open the window with an answer whose question was dropped
+        while first_kept < len(messages) - 1 and messages[first_kept]["role"] == "assistant":
+            total -= counts[first_kept]
+            first_kept += 1
+
+        logger.info(f"Context window trimmed: {first_kept - start} message(s) dropped to fit {self.budget} tokens for {self.model}")
+        return messages[:start] + messages[first_kept:]
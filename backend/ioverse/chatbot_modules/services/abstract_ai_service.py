@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Union, Type, Any
+from typing import List, Dict, Union, Type, Any, Iterator, AsyncIterator
 from pydantic import BaseModel
 
 class AbstractAIService(ABC):
@@ -7,6 +7,9 @@ class AbstractAIService(ABC):
     def chat_completion(self, model: str, messages: List[Dict[str, str]]) -> str:
         pass
     @abstractmethod
+    def chat_completion_stream(self, model: str, messages: List[Dict[str, str]]) -> Iterator[str]:
+        pass
+    @abstractmethod
     def structured_output(
         self, 
         model: str, 
@@ -14,4 +17,12 @@ class AbstractAIService(ABC):
         response_format: Union[Type[BaseModel], Dict],
         **kwargs
     ) -> Any:
-        pass
\ No newline at end of file
+        pass
+
+class AsyncAbstractAIService(ABC):
+    @abstractmethod
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]]) -> str:
+        pass
+    @abstractmethod
+    def chat_completion_stream(self, model: str, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        pass
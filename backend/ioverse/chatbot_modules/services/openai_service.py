@@ -1,16 +1,16 @@
 import openai
-from typing import List, Dict, Union, Type
+from typing import List, Dict, Union, Type, Iterator, AsyncIterator
 from pydantic import BaseModel
-from .abstract_ai_service import AbstractAIService
+from .abstract_ai_service import AbstractAIService, AsyncAbstractAIService
 import logging
 
-from openai import OpenAI
+from client_modules.registry import get_client, get_async_client
 
 logger = logging.getLogger("chatbot_project")
 
 class OpenAIService(AbstractAIService):
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
 
     def chat_completion(self, model: str, messages: List[Dict[str, str]]) -> str:
         try:
@@ -19,6 +19,21 @@ class OpenAIService(AbstractAIService):
         except openai.OpenAIError as e:
             logger.error(f"OpenAI API error: {e}")
             raise  # Handler will take care of this exception in the re-tries
+
+    def chat_completion_stream(self, model: str, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Streams the completion, yielding the text deltas as soon as they arrive.
+        The upstream stream is closed as well if the consumer stops iterating early.
+        """
+        try:
+            stream = self.client.chat.completions.create(model=model, messages=messages, stream=True)
+            with stream:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
         
     def structured_output(
         self, 
@@ -36,4 +51,36 @@ class OpenAIService(AbstractAIService):
             return completion
         except openai.OpenAIError as e:
             logger.error(f"OpenAI API error: {e}")
-            raise
\ No newline at end of file
+            raise
+
+class AsyncOpenAIService(AsyncAbstractAIService):
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    @property
+    def client(self):
+        # Resolved on use, as async clients are bound to the running event loop
+        return get_async_client(self.api_key)
+
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]]) -> str:
+        try:
+            response = await self.client.chat.completions.create(model=model, messages=messages)
+            return response.choices[0].message.content
+        except openai.OpenAIError as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+
+    async def chat_completion_stream(self, model: str, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Streams the completion, yielding the text deltas as soon as they arrive.
+        The upstream stream is closed as well if the consumer stops iterating early.
+        """
+        try:
+            stream = await self.client.chat.completions.create(model=model, messages=messages, stream=True)
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
@@ -0,0 +1,182 @@
+from typing import Any, Dict, Optional
+import asyncio
+import httpx
+import json
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Defaults until the rate limit headers of the key are known
+DEFAULT_REQUESTS_PER_MINUTE = 500
+# Requests a key may send at once before being paced
+BURST = 20
+# Requests of a key waiting for their turn at most, beyond it they fail fast
+MAX_QUEUE = 50
+# Longest wait (seconds) for a turn, beyond it the request fails fast
+MAX_WAIT = 30
+
+# Error code of the rate limit errors raised locally, see `KeyLimiter.rejection_response`
+LOCAL_RATE_LIMIT_CODE = "local_rate_limit"
+
+class LimitExceeded(Exception):
+    def __init__(self, delay: float):
+        super().__init__(f"Rate limit of the API key reached, next slot in {delay:.1f}s")
+        self.delay = delay
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parses the durations of the rate limit headers, such as '1s', '6m0s' or '20ms'.
+    """
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    factors = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * factors[unit] for amount, unit in parts)
+
+class KeyLimiter:
+    """
+    Token bucket pacing the upstream requests of an API key, with a bounded wait queue.
+
+    A request takes a token if one is available, otherwise it reserves the next one and waits
+    for it: reservations are made in arrival order, so waiting requests are served fairly.
+    When the queue is full or the wait would be too long, the request fails fast instead.
+    The bucket is tuned from the rate limit headers of the responses, and drained on a 429.
+    The same limiter paces the sync and async clients of a key.
+    """
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        burst: int = BURST,
+        max_queue: int = MAX_QUEUE,
+        max_wait: float = MAX_WAIT
+    ):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Takes a token, returning how long to wait before using it.
+        Raises `LimitExceeded` if the request can't be queued.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if delay > 0 and (self.waiting >= self.max_queue or delay > self.max_wait):
+                self.rejected += 1
+                raise LimitExceeded(delay)
+            self.tokens -= 1
+            if delay > 0:
+                self.waiting += 1
+            return delay
+
+    def done_waiting(self):
+        with self._lock:
+            self.waiting -= 1
+
+    def update(self, status_code: int, headers: httpx.Headers):
+        """
+        Tunes the bucket from the rate limit headers of a response.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            limit = headers.get("x-ratelimit-limit-requests")
+            if limit and limit.isdigit() and int(limit) > 0:
+                self.rate = int(limit) / 60
+                self.capacity = min(BURST, int(limit))
+            remaining = headers.get("x-ratelimit-remaining-requests")
+            if remaining and remaining.isdigit():
+                # The server knows about the requests sent by other processes too
+                self.tokens = min(self.tokens, float(remaining))
+            if status_code == 429:
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests", "")) or 1 / self.rate
+                # Pause the key until the server allows requests again
+                self.tokens = min(self.tokens, 1 - reset * self.rate)
+
+    def rejection_response(self, request: httpx.Request, error: LimitExceeded) -> httpx.Response:
+        """
+        Rate limit response returned without calling the upstream, so that the OpenAI
+        client raises its usual `RateLimitError` but doesn't retry it.
+        """
+        body = {"error": {"message": str(error), "type": "requests", "code": LOCAL_RATE_LIMIT_CODE}}
+        return httpx.Response(
+            429,
+            headers={"x-should-retry": "false", "retry-after": str(max(int(error.delay), 1))},
+            content=json.dumps(body).encode(),
+            request=request,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "requests_per_minute": self.rate * 60,
+                "tokens": self.tokens,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+            }
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    HTTP transport of the sync clients, pacing the requests with the limiter of the key.
+    """
+    def __init__(self, limiter: KeyLimiter, transport: httpx.BaseTransport):
+        self.limiter = limiter
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            delay = self.limiter.reserve()
+        except LimitExceeded as e:
+            logger.warning(str(e))
+            return self.limiter.rejection_response(request, e)
+        if delay:
+            try:
+                time.sleep(delay)
+            finally:
+                self.limiter.done_waiting()
+        response = self.transport.handle_request(request)
+        self.limiter.update(response.status_code, response.headers)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    HTTP transport of the async clients, pacing the requests with the limiter of the key.
+    """
+    def __init__(self, limiter: KeyLimiter, transport: httpx.AsyncBaseTransport):
+        self.limiter = limiter
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            delay = self.limiter.reserve()
+        except LimitExceeded as e:
+            logger.warning(str(e))
+            return self.limiter.rejection_response(request, e)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.limiter.done_waiting()
+        response = await self.transport.handle_async_request(request)
+        self.limiter.update(response.status_code, response.headers)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
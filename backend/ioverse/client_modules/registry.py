@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from .limiter import KeyLimiter, RateLimitedTransport, AsyncRateLimitedTransport
+import asyncio
+import hashlib
+import httpx
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Clients kept alive at most, the least recently used is evicted beyond it
+MAX_CLIENTS = 128
+# Seconds after which an unused client is evicted
+IDLE_TIMEOUT = 15 * 60
+# Connection pool of each client, the same as the OpenAI client defaults
+CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+class ClientRegistry:
+    """
+    Process-wide registry of OpenAI clients, shared per API key.
+
+    Reusing a client keeps its HTTP connection pool (keep-alive, TLS sessions) across requests.
+    Clients are kept in a bounded LRU and evicted when idle for too long. Async clients are
+    bound to the event loop that created them, so they are also keyed per loop.
+    API keys are only kept hashed in the registry keys.
+
+    The requests of the clients of a key go through the same `KeyLimiter`,
+    which paces them according to the rate limits of the key.
+    """
+    def __init__(self, max_clients: int = MAX_CLIENTS, idle_timeout: float = IDLE_TIMEOUT):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self._clients: "OrderedDict[Tuple[Hashable, ...], Tuple[Any, float, Callable]]" = OrderedDict()
+        self._limiters: Dict[str, KeyLimiter] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_client(self, api_key: str) -> OpenAI:
+        """
+        Returns the shared synchronous client of an API key.
+        """
+        hashed_key = self.hash_key(api_key)
+        return self._get(("sync", hashed_key), lambda: OpenAI(
+            api_key=api_key,
+            max_retries=0,  # Retried by `openai_retry` only, within the retry budget
+            http_client=DefaultHttpxClient(transport=RateLimitedTransport(
+                self._get_limiter(hashed_key), httpx.HTTPTransport(limits=CONNECTION_LIMITS)
+            ))
+        ))
+
+    def get_async_client(self, api_key: str) -> AsyncOpenAI:
+        """
+        Returns the shared asynchronous client of an API key for the running event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        hashed_key = self.hash_key(api_key)
+        return self._get(("async", hashed_key, id(loop)), lambda: AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,  # Retried by `openai_retry` only, within the retry budget
+            http_client=DefaultAsyncHttpxClient(transport=AsyncRateLimitedTransport(
+                self._get_limiter(hashed_key), httpx.AsyncHTTPTransport(limits=CONNECTION_LIMITS)
+            ))
+        ), owner=loop)
+
+    def _get_limiter(self, hashed_key: str) -> KeyLimiter:
+        # Called with the lock held, by the client factories
+        limiter = self._limiters.get(hashed_key)
+        if limiter is None:
+            limiter = self._limiters[hashed_key] = KeyLimiter()
+        return limiter
+
+    def _drop_unused_limiters(self):
+        used_keys = {key[1] for key in self._clients}
+        for hashed_key in list(self._limiters):
+            if hashed_key not in used_keys:
+                del self._limiters[hashed_key]
+
+    def _get(self, key, factory, owner=None):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            # The id of a closed loop can be reused by a new one, hence the owner check
+            if entry is not None and (owner is None or entry[2]() is owner):
+                self.hits += 1
+                self._clients[key] = (entry[0], now, entry[2])
+                self._clients.move_to_end(key)
+                return entry[0]
+
+            self.misses += 1
+            client = factory()
+            self._clients[key] = (client, now, weakref.ref(owner) if owner is not None else lambda: None)
+            self._clients.move_to_end(key)
+            if len(self._clients) > self.max_clients:
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+                    self.evictions += 1
+                self._drop_unused_limiters()
+            return client
+
+    def _evict_idle(self, now: float):
+        # Entries are in least recently used order, so the idle ones come first
+        evicted = False
+        while self._clients:
+            key, (_, last_used, _) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            self._drop_unused_limiters()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the pool metrics: size, hits, misses, evictions and hit rate,
+        along with the requests waiting for (queued) or refused (rejected) by the limiters.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            limiters = [limiter.stats() for limiter in self._limiters.values()]
+            return {
+                "size": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "queued": sum(limiter["waiting"] for limiter in limiters),
+                "rejected": sum(limiter["rejected"] for limiter in limiters),
+            }
+
+    def limiter_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the metrics of the limiter of each key, identified by a prefix of its hash.
+        """
+        with self._lock:
+            return {hashed_key[:12]: limiter.stats() for hashed_key, limiter in self._limiters.items()}
+
+    def clear(self):
+        """
+        Drops every client and resets the metrics.
+        Evicted clients are not closed, as they may still be serving a request:
+        their connections are released once they are garbage collected.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._limiters.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def hash_key(api_key: Optional[str]) -> str:
+        return hashlib.sha256((api_key or "").encode()).hexdigest()
+
+registry = ClientRegistry()
+
+def get_client(api_key: str) -> OpenAI:
+    return registry.get_client(api_key)
+
+def get_async_client(api_key: str) -> AsyncOpenAI:
+    return registry.get_async_client(api_key)
@@ -0,0 +1,160 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tenacity.stop import stop_base
+from tenacity.wait import wait_base
+from .limiter import LOCAL_RATE_LIMIT_CODE
+import logging
+import openai
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Longest server retry hint (seconds) worth waiting for within a request, beyond it the error is raised
+MAX_RETRY_AFTER = 30
+
+def is_retryable(exception: BaseException) -> bool:
+    """
+    Tells whether an OpenAI error is transient.
+
+    Connection errors, timeouts, rate limits and server errors are retried, while
+    authentication, permission and invalid request errors would fail the same way again.
+    An exhausted quota is reported as a rate limit, but it isn't transient either, nor are
+    the requests refused by the local limiter, which already waited as long as allowed.
+    """
+    if isinstance(exception, openai.RateLimitError):
+        return getattr(exception, "code", None) not in ("insufficient_quota", LOCAL_RATE_LIMIT_CODE)
+    if isinstance(exception, (openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    if isinstance(exception, openai.APIStatusError):
+        return exception.status_code in (408, 409) or exception.status_code >= 500
+    return False
+
+def retry_after(exception: Optional[BaseException]) -> Optional[float]:
+    """
+    Returns the delay (seconds) the server asked to wait before retrying, if any,
+    from the `retry-after-ms` or `retry-after` (seconds or HTTP date) response headers.
+    """
+    response = getattr(exception, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return max(float(retry_after_ms) / 1000, 0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+class RetryBudget:
+    """
+    Process-wide budget limiting retries to a fraction of the calls.
+
+    Every call deposits `ratio` tokens and every retry withdraws one, up to `max_tokens`:
+    when an upstream fails persistently, the budget runs out and the errors are raised
+    straight away instead of multiplying the load on it.
+    """
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 20):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+retry_budget = RetryBudget()
+
+class wait_retry_after(wait_base):
+    """
+    Waits as long as the server asked to, falling back to the given strategy.
+    """
+    def __init__(self, fallback: wait_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        hint = retry_after(retry_state.outcome.exception())
+        if hint is not None:
+            return hint
+        return self.fallback(retry_state)
+
+class stop_if_retry_after_exceeds(stop_base):
+    """
+    Stops when the server asks to wait longer than the request can afford.
+    """
+    def __init__(self, max_delay: float):
+        self.max_delay = max_delay
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        hint = retry_after(retry_state.outcome.exception())
+        return hint is not None and hint > self.max_delay
+
+class stop_if_budget_exhausted(stop_base):
+    """
+    Stops when the retry budget is exhausted, withdrawing from it otherwise.
+    Evaluated last, so that a token is withdrawn only for retries actually made.
+    """
+    def __init__(self, budget: RetryBudget):
+        self.budget = budget
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        if self.budget.withdraw():
+            return False
+        logger.warning("Retry budget exhausted, not retrying.")
+        return True
+
+def log_retry(retry_state: RetryCallState):
+    logger.warning(
+        f"Retrying {getattr(retry_state.fn, '__qualname__', 'OpenAI call')} "
+        f"in {retry_state.next_action.sleep:.1f}s after: {retry_state.outcome.exception()}"
+    )
+
+def openai_retry(max_attempts: int = 3, max_wait: float = 10, budget: RetryBudget = retry_budget):
+    """
+    Retry policy for the OpenAI calls, shared by the service modules.
+
+    - Only transient errors are retried (see `is_retryable`), the others are raised at once.
+    - Waits honor the server retry hints, and use exponential backoff with full jitter otherwise.
+    - Retries are drawn from a process-wide budget.
+    - Once retries are over, the last error is raised as is.
+    """
+    return retry(
+        retry=retry_if_exception(is_retryable),
+        stop=(
+            stop_after_attempt(max_attempts)
+            | stop_if_retry_after_exceeds(MAX_RETRY_AFTER)
+            | stop_if_budget_exhausted(budget)
+        ),
+        wait=wait_retry_after(wait_random_exponential(multiplier=1, max=max_wait)),
+        before=lambda retry_state: budget.deposit() if retry_state.attempt_number == 1 else None,
+        before_sleep=log_retry,
+        reraise=True,
+    )
@@ -0,0 +1,69 @@
+import httpx
+import openai
+import unittest
+from unittest.mock import patch
+from client_modules.limiter import KeyLimiter, LimitExceeded, RateLimitedTransport, parse_duration
+from client_modules.retry import is_retryable
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hello!"}}],
+}
+
+class TestKeyLimiter(unittest.TestCase):
+    def test_burst_then_paced(self):
+        limiter = KeyLimiter(requests_per_minute=60, burst=2)
+        with patch("client_modules.limiter.time.monotonic", return_value=limiter.updated_at):
+            self.assertEqual(limiter.reserve(), 0)
+            self.assertEqual(limiter.reserve(), 0)
+            self.assertAlmostEqual(limiter.reserve(), 1)
+            self.assertAlmostEqual(limiter.reserve(), 2)
+            self.assertEqual(limiter.stats()["waiting"], 2)
+
+    def test_full_queue_fails_fast(self):
+        limiter = KeyLimiter(requests_per_minute=60, burst=1, max_queue=1)
+        with patch("client_modules.limiter.time.monotonic", return_value=limiter.updated_at):
+            limiter.reserve()
+            limiter.reserve()
+            with self.assertRaises(LimitExceeded):
+                limiter.reserve()
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_tuned_from_headers(self):
+        limiter = KeyLimiter(requests_per_minute=60, burst=5)
+        limiter.update(200, httpx.Headers({"x-ratelimit-limit-requests": "3000", "x-ratelimit-remaining-requests": "2"}))
+        self.assertEqual(limiter.rate, 50)
+        self.assertLessEqual(limiter.tokens, 2)
+
+        limiter.update(429, httpx.Headers({"x-ratelimit-reset-requests": "6m0s"}))
+        self.assertLess(limiter.tokens, 0)
+
+    def test_durations_are_parsed(self):
+        self.assertEqual(parse_duration("6m0s"), 360)
+        self.assertEqual(parse_duration("20ms"), 0.02)
+        self.assertIsNone(parse_duration(""))
+
+class TestRateLimitedTransport(unittest.TestCase):
+    def setUp(self):
+        self.upstream_calls = 0
+
+        def handler(request):
+            self.upstream_calls += 1
+            return httpx.Response(200, json=COMPLETION, headers={"x-ratelimit-limit-requests": "60"})
+
+        limiter = KeyLimiter(requests_per_minute=1, burst=1, max_wait=0)
+        self.client = openai.OpenAI(
+            api_key="test_api_key",
+            http_client=httpx.Client(transport=RateLimitedTransport(limiter, httpx.MockTransport(handler)))
+        )
+
+    def test_excess_request_fails_fast_without_retries(self):
+        messages = [{"role": "user", "content": "Hello"}]
+        self.client.chat.completions.create(model="gpt-4", messages=messages)
+        with self.assertRaises(openai.RateLimitError) as error:
+            self.client.chat.completions.create(model="gpt-4", messages=messages)
+        self.assertEqual(self.upstream_calls, 1)
+        self.assertFalse(is_retryable(error.exception))
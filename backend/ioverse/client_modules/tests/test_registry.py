@@ -0,0 +1,74 @@
+import asyncio
+import httpx
+import openai
+import unittest
+from unittest.mock import patch
+from client_modules.registry import ClientRegistry
+from client_modules.retry import RetryBudget, openai_retry
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ClientRegistry(max_clients=2, idle_timeout=60)
+
+    def test_client_is_shared_per_key(self):
+        client = self.registry.get_client("key_1")
+        self.assertIs(self.registry.get_client("key_1"), client)
+        self.assertIsNot(self.registry.get_client("key_2"), client)
+        stats = self.registry.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+
+    def test_least_recently_used_client_is_evicted(self):
+        client_1 = self.registry.get_client("key_1")
+        self.registry.get_client("key_2")
+        self.registry.get_client("key_1")
+        self.registry.get_client("key_3")
+        self.assertEqual(self.registry.stats()["evictions"], 1)
+        self.assertIs(self.registry.get_client("key_1"), client_1)
+        self.assertEqual(self.registry.stats()["size"], 2)
+
+    def test_idle_client_is_evicted(self):
+        with patch("client_modules.registry.time.monotonic", return_value=0):
+            client = self.registry.get_client("key_1")
+        with patch("client_modules.registry.time.monotonic", return_value=61):
+            self.assertIsNot(self.registry.get_client("key_1"), client)
+        self.assertEqual(self.registry.stats()["evictions"], 1)
+
+    def test_async_clients_are_bound_to_the_loop(self):
+        async def get_clients():
+            return self.registry.get_async_client("key_1"), self.registry.get_async_client("key_1")
+
+        first, second = asyncio.run(get_clients())
+        self.assertIs(first, second)
+        other_loop_client, _ = asyncio.run(get_clients())
+        self.assertIsNot(other_loop_client, first)
+
+    def test_api_keys_are_not_kept_in_clear(self):
+        self.registry.get_client("sk-secret")
+        self.assertFalse(any("sk-secret" in map(str, key) for key in self.registry._clients))
+
+class TestClientRetries(unittest.TestCase):
+    def test_failing_request_is_only_retried_by_the_retry_policy(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500, headers={"retry-after-ms": "1"}, json={"error": {"message": "Server error"}})
+
+        with patch("client_modules.registry.httpx.HTTPTransport", lambda **kwargs: httpx.MockTransport(handler)):
+            client = ClientRegistry().get_client("key_1")
+
+        create = openai_retry(max_attempts=3, budget=RetryBudget())(client.chat.completions.create)
+        with self.assertRaises(openai.InternalServerError):
+            create(model="gpt-4o-mini", messages=[{"role": "user", "content": "Hello"}])
+        # One call per attempt, without the retries of the SDK
+        self.assertEqual(len(calls), 3)
+
+    def test_clients_do_not_retry(self):
+        registry = ClientRegistry()
+        self.assertEqual(registry.get_client("key_1").max_retries, 0)
+
+        async def get_client():
+            return registry.get_async_client("key_1")
+
+        self.assertEqual(asyncio.run(get_client()).max_retries, 0)
@@ -0,0 +1,51 @@
+import httpx
+import openai
+import unittest
+from unittest.mock import MagicMock
+from client_modules.retry import RetryBudget, is_retryable, openai_retry, retry_after
+
+def make_error(error_class, status_code, headers=None, body=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return error_class("error", response=response, body=body)
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_errors_are_classified(self):
+        self.assertTrue(is_retryable(make_error(openai.RateLimitError, 429)))
+        self.assertTrue(is_retryable(make_error(openai.InternalServerError, 503)))
+        self.assertTrue(is_retryable(openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))))
+        self.assertFalse(is_retryable(make_error(openai.AuthenticationError, 401)))
+        self.assertFalse(is_retryable(make_error(openai.BadRequestError, 400)))
+        self.assertFalse(is_retryable(make_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"})))
+        self.assertFalse(is_retryable(ValueError()))
+
+    def test_retry_hints_are_parsed(self):
+        self.assertEqual(retry_after(make_error(openai.RateLimitError, 429, {"retry-after-ms": "1500"})), 1.5)
+        self.assertEqual(retry_after(make_error(openai.RateLimitError, 429, {"retry-after": "2"})), 2)
+        self.assertEqual(retry_after(make_error(openai.RateLimitError, 429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})), 0)
+        self.assertIsNone(retry_after(make_error(openai.RateLimitError, 429)))
+
+    def test_non_retryable_error_is_raised_at_once(self):
+        call = MagicMock(side_effect=make_error(openai.AuthenticationError, 401))
+        with self.assertRaises(openai.AuthenticationError):
+            openai_retry(budget=RetryBudget())(call)()
+        self.assertEqual(call.call_count, 1)
+
+    def test_transient_error_is_retried_after_hint(self):
+        call = MagicMock(side_effect=[make_error(openai.RateLimitError, 429, {"retry-after-ms": "1"}), "response"])
+        self.assertEqual(openai_retry(budget=RetryBudget())(call)(), "response")
+        self.assertEqual(call.call_count, 2)
+
+    def test_long_retry_hint_is_not_waited(self):
+        call = MagicMock(side_effect=make_error(openai.RateLimitError, 429, {"retry-after": "120"}))
+        with self.assertRaises(openai.RateLimitError):
+            openai_retry(budget=RetryBudget())(call)()
+        self.assertEqual(call.call_count, 1)
+
+    def test_exhausted_budget_stops_retries(self):
+        budget = RetryBudget(ratio=0, max_tokens=1)
+        call = MagicMock(side_effect=make_error(openai.InternalServerError, 500, {"retry-after-ms": "1"}))
+        with self.assertRaises(openai.InternalServerError):
+            openai_retry(budget=budget)(call)()
+        self.assertEqual(call.call_count, 2)
+        self.assertEqual(budget.tokens, 0)
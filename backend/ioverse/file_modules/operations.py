@@ -1,4 +1,4 @@
-from openai import OpenAI
+from client_modules.registry import get_client
 
 class FileClient:
     """
@@ -6,7 +6,7 @@ class FileClient:
     """
     
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
 
     def upload_file(self, file, purpose):
         """
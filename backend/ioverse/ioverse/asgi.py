@@ -17,12 +17,16 @@ from apps.assistant.middleware import JWTAuthMiddlewareStack
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ioverse.settings')
 
-from apps.assistant.routing import websocket_urlpatterns
+from apps.assistant.routing import websocket_urlpatterns as assistant_websocket_urlpatterns
+from apps.chatbot.routing import websocket_urlpatterns as chatbot_websocket_urlpatterns
+from apps.text_to_image.routing import websocket_urlpatterns as text_to_image_websocket_urlpatterns
 
 django_asgi_app = get_asgi_application()
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+        JWTAuthMiddlewareStack(URLRouter(
+            assistant_websocket_urlpatterns + chatbot_websocket_urlpatterns + text_to_image_websocket_urlpatterns
+        ))
     )
 })
\ No newline at end of file
@@ -0,0 +1,94 @@
+import functools
+import logging
+
+import environ
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+def cache_config(url, key_prefix='', max_entries=None):
+    """
+    Builds the settings of a cache from its URL, e.g. `redis://localhost:6379/0` for a cache shared
+    by the processes, or `locmemcache://` for a per-process memory cache.
+    The caches built from the same URL are told apart by their `key_prefix`, which also
+    names the store of a memory cache. `max_entries` only bounds the backends culling entries themselves.
+    """
+    config = environ.Env.cache_url_config(url)
+    config['KEY_PREFIX'] = key_prefix
+    if config['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+        config['LOCATION'] = config.get('LOCATION') or key_prefix
+    if max_entries is not None and config['BACKEND'] != 'django.core.cache.backends.redis.RedisCache':
+        config.setdefault('OPTIONS', {})['MAX_ENTRIES'] = max_entries
+    return config
+
+class CacheAside:
+    """
+    Cache-aside for the service layers: values are read from the cache, loaded on a miss
+    and stored for the next readers, and invalidated by the writers once their transaction commits.
+
+    Entries are keyed by a `namespace` and the parts identifying the value,
+    e.g. `CacheAside('assistants').get_or_load((user.pk, assistant_id), load)`.
+    """
+    def __init__(self, namespace, timeout=300, alias='default'):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, parts):
+        if not isinstance(parts, (tuple, list)):
+            parts = (parts,)
+        return ':'.join([self.namespace, *(str(part) for part in parts)])
+
+    def get(self, parts):
+        return self.cache.get(self.make_key(parts))
+
+    def set(self, parts, value, timeout=None):
+        self.cache.set(self.make_key(parts), value, self.timeout if timeout is None else timeout)
+
+    def get_or_load(self, parts, load, timeout=None, cacheable=None):
+        """
+        Returns the cached value, or calls `load` and caches its result.
+        None results and exceptions are not cached, nor the results rejected by `cacheable`.
+        """
+        value = self.get(parts)
+        if value is not None:
+            logger.debug(f"Cache hit for {self.make_key(parts)}")
+            return value
+
+        value = load()
+        if value is not None and (cacheable is None or cacheable(value)):
+            self.set(parts, value, timeout)
+        return value
+
+    def timeout_until(self, deadline):
+        """
+        Returns the timeout of an entry that must not outlive `deadline` (a datetime, or None).
+        """
+        if deadline is None:
+            return self.timeout
+        return max(1, min(self.timeout, int((deadline - timezone.now()).total_seconds())))
+
+    def invalidate(self, parts):
+        """
+        Drops the cached value once the current transaction commits, right away outside of one,
+        so that readers can't cache again the state being replaced.
+        """
+        key = self.make_key(parts)
+        transaction.on_commit(lambda: self.cache.delete(key))
+
+    def cached(self, key_func, cacheable=None):
+        """
+        Decorator caching the results of a method, keyed by `key_func` called with the method arguments.
+        """
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                return self.get_or_load(key_func(*args, **kwargs), lambda: method(*args, **kwargs), cacheable=cacheable)
+            return wrapper
+        return decorator
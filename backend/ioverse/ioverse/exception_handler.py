@@ -1,7 +1,9 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
-from ioverse.exceptions import MissingApiKeyException
+from ioverse.exceptions import MissingApiKeyException, UpstreamRateLimitException
+from client_modules.retry import retry_after
 import logging
+import openai
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +11,10 @@ def custom_exception_handler(exc, context):
     """
     Custom exception handler that processes both DRF and custom exceptions.
     """
+    # Rate limits of the user's OpenAI key (upstream or local) are reported as such, not as server errors
+    if isinstance(exc, openai.RateLimitError):
+        exc = UpstreamRateLimitException(wait=retry_after(exc))
+
     # Call to DRF's default exception handler first
     response = exception_handler(exc, context)
 
@@ -3,4 +3,13 @@ from rest_framework.exceptions import APIException
 class MissingApiKeyException(APIException):
     status_code = 401
     default_detail = "Missing API key."
-    default_code = "missing_api_key"
\ No newline at end of file
+    default_code = "missing_api_key"
+
+class UpstreamRateLimitException(APIException):
+    status_code = 429
+    default_detail = "Rate limit of the OpenAI API key reached, try again later."
+    default_code = "upstream_rate_limit"
+
+    def __init__(self, detail=None, code=None, wait=None):
+        super().__init__(detail, code)
+        self.wait = wait    # Sent as Retry-After by the DRF exception handler
@@ -0,0 +1,136 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+def media_fields(labels=None):
+    """
+    Returns the file fields named by `labels` (default `MEDIA_GC_FIELDS`), as `(model, field)` pairs
+    from labels such as `text_to_image.ImageGeneration.image_file`.
+    """
+    fields = []
+    for label in labels or settings.MEDIA_GC_FIELDS:
+        model_label, field_name = label.rsplit('.', 1)
+        model = apps.get_model(model_label)
+        fields.append((model, model._meta.get_field(field_name)))
+    return fields
+
+def upload_directories(fields):
+    """
+    Returns the directories of `MEDIA_ROOT` the `fields` upload to, e.g. `generated_images`.
+    """
+    return sorted({field.upload_to.strip('/') for _, field in fields if isinstance(field.upload_to, str) and field.upload_to.strip('/')})
+
+def referenced_paths(fields, chunk_size=2000):
+    """
+    Returns the names of the files referenced by the rows of the `fields`, streamed from the database in chunks.
+    """
+    paths = set()
+    for model, field in fields:
+        names = (
+            model._base_manager
+            .exclude(**{f'{field.name}__isnull': True})
+            .exclude(**{field.name: ''})
+            .order_by()
+            .values_list(field.name, flat=True)
+        )
+        paths.update(os.path.normpath(name) for name in names.iterator(chunk_size=chunk_size))
+    return paths
+
+def scan_files(root, directory, modified_before):
+    """
+    Yields the name (relative to `root`) and size of the files under `directory`,
+    last modified before the `modified_before` timestamp.
+    """
+    pending = [os.path.join(root, directory)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime < modified_before:
+                        yield os.path.relpath(entry.path, root), stat.st_size
+
+def remove_batch(root, batch):
+    """
+    Removes the files of `batch`, pairs of name and size. Returns the number of files and bytes removed.
+    """
+    removed = reclaimed = 0
+    for name, size in batch:
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not remove media file {name}: {e}")
+            continue
+        removed += 1
+        reclaimed += size
+    return removed, reclaimed
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def collect_media_garbage(dry_run=False, batch_size=None, workers=None, grace_period=None, labels=None):
+    """
+    Removes the files of `MEDIA_ROOT` no longer referenced by any row, such as those of the rows
+    deleted in bulk, which unlike `delete()` on an instance leaves the files behind.
+
+    The referenced names are read before walking the upload directories of the `MEDIA_GC_FIELDS`,
+    and files modified within `grace_period` seconds are kept, so that the files being saved
+    alongside rows not yet committed are never removed. The unreferenced files are removed
+    in batches of `batch_size` by `workers` threads; `dry_run` only reports them.
+
+    Returns the metrics of the collection: files scanned, orphaned and removed, bytes reclaimed
+    (or reclaimable on a dry run) and seconds taken.
+    """
+    batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+    workers = workers or settings.MEDIA_GC_WORKERS
+    grace_period = settings.MEDIA_GC_GRACE_PERIOD if grace_period is None else grace_period
+    root = settings.MEDIA_ROOT
+    metrics = {'scanned': 0, 'orphaned': 0, 'removed': 0, 'bytes': 0, 'dry_run': dry_run, 'seconds': 0.0}
+
+    started = time.monotonic()
+    fields = media_fields(labels)
+    referenced = referenced_paths(fields)
+    modified_before = time.time() - grace_period
+
+    def orphans():
+        for directory in upload_directories(fields):
+            for name, size in scan_files(root, directory, modified_before):
+                metrics['scanned'] += 1
+                if os.path.normpath(name) not in referenced:
+                    metrics['orphaned'] += 1
+                    yield name, size
+
+    if dry_run:
+        for name, size in orphans():
+            logger.debug(f"Unreferenced media file {name} ({size} bytes)")
+            metrics['bytes'] += size
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for removed, reclaimed in executor.map(lambda batch: remove_batch(root, batch), batched(orphans(), batch_size)):
+                metrics['removed'] += removed
+                metrics['bytes'] += reclaimed
+
+    metrics['seconds'] = round(time.monotonic() - started, 3)
+    logger.info(
+        f"Media garbage collection{' (dry run)' if dry_run else ''}: {metrics['orphaned']} of "
+        f"{metrics['scanned']} files unreferenced, {metrics['removed']} removed, "
+        f"{metrics['bytes']} bytes {'reclaimable' if dry_run else 'reclaimed'} in {metrics['seconds']}s."
+    )
+    return metrics
@@ -0,0 +1,136 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on the full `ordering` key, e.g. `(created_at, id)`, instead of an offset.
+    Each page is read from an index range starting after the last row of the previous page,
+    so a page costs the same at any depth, and rows added meanwhile don't shift the pages.
+
+    The last field of `ordering` must be unique, and the ordering should match an index
+    leading with the filtered columns (e.g. `(user, created_at, id)`).
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.get_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(ordering, position))
+
+        # One extra row tells whether there are more pages
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            # Walking back from a page, which follows this one
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def seek(self, ordering, position):
+        """
+        Filters the rows following `position` in `ordering`, nested as
+        `a >= x AND (a > x OR (b >= y AND (b > y OR ...)))` so that the leading column bounds the index scan.
+        """
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            if condition is None:
+                condition = Q(**{f'{name}__{lookup}': value})
+            else:
+                condition = Q(**{f'{name}__{lookup}e': value}) & (Q(**{f'{name}__{lookup}': value}) | condition)
+        return condition
+
+    def get_position(self, instance):
+        return [self.model._meta.get_field(field.lstrip('-')).value_to_string(instance) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, cursor['p'], strict=True)
+            ]
+            return position, bool(cursor.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse=False):
+        cursor = {'p': self.get_position(instance)}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
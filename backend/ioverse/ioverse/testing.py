@@ -0,0 +1,65 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Plan lines reading a whole table, by database vendor
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+def explain(sql, params=None):
+    """
+    Returns the query plan of `sql` as text.
+    On PostgreSQL sequential scans are disabled beforehand, otherwise the
+    planner prefers them on the few rows of a test database even where an index applies.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+def full_scans(plan):
+    pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return set()
+    return set(pattern.findall(plan))
+
+class QueryPlanTestMixin:
+    """
+    Assertions on query plans, failing when a hot query regresses to a full scan.
+    """
+
+    def assertUsesIndex(self, queryset, index=None):
+        """
+        Asserts that `queryset` is planned without a full scan, using `index` when given.
+        """
+        sql, params = queryset.query.sql_with_params()
+        plan = explain(sql, params)
+        scanned = full_scans(plan)
+        if scanned:
+            self.fail(f"Full scan of {', '.join(sorted(scanned))} in the plan of:\n{sql}\n{plan}")
+        if index is not None and index not in plan:
+            self.fail(f"Index {index} not used in the plan of:\n{sql}\n{plan}")
+
+    @contextmanager
+    def assertNoFullScans(self, *tables):
+        """
+        Runs EXPLAIN on each SELECT executed in the block, failing if one scans any of `tables`.
+        """
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = explain(sql)
+            scanned = full_scans(plan) & set(tables)
+            if scanned:
+                self.fail(f"Full scan of {', '.join(sorted(scanned))} in the plan of:\n{sql}\n{plan}")
@@ -0,0 +1,76 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from ..cache import CacheAside, cache_config
+
+class CacheConfigTests(TestCase):
+    def test_redis(self):
+        config = cache_config('redis://localhost:6379/0', key_prefix='generations', max_entries=500)
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(config['LOCATION'], 'redis://localhost:6379/0')
+        self.assertEqual(config['KEY_PREFIX'], 'generations')
+        # Redis evicts by its own policy
+        self.assertNotIn('OPTIONS', config)
+
+    def test_memory_caches_are_kept_apart(self):
+        config = cache_config('locmemcache://', key_prefix='generations', max_entries=500)
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertEqual(config['LOCATION'], 'generations')
+        self.assertEqual(config['OPTIONS']['MAX_ENTRIES'], 500)
+
+class CacheAsideTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = CacheAside('tests', timeout=60)
+        self.loads = 0
+
+    def load(self, value='value'):
+        self.loads += 1
+        return value
+
+    def test_get_or_load(self):
+        self.assertEqual(self.cache.get_or_load((1, 'a'), self.load), 'value')
+        self.assertEqual(self.cache.get_or_load((1, 'a'), self.load), 'value')
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.cache.get_or_load((1, 'b'), self.load), 'value')
+        self.assertEqual(self.loads, 2)
+
+    def test_none_and_rejected_results_are_not_cached(self):
+        self.cache.get_or_load('a', lambda: self.load(None))
+        self.cache.get_or_load('a', lambda: self.load(None))
+        self.cache.get_or_load('b', self.load, cacheable=lambda value: False)
+        self.cache.get_or_load('b', self.load, cacheable=lambda value: False)
+        self.assertEqual(self.loads, 4)
+
+    def test_invalidation_waits_for_the_commit(self):
+        self.cache.get_or_load('a', self.load)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.cache.invalidate('a')
+                self.assertEqual(self.cache.get('a'), 'value')
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_cached_method(self):
+        cache = self.cache
+
+        class Service:
+            calls = 0
+
+            @cache.cached(lambda self, object_id, user: (user, object_id))
+            def retrieve(self, object_id, user):
+                Service.calls += 1
+                return {'id': object_id}
+
+        service = Service()
+        self.assertEqual(service.retrieve('obj_1', 1), {'id': 'obj_1'})
+        self.assertEqual(service.retrieve('obj_1', 1), {'id': 'obj_1'})
+        service.retrieve('obj_1', 2)
+        self.assertEqual(Service.calls, 2)
+
+    def test_timeout_until(self):
+        self.assertEqual(self.cache.timeout_until(None), 60)
+        self.assertEqual(self.cache.timeout_until(timezone.now() + timezone.timedelta(hours=1)), 60)
+        self.assertAlmostEqual(self.cache.timeout_until(timezone.now() + timezone.timedelta(seconds=30)), 30, delta=1)
+        self.assertEqual(self.cache.timeout_until(timezone.now() - timezone.timedelta(seconds=30)), 1)
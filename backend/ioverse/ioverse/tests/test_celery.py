@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ..celery import app
+
+class CeleryRoutingTests(SimpleTestCase):
+    def route(self, task_name):
+        return app.amqp.router.route({}, task_name)['queue'].name
+
+    def test_tasks_are_routed_to_their_queue(self):
+        self.assertEqual(self.route('apps.chatbot.tasks.generate_conversation_title'), 'upstream')
+        self.assertEqual(self.route('apps.chatbot.tasks.render_conversation_pdf'), 'exports')
+        self.assertEqual(self.route('apps.chatbot.tasks.discard_orphaned_turns'), 'cleanup')
+        self.assertEqual(self.route('apps.text_to_image.tasks.unshare_expired_images'), 'cleanup')
+        self.assertEqual(self.route('apps.text_to_image.tasks.collect_media_garbage'), 'media')
+        self.assertEqual(self.route('apps.text_to_image.tasks.persist_image_url'), 'media')
+        self.assertEqual(self.route('apps.text_to_image.tasks.run_image_generation_job'), 'upstream')
+
+    def test_unrouted_tasks_go_to_the_default_queue(self):
+        self.assertEqual(self.route('apps.unknown.tasks.task'), 'default')
+
+    def test_routed_queues_are_declared(self):
+        queues = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+        self.assertLessEqual({route['queue'] for route in settings.CELERY_TASK_ROUTES.values()}, queues)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.assistant.models.file import File
+from apps.text_to_image.models import ImageGeneration
+from ..media import collect_media_garbage
+
+User = get_user_model()
+
+class MediaGarbageCollectionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_GC_GRACE_PERIOD=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = User.objects.create_user(username='testuser', password='testpass')
+        ImageGeneration.objects.create(user=user, prompt='Kept', image_file='generated_images/kept.png')
+        File.objects.create(
+            id='file-1', owner=user, bytes=3, filename='kept.txt', purpose='assistants',
+            image_file='file_images/kept.png', file_content='uploaded_files/kept.txt'
+        )
+
+        for name in ('generated_images/kept.png', 'file_images/kept.png', 'uploaded_files/kept.txt'):
+            self.write(name, b'kep')
+        for name in ('generated_images/orphan.png', 'file_images/orphan.png', 'uploaded_files/nested/orphan.txt'):
+            self.write(name, b'orphan')
+        # Outside of the upload directories
+        self.write('other/unknown.txt', b'unknown')
+
+    def write(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        # Older than any grace period in the tests
+        past = time.time() - 60 * 60
+        os.utime(path, (past, past))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def test_removes_unreferenced_files(self):
+        metrics = collect_media_garbage(batch_size=2, workers=2)
+        self.assertEqual(metrics['scanned'], 6)
+        self.assertEqual(metrics['orphaned'], 3)
+        self.assertEqual(metrics['removed'], 3)
+        self.assertEqual(metrics['bytes'], 18)
+        self.assertFalse(self.exists('generated_images/orphan.png'))
+        self.assertFalse(self.exists('file_images/orphan.png'))
+        self.assertFalse(self.exists('uploaded_files/nested/orphan.txt'))
+        self.assertTrue(self.exists('generated_images/kept.png'))
+        self.assertTrue(self.exists('file_images/kept.png'))
+        self.assertTrue(self.exists('uploaded_files/kept.txt'))
+        self.assertTrue(self.exists('other/unknown.txt'))
+
+    def test_bulk_deleted_rows_leave_files_to_collect(self):
+        ImageGeneration.objects.all().delete()
+        self.assertTrue(self.exists('generated_images/kept.png'))
+        metrics = collect_media_garbage()
+        self.assertEqual(metrics['removed'], 4)
+        self.assertFalse(self.exists('generated_images/kept.png'))
+
+    def test_dry_run_removes_nothing(self):
+        metrics = collect_media_garbage(dry_run=True)
+        self.assertEqual(metrics['orphaned'], 3)
+        self.assertEqual(metrics['removed'], 0)
+        self.assertEqual(metrics['bytes'], 18)
+        self.assertTrue(self.exists('generated_images/orphan.png'))
+
+    def test_recent_files_are_kept(self):
+        self.write('generated_images/saving.png', b'new')
+        now = time.time()
+        os.utime(os.path.join(self.media_root, 'generated_images/saving.png'), (now, now))
+        collect_media_garbage(grace_period=60 * 10)
+        self.assertTrue(self.exists('generated_images/saving.png'))
+        self.assertFalse(self.exists('generated_images/orphan.png'))
+
+    def test_missing_directories(self):
+        shutil.rmtree(os.path.join(self.media_root, 'file_images'))
+        metrics = collect_media_garbage()
+        self.assertEqual(metrics['removed'], 2)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('collect_media_garbage', '--dry-run', stdout=out)
+        self.assertIn('3 unreferenced files, 18 bytes reclaimable', out.getvalue())
+        self.assertTrue(self.exists('generated_images/orphan.png'))
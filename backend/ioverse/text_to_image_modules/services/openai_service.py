@@ -1,5 +1,5 @@
 import openai
-from openai import OpenAI
+from client_modules.registry import get_client
 from typing import Dict, Any
 from .abstract_ai_service import AbstractAIService
 import logging
@@ -8,7 +8,7 @@ logger = logging.getLogger('text_to_image_log')
 
 class OpenAIService(AbstractAIService):
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_client(api_key)
 
     def generate_image(self, prompt: str, **kwargs) -> Dict[str, Any]:
         # Remove any items with None values from kwargs
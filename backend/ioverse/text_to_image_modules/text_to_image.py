@@ -1,12 +1,18 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
 from .exceptions import InvalidResponseError
 from .services.abstract_ai_service import AbstractAIService
 from .core.text_to_image_logic_service import TextToImageLogicService
-from tenacity import retry, stop_after_attempt, wait_exponential
+from client_modules.retry import openai_retry
 import logging
 
 logger = logging.getLogger('text_to_image_log')
 
+# Images generated per request at most by the models limiting them, a larger `n` is split over parallel requests
+MAX_IMAGES_PER_REQUEST = {"dall-e-3": 1}
+# Requests of a single generation in flight at once
+MAX_PARALLEL_REQUESTS = 4
+
 class TextToImage:
     def __init__(
         self,
@@ -30,21 +36,20 @@ class TextToImage:
         
         logger.info("TextToImage initialized.")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def generate_image(self, prompt: str) -> Optional[str]:
+    def generate_image(self, prompt: str) -> List[str]:
+        """
+        Generates `n` images of the prompt. When the model generates fewer images per request,
+        the requests are sent in parallel, so that the images take about the time of a single one.
+        The images of the requests that succeeded are returned, the error is raised only if all failed.
+        """
         prepared_prompt = self.logic_service.prepare_prompt(prompt)
         try:
-            response = self.ai_service.generate_image(
-                model=self.model,
-                prompt=prepared_prompt,
-                n=self.n,
-                size=self.size,
-                quality=self.quality,
-                response_format=self.response_format,
-                style=self.style, 
-            )
-            image_data = self.logic_service.process_response(response)
-            logger.info(f"{len(image_data)} image(s) generated.")
+            counts = self.split_requests()
+            if len(counts) == 1:
+                image_data = self.request_images(prepared_prompt, counts[0])
+            else:
+                image_data = self.request_images_in_parallel(prepared_prompt, counts)
+            logger.info(f"{len(image_data)} image(s) generated in {len(counts)} request(s).")
             return image_data
         except InvalidResponseError as e:
             logger.error(f"Invalid response: {e}", exc_info=True)
@@ -53,6 +58,50 @@ class TextToImage:
             logger.error(f"Unexpected error during image generation: {e}", exc_info=True)
             raise
 
+    def request_images_in_parallel(self, prompt: str, counts: List[int]) -> List[str]:
+        """
+        Sends a request per count at once, returning the images as the requests complete.
+        """
+        image_data, errors = [], []
+        with ThreadPoolExecutor(max_workers=min(len(counts), MAX_PARALLEL_REQUESTS)) as executor:
+            futures = [executor.submit(self.request_images, prompt, n) for n in counts]
+            for future in as_completed(futures):
+                try:
+                    image_data.extend(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            if not image_data:
+                raise errors[0]
+            logger.warning(
+                f"{len(errors)} of {len(counts)} request(s) failed, "
+                f"{len(image_data)} of {self.n} image(s) generated: {errors[0]}"
+            )
+        return image_data
+
+    def split_requests(self) -> List[int]:
+        """
+        Returns the number of images of each request generating the `n` images.
+        """
+        per_request = MAX_IMAGES_PER_REQUEST.get(self.model, self.n) or 1
+        full, rest = divmod(self.n, per_request)
+        return [per_request] * full + ([rest] if rest else [])
+
+    @openai_retry()
+    def request_images(self, prompt: str, n: int) -> List[str]:
+        # Retried on its own, so that a failed request doesn't repeat the others
+        response = self.ai_service.generate_image(
+            model=self.model,
+            prompt=prompt,
+            n=n,
+            size=self.size,
+            quality=self.quality,
+            response_format=self.response_format,
+            style=self.style, 
+        )
+        return self.logic_service.process_response(response)
+
     def set_parameters(
         self,
         model: str = "dall-e-2",
@@ -14,6 +14,18 @@ const chat = {
     return response.data;
   },
 
+  // GET Page of messages of the conversation, in chronological order
+  // The latest page without `pageUrl`, older pages by the `next` cursor of the previous one
+  getMessages: async (id, pageUrl) => {
+    const response = await axiosInstance.get(
+      pageUrl || `/chatbot/conversations/${id}/messages/`
+    );
+    return {
+      results: response.data.results.slice().reverse(),
+      next: response.data.next,
+    };
+  },
+
   // GET Shared conversation
   getSharedConversation: async (share_token) => {
     const response = await axiosInstance.get(`/chatbot/shared/${share_token}`);
@@ -21,14 +33,21 @@ const chat = {
   },
 
   // GET Download the conversation as PDF
+  // Large conversations are rendered in background: 202 until the file is ready
   downloadConversation: async (id) => {
-    const response = await axiosInstance.get(
-      `/chatbot/conversations/${id}/download`,
-      {
-        responseType: "blob", // Expects a file
+    for (;;) {
+      const response = await axiosInstance.get(
+        `/chatbot/conversations/${id}/download`,
+        {
+          responseType: "blob", // Expects a file
+        }
+      );
+      if (response.status !== 202) {
+        return response.data;
       }
-    );
-    return response.data;
+      const retryAfter = Number(response.headers["retry-after"]) || 5;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
   },
 
   // PATCH New Title - Rename
@@ -10,13 +10,46 @@ const textToImage = {
     return response.data;
   },
 
-  // POST for generating images
-  generateImages: async (payload) => {
+  // POST Submit a background generation job
+  // A submission retried with the same idempotency key returns the same job
+  submitGenerationJob: async (payload, idempotencyKey) => {
     const response = await axiosInstance.post(
-      "/text-to-image/image-generations/generate/",
-      payload
+      "/text-to-image/image-generation-jobs/",
+      payload,
+      {
+        headers: { "Idempotency-Key": idempotencyKey },
+      }
     );
-    return response.data;
+    return response;
+  },
+
+  // GET Status of a generation job, and its result once finished
+  getGenerationJob: async (url) => {
+    const response = await axiosInstance.get(url);
+    return response;
+  },
+
+  // Generate images: the job is submitted, then polled until finished
+  // Returns the result of the job, throws its error if failed
+  generateImages: async (payload, idempotencyKey) => {
+    let response = await textToImage.submitGenerationJob(
+      payload,
+      idempotencyKey
+    );
+    const jobUrl =
+      response.headers["location"] ||
+      `/text-to-image/image-generation-jobs/${response.data.id}/`;
+
+    while (!["succeeded", "failed"].includes(response.data.status)) {
+      const retryAfter = Number(response.headers["retry-after"]) || 2;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+      response = await textToImage.getGenerationJob(jobUrl);
+    }
+
+    if (response.data.status === "failed") {
+      throw new Error(response.data.error || "Failed to generate image.");
+    }
+    return response.data.result;
   },
 
   // POST for saving images
@@ -26,10 +26,7 @@ const ChatsSection = ({ tabValue, theme, isLoading, conversationsData }) => {
       title: conv.title,
       createdAt: parseISO(conv.created_at),
       updatedAt: parseISO(conv.updated_at),
-      lastMessage:
-        conv.messages && conv.messages.length > 0
-          ? conv.messages[conv.messages.length - 1].message_body
-          : "No messages yet.",
+      lastMessage: conv.last_message || "No messages yet.",
       userUsername: conv.user_username,
     }));
   }, [conversationsData]);
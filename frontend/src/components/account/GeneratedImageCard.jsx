@@ -117,6 +117,7 @@ const GeneratedImageCard = ({ image, onViewDetails, onViewFullscreen }) => {
             component="img"
             height="256"
             src={
+              image.image_thumbnail ||
               image.image_url ||
               image.image_file ||
               "/static/images/placeholder.png"
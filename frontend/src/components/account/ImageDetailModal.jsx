@@ -46,7 +46,10 @@ const ImageDetailModal = ({ open, handleClose, image }) => {
   const fullScreen = useMediaQuery(theme.breakpoints.down("sm"));
 
   const imageSrc =
-    image.image_url || image.image_file || "/static/images/placeholder.png";
+    image.image_preview ||
+    image.image_url ||
+    image.image_file ||
+    "/static/images/placeholder.png";
 
   const handleImageError = (e) => {
     e.target.onerror = null;
@@ -9,11 +9,16 @@ import {
   useTheme,
   useMediaQuery,
   Toolbar,
+  Button,
 } from "@mui/material";
 import SendIcon from "@mui/icons-material/Send";
 import { DrawerContext } from "../contexts/DrawerContext";
 import { ConversationContext } from "../contexts/ConversationContext";
-import { useMutation, useQueryClient } from "@tanstack/react-query";
+import {
+  useInfiniteQuery,
+  useMutation,
+  useQueryClient,
+} from "@tanstack/react-query";
 import chat from "../api/chat";
 import ChatDial from "../components/chat/ChatDial";
 import TypingEffect from "../components/chat/TypingEffect";
@@ -47,6 +52,46 @@ export default function ChatSystem() {
       ?.results.find((conv) => conv.id === activeConversationId);
   }, [activeConversationId, queryClient.getQueryData(["conversations"])]);
 
+  // Messages of the conversation, the list only carries a preview
+  // The first page holds the latest messages, older pages are loaded on demand
+  const {
+    data: messagePages,
+    fetchNextPage: fetchOlderMessages,
+    hasNextPage: hasOlderMessages,
+    isFetchingNextPage: isFetchingOlderMessages,
+  } = useInfiniteQuery({
+    queryKey: ["messages", activeConversationId],
+    queryFn: ({ pageParam }) =>
+      chat.getMessages(activeConversationId, pageParam),
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage.next,
+    enabled: !!activeConversationId,
+  });
+
+  // In chronological order, from the oldest page loaded
+  const messages = useMemo(
+    () =>
+      messagePages
+        ? [...messagePages.pages].reverse().flatMap((page) => page.results)
+        : [],
+    [messagePages]
+  );
+
+  // Replaces the messages of the latest page in the cache
+  const updateLatestMessages = (update) => {
+    queryClient.setQueryData(["messages", activeConversationId], (oldData) =>
+      oldData
+        ? {
+            ...oldData,
+            pages: [
+              { ...oldData.pages[0], results: update(oldData.pages[0].results) },
+              ...oldData.pages.slice(1),
+            ],
+          }
+        : oldData
+    );
+  };
+
   const sendMessageMutation = useMutation({
     mutationKey: ["sendMessage"],
     mutationFn: async ({ message_body, conversation_id }) => {
@@ -56,7 +101,10 @@ export default function ChatSystem() {
       // Cancel outgoing refetches to avoid overwriting optimistic update
       await queryClient.cancelQueries(["conversations"]);
 
-      const previousConversations = queryClient.getQueryData(["conversations"]);
+      const previousMessages = queryClient.getQueryData([
+        "messages",
+        activeConversationId,
+      ]);
 
       const optimisticMessage = {
         id: Date.now(),
@@ -71,23 +119,12 @@ export default function ChatSystem() {
         setTempMessage(optimisticMessage.message_body);
       }
 
-      queryClient.setQueryData(["conversations"], (oldData) => {
-        if (!oldData) return oldData;
-
-        return {
-          ...oldData,
-          results: oldData.results.map((conv) =>
-            conv.id === activeConversationId
-              ? { ...conv, messages: [...conv.messages, optimisticMessage] }
-              : conv
-          ),
-        };
-      });
+      updateLatestMessages((results) => [...results, optimisticMessage]);
 
       // Set typing indicator
       setTyping(true);
 
-      return { previousConversations, optimisticMessage };
+      return { previousMessages, optimisticMessage };
     },
     onSuccess: async (data, variables, context) => {
       const { optimisticMessage } = context;
@@ -96,36 +133,22 @@ export default function ChatSystem() {
         await queryClient.invalidateQueries(["conversations"]);
         activateConversation(data.user_message.conversation_id);
       } else {
-        queryClient.setQueryData(["conversations"], (oldData) => {
-          if (!oldData) return oldData;
-
-          return {
-            ...oldData,
-            results: oldData.results.map((conv) =>
-              conv.id === activeConversationId
-                ? {
-                    ...conv,
-                    messages: [
-                      ...conv.messages.filter(
-                        (msg) => msg.id !== optimisticMessage.id
-                      ),
-                      data.user_message,
-                      data.ai_message,
-                    ],
-                  }
-                : conv
-            ),
-          };
-        });
+        updateLatestMessages((results) => [
+          ...results.filter((msg) => msg.id !== optimisticMessage.id),
+          data.user_message,
+          data.ai_message,
+        ]);
+        // Refresh the last message preview
+        queryClient.invalidateQueries(["conversations"]);
       }
 
       setTyping(false);
     },
     onError: (error, variables, context) => {
-      if (context?.previousConversations) {
+      if (context?.previousMessages) {
         queryClient.setQueryData(
-          ["conversations"],
-          context.previousConversations
+          ["messages", activeConversationId],
+          context.previousMessages
         );
       }
 
@@ -169,10 +192,11 @@ export default function ChatSystem() {
     }
   };
 
-  // Auto-scroll when messages change
+  // Auto-scroll when a message is added, not when older messages are loaded
+  const latestMessageId = messages[messages.length - 1]?.id;
   useEffect(() => {
     scrollToBottom();
-  }, [conversation]);
+  }, [latestMessageId]);
 
   return (
     <>
@@ -208,8 +232,21 @@ export default function ChatSystem() {
             }}
           >
             <List sx={{ flexGrow: 1 }}>
-              {conversation?.messages && conversation.messages.length > 0 ? (
-                conversation.messages.map((msg) => (
+              {conversation && hasOlderMessages && (
+                <Box sx={{ display: "flex", justifyContent: "center", mb: 1 }}>
+                  <Button
+                    size="small"
+                    onClick={() => fetchOlderMessages()}
+                    disabled={isFetchingOlderMessages}
+                  >
+                    {isFetchingOlderMessages
+                      ? "Loading..."
+                      : "Load older messages"}
+                  </Button>
+                </Box>
+              )}
+              {conversation && messages.length > 0 ? (
+                messages.map((msg) => (
                   <MessageItem
                     key={msg.id}
                     sender={msg.sender}
@@ -18,6 +18,7 @@ import {
 import textToImage from "../api/textToImage";
 import OptionsBar from "../components/texttoimage/OptionsBar";
 import { toast } from "react-toastify";
+import { generateIdempotencyKey } from "../utils/generateIdempotencyKey";
 
 const TextToImage = () => {
   const [prompt, setPrompt] = useState("");
@@ -33,6 +34,8 @@ const TextToImage = () => {
   const [loadedImages, setLoadedImages] = useState(0);
   const [imageIds, setImageIds] = useState(Array(n).fill(null));
   const imagesContainerRef = useRef(null);
+  // Idempotency key of the pending submission and the parameters it was created for
+  const submissionRef = useRef(null);
 
   // Generated images data
   const [payload, setPayload] = useState(null);
@@ -61,6 +64,9 @@ const TextToImage = () => {
     { value: "natural", label: "Natural" },
   ];
 
+  // DALL-E 3 generates one image per request, more are requested in parallel
+  const maxN = modelUsed === "dall-e-2" ? 10 : 4;
+
   const handleGenerate = async (e) => {
     e.preventDefault();
 
@@ -75,8 +81,8 @@ const TextToImage = () => {
       }
     }
 
-    if (modelUsed === "dall-e-3" && n !== 1) {
-      newErrors.n = "For DALL-E 3, n must be 1";
+    if (modelUsed === "dall-e-3" && (n < 1 || n > 4)) {
+      newErrors.n = "For DALL-E 3, n must be between 1 and 4";
     }
 
     if (modelUsed === "dall-e-2" && (n < 1 || n > 10)) {
@@ -101,8 +107,6 @@ const TextToImage = () => {
       if (modelUsed === "dall-e-2") {
         delete payload.quality; // Not supported
         delete payload.style; // Not supported
-      } else if (modelUsed === "dall-e-3") {
-        payload.n = 1; // Must be 1 for DALL-E 3
       }
 
       setPayload(payload);
@@ -114,8 +118,19 @@ const TextToImage = () => {
 
       setLoading(true);
 
+      // One key per submission: resubmitting the same parameters after a lost response
+      // reuses it, so that the images aren't generated twice
+      const parameters = JSON.stringify(payload);
+      if (submissionRef.current?.parameters !== parameters) {
+        submissionRef.current = { key: generateIdempotencyKey(), parameters };
+      }
+
       try {
-        const response = await textToImage.generateImages(payload);
+        const response = await textToImage.generateImages(
+          payload,
+          submissionRef.current.key
+        );
+        submissionRef.current = null;
 
         // Process the response
         let images = [];
@@ -134,8 +149,14 @@ const TextToImage = () => {
         setImageIds(Array(images.length).fill(null));
       } catch (error) {
         console.error("Error generating image:", error);
+        if (!error.isAxiosError) {
+          submissionRef.current = null; // The job failed, a new submission is needed to retry
+        }
         const errorMessage =
-          error.response?.data?.message || "Failed to generate image.";
+          error.response?.data?.message ||
+          error.response?.data?.detail ||
+          (!error.isAxiosError && error.message) || // Error of the job
+          "Failed to generate image.";
         toast.error(errorMessage);
       } finally {
         setLoading(false);
@@ -148,7 +169,7 @@ const TextToImage = () => {
       setSize("512x512");
     } else if (modelUsed === "dall-e-3") {
       setSize("1024x1024");
-      setN(1);
+      setN((current) => Math.min(current, 4));
     }
   }, [modelUsed]);
 
@@ -267,44 +288,42 @@ const TextToImage = () => {
             </Select>
           </FormControl>
 
-          {/* Number of Images (DALL-E 2) */}
-          {modelUsed === "dall-e-2" && (
-            <TextField
-              label="Number of Images (n)"
-              type="number"
-              fullWidth
-              variant="outlined"
-              value={n}
-              onChange={(e) => {
-                const value = parseInt(e.target.value, 10);
-                if (isNaN(value) || value < 1) {
-                  setN(1); // Default to 1 if input is invalid
-                } else if (value > 10) {
-                  setN(10); // Cap the value at 10
-                } else {
-                  setN(value);
-                }
-              }}
-              error={!!errors.n}
-              helperText={errors.n}
-              inputProps={{ min: 1, max: 10 }}
-              required
-              sx={{
-                "& .MuiInputBase-input": {
-                  fontFamily: "'Montserrat', serif",
-                  "&::placeholder": {
-                    fontFamily: "'Montserrat', serif",
-                  },
-                },
-                "& .MuiInputLabel-root": {
-                  fontFamily: "'Montserrat', serif",
-                },
-                "& .MuiFormHelperText-root": {
+          {/* Number of Images */}
+          <TextField
+            label="Number of Images (n)"
+            type="number"
+            fullWidth
+            variant="outlined"
+            value={n}
+            onChange={(e) => {
+              const value = parseInt(e.target.value, 10);
+              if (isNaN(value) || value < 1) {
+                setN(1); // Default to 1 if input is invalid
+              } else if (value > maxN) {
+                setN(maxN); // Cap the value at the maximum of the model
+              } else {
+                setN(value);
+              }
+            }}
+            error={!!errors.n}
+            helperText={errors.n}
+            inputProps={{ min: 1, max: maxN }}
+            required
+            sx={{
+              "& .MuiInputBase-input": {
+                fontFamily: "'Montserrat', serif",
+                "&::placeholder": {
                   fontFamily: "'Montserrat', serif",
                 },
-              }}
-            />
-          )}
+              },
+              "& .MuiInputLabel-root": {
+                fontFamily: "'Montserrat', serif",
+              },
+              "& .MuiFormHelperText-root": {
+                fontFamily: "'Montserrat', serif",
+              },
+            }}
+          />
 
           {/* Quality and Style (DALL-E 3) */}
           {modelUsed === "dall-e-3" && (
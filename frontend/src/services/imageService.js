@@ -4,14 +4,21 @@ import textToImage from "../api/textToImage";
 export const imageService = {
   saveImage: async (payload, src) => {
     // POST
-    let imageSrc = src;
-    if (src.startsWith("data:image")) {
-      imageSrc = src.split(",")[1]; // clean if it's base64
-    }
-    // include the src in the payload
-    payload.image_data = imageSrc; // check whether is url or base64
     try {
-      const response = await textToImage.createImage(payload);
+      let response;
+      if (src.startsWith("data:image")) {
+        // Base64 images are uploaded as binary files, a quarter smaller than their Base64 data
+        const blob = await (await fetch(src)).blob();
+        const formData = new FormData();
+        Object.entries(payload).forEach(([key, value]) => {
+          if (value !== null && value !== undefined) formData.append(key, value);
+        });
+        formData.append("image_upload", blob, "image.png");
+        response = await textToImage.createImage(formData);
+      } else {
+        // URLs are sent as they are
+        response = await textToImage.createImage({ ...payload, image_data: src });
+      }
       console.log("Image saved successfully.");
       return response;
     } catch (err) {